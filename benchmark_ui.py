@@ -0,0 +1,386 @@
+"""Coursemos Downloader UI 응답성 벤치마크
+
+가짜 ffmpeg/ffprobe와 로컬 HLS/업데이트 서버를 띄운 뒤 GUI를 화면 없이(offscreen) 실행해
+강의 다운로드와 업데이트 다운로드가 진행되는 동안 Qt 이벤트 루프 지연, 놓친 프레임,
+메모리 증가량을 측정합니다. (Linux/macOS 전용: 가짜 실행 파일을 PATH에 올려 사용)
+
+예: python benchmark_ui.py --jobs 3 --ffmpeg-seconds 30 --stderr-rate 500 --json bench.json
+"""
+import os
+import sys
+import io
+import json
+import time
+import stat
+import shutil
+import zipfile
+import argparse
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QMessageBox
+from PyQt5.QtCore import Qt, QObject, QTimer, QSettings
+
+
+# 실행되는 동안 진행률 줄을 일정한 속도로 stderr에 쓰고, 끝나면 입력을 출력으로 복사
+FAKE_FFMPEG = r'''#!{python}
+import os, sys, time, shutil
+args = sys.argv[1:]
+if '-version' in args:
+    print("ffmpeg version benchmark")
+    sys.exit(0)
+seconds = float(os.environ.get('BENCH_FFMPEG_SECONDS', '10'))
+rate = float(os.environ.get('BENCH_STDERR_RATE', '200'))
+media = float(os.environ.get('BENCH_MEDIA_DURATION', '3600'))
+total = max(1, int(seconds * rate))
+started = time.monotonic()
+for n in range(total):
+    position = media * (n + 1) / total
+    hours, rest = divmod(position, 3600)
+    minutes, secs = divmod(rest, 60)
+    sys.stderr.write(f"frame={{n:6d}} fps=30 q=-1.0 size={{n * 64:8d}}kB "
+                     f"time={{int(hours):02d}}:{{int(minutes):02d}}:{{secs:05.2f}} bitrate=1500.0kbits/s speed=120x\n")
+    sys.stderr.flush()
+    delay = started + (n + 1) / rate - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+output = args[-1]
+source = args[args.index('-i') + 1] if '-i' in args else None
+if source and os.path.isfile(source):
+    shutil.copyfile(source, output)
+else:
+    with open(output, 'wb') as f:
+        f.write(b'\0' * 1024)
+'''
+
+# 재생 시간과 (빈틈 없는) 오디오 패킷 목록만 흉내 냄
+FAKE_FFPROBE = r'''#!{python}
+import os, sys
+args = sys.argv[1:]
+if '-version' in args:
+    print("ffprobe version benchmark")
+    sys.exit(0)
+media = float(os.environ.get('BENCH_MEDIA_DURATION', '3600'))
+if any('packet=' in arg for arg in args):
+    lines = [f"{{t:.3f}},1.000" for t in range(int(media))]
+    sys.stdout.write("\n".join(lines) + "\n")
+else:
+    print(f"{{media:.3f}}")
+'''
+
+
+def install_fake_binaries(bin_dir):
+    """가짜 ffmpeg/ffprobe를 만들어 PATH 맨 앞에 추가"""
+    for name, template in (('ffmpeg', FAKE_FFMPEG), ('ffprobe', FAKE_FFPROBE)):
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(template.format(python=sys.executable))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+
+
+def build_update_zip(size_mb, exe_name):
+    """압축되지 않는 내용의 EXE 하나가 든 업데이트 ZIP (8KB 청크마다 진행률이 나오도록 크게)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        archive.writestr(exe_name, os.urandom(int(size_mb * 1024 * 1024)))
+    return buffer.getvalue()
+
+
+class BenchRequestHandler(BaseHTTPRequestHandler):
+    """HLS 플레이리스트/세그먼트, 업데이트 ZIP, GitHub 릴리스 API 흉내"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def resolve(self):
+        server = self.server
+        if self.path == '/hls/index.m3u8':
+            lines = ["#EXTM3U", "#EXT-X-VERSION:3", f"#EXT-X-TARGETDURATION:{server.segment_seconds}",
+                     "#EXT-X-MEDIA-SEQUENCE:0"]
+            for index in range(server.segment_count):
+                lines += [f"#EXTINF:{server.segment_seconds:.3f},", f"seg{index}.ts"]
+            lines.append("#EXT-X-ENDLIST")
+            return 'application/vnd.apple.mpegurl', ("\n".join(lines) + "\n").encode('utf-8')
+        if self.path.startswith('/hls/seg') and self.path.endswith('.ts'):
+            return 'video/mp2t', server.segment_data
+        if self.path == '/update.zip':
+            return 'application/zip', server.update_zip
+        if self.path.endswith('/releases/latest'):
+            # 현재 버전과 같게 알려 업데이트 대화상자가 뜨지 않도록 함
+            body = {'tag_name': f"v{server.app_version}", 'body': "", 'assets': []}
+            return 'application/json', json.dumps(body).encode('utf-8')
+        return None, None
+
+    def send_content(self, include_body):
+        content_type, body = self.resolve()
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_content(True)
+
+    def do_HEAD(self):
+        self.send_content(False)
+
+
+def start_server(args, app_version, exe_name):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BenchRequestHandler)
+    server.daemon_threads = True
+    server.segment_count = args.segments
+    server.segment_seconds = args.segment_seconds
+    server.segment_data = (b'\x47' + bytes(187)) * 64  # TS 패킷 64개
+    server.update_zip = build_update_zip(args.update_size_mb, exe_name)
+    server.app_version = app_version
+    threading.Thread(target=server.serve_forever, name="bench-server", daemon=True).start()
+    return server
+
+
+def current_rss():
+    """현재 프로세스 RSS (바이트)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class EventLoopProbe(QObject):
+    """프레임 간격 타이머로 이벤트 루프 지연과 놓친 프레임을, 1초마다 메모리를 기록"""
+
+    def __init__(self, frame_ms=16):
+        super().__init__()
+        self.frame_ms = frame_ms
+        self.latencies = []  # 예정보다 늦게 실행된 시간 (ms)
+        self.frames = 0
+        self.dropped = 0
+        self.last_tick = None
+        self.memory = []  # (경과 초, RSS 바이트)
+        self.started = None
+
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setTimerType(Qt.PreciseTimer)
+        self.frame_timer.timeout.connect(self.tick)
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self.sample_memory)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.sample_memory()
+        self.frame_timer.start(self.frame_ms)
+        self.memory_timer.start(1000)
+
+    def stop(self):
+        self.frame_timer.stop()
+        self.memory_timer.stop()
+        self.sample_memory()
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.last_tick is not None:
+            gap = (now - self.last_tick) * 1000
+            self.latencies.append(max(0.0, gap - self.frame_ms))
+            missed = int(gap // self.frame_ms) - 1
+            if missed > 0:
+                self.dropped += missed
+            self.frames += 1 + max(missed, 0)
+        self.last_tick = now
+
+    def sample_memory(self):
+        self.memory.append((time.perf_counter() - self.started, current_rss()))
+
+    def report(self):
+        rss = [value for _, value in self.memory]
+        elapsed = self.memory[-1][0] if self.memory else 0.0
+        # 앞쪽 10초는 초기화 영향이 크므로 그 이후 구간으로 증가 속도 계산
+        steady = [(t, value) for t, value in self.memory if t >= 10] or self.memory
+        growth_per_min = 0.0
+        if len(steady) > 1 and steady[-1][0] > steady[0][0]:
+            growth_per_min = (steady[-1][1] - steady[0][1]) / (steady[-1][0] - steady[0][0]) * 60
+        return {
+            'elapsed_s': round(elapsed, 1),
+            'latency_ms': {
+                'p50': round(percentile(self.latencies, 0.50), 2),
+                'p95': round(percentile(self.latencies, 0.95), 2),
+                'p99': round(percentile(self.latencies, 0.99), 2),
+                'max': round(max(self.latencies, default=0.0), 2),
+            },
+            'frames': self.frames,
+            'dropped_frames': self.dropped,
+            'dropped_ratio': round(self.dropped / self.frames, 4) if self.frames else 0.0,
+            'rss_mb': {
+                'start': round(rss[0] / 1048576, 1) if rss else 0.0,
+                'end': round(rss[-1] / 1048576, 1) if rss else 0.0,
+                'peak': round(max(rss) / 1048576, 1) if rss else 0.0,
+                'growth_per_min': round(growth_per_min / 1048576, 2),
+            },
+        }
+
+
+class BenchmarkDriver(QObject):
+    """GUI 다운로드 경로로 가짜 강의를 차례로 받고, 중간에 업데이트 다운로드를 함께 실행"""
+
+    def __init__(self, window, downloader_module, server_url, args, work_dir):
+        super().__init__()
+        self.window = window
+        self.module = downloader_module
+        self.server_url = server_url
+        self.args = args
+        self.work_dir = work_dir
+        self.probe = EventLoopProbe(args.frame_ms)
+        self.completed_jobs = []
+        self.update_result = None
+        self.updater = None
+        self.job_index = 0
+
+    def start(self):
+        self.window.save_folder = os.path.join(self.work_dir, "output")
+        os.makedirs(self.window.save_folder, exist_ok=True)
+        self.window.mp4_checkbox.setChecked(True)
+        self.window.mp3_checkbox.setChecked(False)
+        self.probe.start()
+        self.start_next_job()
+        if self.args.update_size_mb > 0:
+            QTimer.singleShot(int(self.args.update_delay * 1000), self.start_update)
+        QTimer.singleShot(int(self.args.max_seconds * 1000), self.finish)
+
+    def start_next_job(self):
+        if self.job_index >= self.args.jobs:
+            self.finish_if_done()
+            return
+        self.job_index += 1
+        self.window.selected_url = f"{self.server_url}/hls/index.m3u8"
+        self.window.page_title = f"bench_{self.job_index:02d}"
+        self.window.mirror_urls = []
+        self.window._download_file('mp4')
+        self.window.ffmpeg_thread.conversion_finished.connect(self.job_finished)
+
+    def job_finished(self, success, message, path):
+        self.completed_jobs.append(success)
+        print(f"작업 {len(self.completed_jobs)}/{self.args.jobs}: {'성공' if success else '실패'} {message}")
+        QTimer.singleShot(0, self.start_next_job)
+
+    def start_update(self):
+        """GitHubUpdaterManager와 같은 방식으로 DirectUpdater 진행률을 창에 연결"""
+        fake_exe = os.path.join(self.work_dir, "update_target", "CoursemosDownloader.exe")
+        os.makedirs(os.path.dirname(fake_exe), exist_ok=True)
+        self.updater = self.module.DirectUpdater(f"{self.server_url}/update.zip", fake_exe)
+        self.updater.progress_update.connect(self.window.show_update_progress)
+        self.updater.update_completed.connect(self.update_finished)
+        self.updater.start()
+
+    def update_finished(self, success, message):
+        self.update_result = success
+        print(f"업데이트 다운로드: {'성공' if success else '실패'} {message}")
+        self.finish_if_done()
+
+    def finish_if_done(self):
+        update_done = self.args.update_size_mb <= 0 or self.update_result is not None
+        if len(self.completed_jobs) >= self.args.jobs and update_done:
+            self.finish()
+
+    def finish(self):
+        if not self.probe.frame_timer.isActive():
+            return
+        self.probe.stop()
+        QApplication.instance().quit()
+
+    def report(self):
+        result = self.probe.report()
+        result.update({
+            'jobs_completed': sum(1 for success in self.completed_jobs if success),
+            'jobs_failed': sum(1 for success in self.completed_jobs if not success),
+            'update_ok': self.update_result,
+            'stderr_lines_per_s': self.args.stderr_rate,
+            'ffmpeg_seconds': self.args.ffmpeg_seconds,
+            'segments': self.args.segments,
+            'update_size_mb': self.args.update_size_mb,
+        })
+        return result
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Coursemos Downloader UI 응답성 벤치마크")
+    parser.add_argument('--jobs', type=int, default=3, help="차례로 실행할 가짜 강의 수 (기본값: 3)")
+    parser.add_argument('--ffmpeg-seconds', type=float, default=20, help="가짜 ffmpeg 실행 시간 (초, 기본값: 20)")
+    parser.add_argument('--stderr-rate', type=float, default=300,
+                        help="가짜 ffmpeg가 초당 쓰는 진행률 줄 수 (기본값: 300)")
+    parser.add_argument('--segments', type=int, default=600, help="플레이리스트 세그먼트 수 (기본값: 600)")
+    parser.add_argument('--segment-seconds', type=float, default=6.0, help="세그먼트 길이 (초, 기본값: 6)")
+    parser.add_argument('--update-size-mb', type=float, default=20,
+                        help="업데이트 ZIP 크기 (MB, 0이면 업데이트 다운로드 생략, 기본값: 20)")
+    parser.add_argument('--update-delay', type=float, default=2, help="업데이트 다운로드 시작 시점 (초, 기본값: 2)")
+    parser.add_argument('--frame-ms', type=int, default=16, help="프레임 간격 (ms, 기본값: 16)")
+    parser.add_argument('--max-seconds', type=float, default=600, help="최대 실행 시간 (초, 기본값: 600)")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if os.name == 'nt':
+        print("가짜 ffmpeg를 PATH로 바꿔 끼우는 방식이라 Windows에서는 지원하지 않습니다.")
+        return 2
+
+    work_dir = tempfile.mkdtemp(prefix="coursemos_bench_")
+    try:
+        bin_dir = os.path.join(work_dir, "bin")
+        os.makedirs(bin_dir)
+        install_fake_binaries(bin_dir)
+        os.environ['BENCH_FFMPEG_SECONDS'] = str(args.ffmpeg_seconds)
+        os.environ['BENCH_STDERR_RATE'] = str(args.stderr_rate)
+        os.environ['BENCH_MEDIA_DURATION'] = str(args.segments * args.segment_seconds)
+        # 실제 사용자 설정(QSettings)과 앱 데이터(로그 등)를 건드리지 않도록 작업 폴더 아래로 돌림
+        for name in ('XDG_CONFIG_HOME', 'XDG_DATA_HOME', 'XDG_CACHE_HOME'):
+            os.environ[name] = os.path.join(work_dir, name.lower())
+        QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope, os.environ['XDG_CONFIG_HOME'])
+
+        import coursemos_downloader
+        server = start_server(args, coursemos_downloader.APP_VERSION, "CoursemosDownloader.exe")
+        server_url = f"http://127.0.0.1:{server.server_address[1]}"
+        coursemos_downloader.GITHUB_API_URL = server_url
+
+        # 완료/경고 대화상자가 이벤트 루프를 막지 않도록 바로 반환
+        for name in ('information', 'warning', 'critical'):
+            setattr(QMessageBox, name, lambda *args, **kwargs: QMessageBox.Ok)
+
+        app = QApplication(sys.argv[:1])
+        window = coursemos_downloader.CoursemosDownloader()
+        window.show()
+
+        driver = BenchmarkDriver(window, coursemos_downloader, server_url, args, work_dir)
+        QTimer.singleShot(0, driver.start)
+        app.exec_()
+
+        result = driver.report()
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        server.shutdown()
+        return 0 if result['jobs_failed'] == 0 and result['jobs_completed'] == args.jobs else 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,22 +1,53 @@
 import sys
 import os
 import re
+import argparse
+import codecs
 import subprocess
 import requests
 import tempfile
 import zipfile
 import shutil
 import atexit
+import errno
+import threading
+import time
+import json
+import hashlib
+import logging
+import cProfile
+import queue
+import socket
+import sqlite3
+import uuid
+from collections import namedtuple, deque
+from contextlib import contextmanager
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from itertools import islice, chain
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QFileDialog, 
                            QLabel, QVBoxLayout, QHBoxLayout, QWidget, QProgressBar, 
-                           QTextEdit, QMessageBox, QCheckBox, QFrame, QMenu, QAction)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSettings, QTimer
-from PyQt5.QtGui import QFont, QIcon, QPixmap
+                           QListView, QComboBox, QLineEdit, QMessageBox, QCheckBox, QFrame, QMenu, QAction)
+from PyQt5.QtCore import (Qt, QObject, QThread, pyqtSignal, QSettings, QTimer, QAbstractListModel,
+                          QModelIndex, QStandardPaths)
+from PyQt5.QtGui import QFont, QIcon, QPixmap, QColor
 
 
 
 
+# pip install cryptography (AES-128 HLS 복호화용, 없으면 암호화된 스트림은 ffmpeg가 직접 처리)
+try:
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    HAS_CRYPTOGRAPHY = True
+except ImportError:
+    HAS_CRYPTOGRAPHY = False
+
 # pip install packaging (버전 비교용)
 try:
     from packaging import version
@@ -28,6 +59,183 @@ except ImportError:
 APP_VERSION = "1.1.0"
 GITHUB_OWNER = "sunes26" 
 GITHUB_REPO = "coursemos-downloader" 
+GITHUB_API_URL = "https://api.github.com"  # 벤치마크 등에서 로컬 서버로 바꿔 사용
+
+
+class Profiler:
+    """스레드별 작업 구간(span)을 기록해 Chrome trace 형식으로 내보내는 프로파일러
+
+    비활성 상태에서는 span()이 바로 반환되므로 평소 실행에는 영향이 거의 없습니다."""
+
+    def __init__(self, max_events=500000):
+        self.enabled = False
+        self.cprofile_enabled = False
+        self.output_dir = None
+        self.events = deque(maxlen=max_events)
+        self.thread_names = {}  # 스레드 ID -> 이름
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.main_profile = None  # 메인 스레드 cProfile (사용 중일 때만)
+        self.exit_hook_registered = False
+
+    def enable(self, output_dir, cprofile=False):
+        """프로파일링 시작 (종료 시 자동으로 추적 파일 저장)"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.cprofile_enabled = cprofile
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.origin = time.perf_counter()
+        self._register_thread()
+        if cprofile:
+            # 메인 스레드 cProfile
+            self.main_profile = self._start_profile()
+        if not self.exit_hook_registered:
+            atexit.register(self._export_at_exit)
+            self.exit_hook_registered = True
+
+    def disable(self):
+        """프로파일링 중지 (지금까지의 기록은 파일로 저장)"""
+        path = self.export(final=True)
+        self.enabled = False
+        return path
+
+    def _export_at_exit(self):
+        if self.enabled:
+            self.export(final=True)
+
+    def _start_profile(self):
+        """cProfile 시작 (다른 프로파일러가 이미 동작 중이면 None, 실제 작업은 계속 진행)"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Python 3.12+는 프로세스 전체에서 프로파일러 하나만 켤 수 있음
+            print(f"cProfile을 시작할 수 없어 건너뜁니다: {str(e)}")
+            return None
+        return profile
+
+    def _register_thread(self, name=None):
+        thread = threading.current_thread()
+        with self.lock:
+            self.thread_names[thread.ident] = name or thread.name
+
+    def _now_us(self):
+        return (time.perf_counter() - self.origin) * 1000000
+
+    @contextmanager
+    def span(self, name, category="app", **args):
+        """작업 구간 기록"""
+        if not self.enabled:
+            yield
+            return
+
+        thread_id = threading.get_ident()
+        if thread_id not in self.thread_names:
+            self._register_thread()
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            event = {"name": name, "cat": category, "ph": "X", "ts": start,
+                     "dur": self._now_us() - start, "pid": self.pid, "tid": thread_id}
+            if args:
+                event["args"] = args
+            with self.lock:
+                self.events.append(event)
+
+    @contextmanager
+    def thread_run(self, name):
+        """스레드 실행 전체를 기록 (cProfile 사용 시 스레드별 통계 파일 저장)"""
+        if not self.enabled:
+            yield
+            return
+
+        # 명령줄 모드처럼 메인 스레드에서 직접 run()을 호출하면 메인 스레드 기록을 그대로 사용
+        in_main_thread = threading.current_thread() is threading.main_thread()
+        if not in_main_thread:
+            self._register_thread(name)
+        profile = None
+        if self.cprofile_enabled and not in_main_thread:
+            profile = self._start_profile()
+        try:
+            with self.span(f"{name}.run", "thread"):
+                yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._dump_profile(profile, name)
+
+    def _dump_profile(self, profile, name):
+        file_name = f"{sanitize_filename(name)}_{threading.get_ident()}_{int(time.time())}.prof"
+        try:
+            profile.dump_stats(os.path.join(self.output_dir, file_name))
+        except Exception as e:
+            print(f"cProfile 저장 오류: {str(e)}")
+
+    def export(self, path=None, final=False):
+        """Chrome trace 이벤트 형식(JSON)으로 저장 후 경로 반환 (final이 아니면 cProfile은 계속 기록)"""
+        if not self.enabled:
+            return None
+        if path is None:
+            path = os.path.join(self.output_dir, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+
+        if self.main_profile is not None:
+            self.main_profile.disable()
+            self._dump_profile(self.main_profile, "MainThread")
+            if final:
+                self.main_profile = None
+            else:
+                try:
+                    self.main_profile.enable()  # 지금까지의 통계에 이어서 기록
+                except ValueError:
+                    self.main_profile = None
+
+        # 다른 스레드가 기록하는 중에도 일관된 복사본을 저장
+        with self.lock:
+            metadata = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": thread_id,
+                         "args": {"name": thread_name}}
+                        for thread_id, thread_name in self.thread_names.items()]
+            events = list(self.events)
+        trace = {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(trace, f)
+        except Exception as e:
+            print(f"추적 파일 저장 오류: {str(e)}")
+            return None
+        return path
+
+
+PROFILER = Profiler()
+
+
+def profiled(name, category="app"):
+    """함수 실행을 프로파일러 구간으로 기록하는 데코레이터 (비활성 시 컨텍스트 매니저 없이 바로 호출)"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profiled_thread(name):
+    """QThread.run 전체를 프로파일러 스레드 구간으로 기록하는 데코레이터"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.thread_run(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
 
 
 
@@ -144,6 +352,149 @@ class FFmpegManager:
         return self.ffprobe_path if self.ffprobe_path else "ffprobe"
 
 
+class CpuGovernor:
+    """동시에 실행되는 ffmpeg/ffprobe 프로세스에 CPU 자원을 나눠주는 관리자
+    
+    kind: 'encode'(다시 인코딩, CPU 사용 큼), 'remux'(코덱 복사), 'probe'(ffprobe)
+    인코딩 프로세스 수로 사용 가능한 코어를 나눠 -threads 값을 정하고, UI가 밀리지 않도록
+    우선순위를 낮춤. -threads는 ffmpeg를 시작할 때 정해져 바꿀 수 없으므로 프로세스가
+    시작/종료될 때마다 지금 몫보다 많은 스레드로 시작한 인코딩의 우선순위를 더 낮추거나
+    되돌리고, 코어 고정을 켜면 코어도 다시 나눔.
+    """
+    
+    NICE_LEVELS = {'encode': 10, 'remux': 5, 'probe': 5}
+    OVERSUBSCRIBED_NICE = 5  # 몫보다 많은 스레드로 실행 중인 인코딩에 더할 nice 값
+    
+    def __init__(self, reserve_cores=1, use_affinity=False):
+        if hasattr(os, 'sched_getaffinity'):
+            self.cpus = sorted(os.sched_getaffinity(0))
+        else:
+            self.cpus = list(range(os.cpu_count() or 1))
+        # UI/네트워크 스레드용 코어를 남겨둠 (코어가 적으면 전부 사용)
+        self.usable_cpus = self.cpus[reserve_cores:] if len(self.cpus) > reserve_cores + 1 else self.cpus
+        self.use_affinity = use_affinity and hasattr(os, 'sched_setaffinity')
+        self.processes = []  # (process, kind) 실행 중인 프로세스 (시작 순서)
+        self.threads = {}  # PID -> 시작할 때 정한 -threads 값 (인코딩만)
+        self.nice_levels = {}  # PID -> 현재 적용된 nice 값
+        self.pending_encodes = 0  # 시작 중인 인코딩 프로세스 수
+        self.lock = threading.Lock()
+    
+    def encode_count(self):
+        return self.pending_encodes + sum(1 for _, kind in self.processes if kind == 'encode')
+    
+    def thread_budget(self, encodes):
+        """인코딩 프로세스 하나가 쓸 스레드 수"""
+        return max(1, len(self.usable_cpus) // max(1, encodes))
+    
+    def _encode_slices(self):
+        """인코딩 프로세스마다 겹치지 않는 코어 묶음 (프로세스가 코어보다 많으면 돌려 씀)"""
+        encodes = [process for process, kind in self.processes if kind == 'encode']
+        size = self.thread_budget(len(encodes))
+        total = len(self.usable_cpus)
+        slices = {}
+        for number, process in enumerate(encodes):
+            start = (number * size) % total
+            slices[process.pid] = [self.usable_cpus[(start + offset) % total] for offset in range(size)]
+        return slices
+    
+    def _set_nice(self, process, nice):
+        """프로세스 우선순위 변경 (바뀔 때만 호출, 지원하지 않거나 종료된 프로세스는 무시)"""
+        if not hasattr(os, 'setpriority') or self.nice_levels.get(process.pid) == nice:
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS, process.pid, nice)
+            self.nice_levels[process.pid] = nice
+        except OSError:
+            pass
+    
+    def _rebalance(self):
+        """실행 중인 프로세스의 우선순위와 코어 배정을 다시 적용 (lock을 잡은 상태에서 호출)"""
+        budget = self.thread_budget(self.encode_count())
+        for process, kind in self.processes:
+            if kind == 'encode':
+                extra = self.OVERSUBSCRIBED_NICE if self.threads.get(process.pid, budget) > budget else 0
+                self._set_nice(process, self.NICE_LEVELS['encode'] + extra)
+        
+        if not self.use_affinity:
+            return
+        slices = self._encode_slices()
+        for process, kind in self.processes:
+            try:
+                os.sched_setaffinity(process.pid, slices.get(process.pid, self.usable_cpus))
+            except OSError:
+                pass  # 이미 종료된 프로세스
+    
+    def popen(self, command, kind='encode', **kwargs):
+        """배분을 적용해 프로세스 시작 (끝나면 release 호출)"""
+        with self.lock:
+            if kind == 'encode':
+                self.pending_encodes += 1
+                threads = self.thread_budget(self.encode_count())
+            else:
+                threads = None
+        if threads:
+            # 출력 파일 바로 앞에 두어 인코더 스레드 수로 적용
+            command = command[:-1] + ['-threads', str(threads), command[-1]]
+        if os.name == 'nt':
+            kwargs.setdefault('creationflags', subprocess.BELOW_NORMAL_PRIORITY_CLASS)
+        try:
+            process = subprocess.Popen(command, **kwargs)
+        finally:
+            if kind == 'encode':
+                with self.lock:
+                    self.pending_encodes -= 1
+        
+        with self.lock:
+            if self.NICE_LEVELS.get(kind):
+                self._set_nice(process, self.NICE_LEVELS[kind])
+            self.processes.append((process, kind))
+            if threads:
+                self.threads[process.pid] = threads
+            self._rebalance()
+        return process
+    
+    def release(self, process):
+        """끝난 프로세스를 빼고 남은 프로세스에 코어를 다시 나눔"""
+        with self.lock:
+            self.processes = [(other, kind) for other, kind in self.processes if other is not process]
+            self.threads.pop(process.pid, None)
+            self.nice_levels.pop(process.pid, None)
+            self._rebalance()
+    
+    def run(self, command, kind='probe', capture_output=False, **kwargs):
+        """subprocess.run과 같은 방식으로 실행"""
+        if capture_output:
+            kwargs['stdout'] = kwargs['stderr'] = subprocess.PIPE
+        process = self.popen(command, kind, **kwargs)
+        try:
+            stdout, stderr = process.communicate()
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            self.release(process)
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+    
+    def summary(self):
+        """현재 배분 상태 문자열"""
+        with self.lock:
+            encodes = self.encode_count()
+            return (f"코어 {len(self.usable_cpus)}/{len(self.cpus)}개 사용, 인코딩 {encodes}개, "
+                    f"프로세스당 {self.thread_budget(encodes)}스레드")
+
+
+_cpu_governor = None
+
+
+def get_cpu_governor(reserve_cores=1, use_affinity=False):
+    """공유 CPU 관리자 반환 (처음 호출할 때의 설정으로 생성)"""
+    global _cpu_governor
+    if _cpu_governor is None:
+        _cpu_governor = CpuGovernor(reserve_cores, use_affinity)
+    return _cpu_governor
+
+
 class GitHubUpdateChecker(QThread):
     """GitHub에서 업데이트 확인을 위한 스레드"""
     update_available = pyqtSignal(str, str, str)  # 새 버전, 다운로드 URL, 변경 내역
@@ -154,10 +505,11 @@ class GitHubUpdateChecker(QThread):
         self.repo_owner = repo_owner
         self.repo_name = repo_name
         
+    @profiled_thread("GitHubUpdateChecker")
     def run(self):
         try:
             # GitHub API를 통해 최신 릴리스 정보 가져오기
-            api_url = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/releases/latest"
+            api_url = f"{GITHUB_API_URL}/repos/{self.repo_owner}/{self.repo_name}/releases/latest"
             response = requests.get(api_url, timeout=10)
             
             if response.status_code == 200:
@@ -201,6 +553,7 @@ class DirectUpdater(QThread):
         self.download_url = download_url
         self.current_file = current_file  # 현재 실행 중인 파일 경로
     
+    @profiled_thread("DirectUpdater")
     def run(self):
         try:
             self.progress_update.emit("업데이트 시작...", 0)
@@ -389,241 +742,2470 @@ def format_time(seconds):
         return f"{seconds}초"
 
 
-class FFmpegThread(QThread):
-    """ffmpeg 처리를 위한 스레드"""
-    progress_update = pyqtSignal(str)
-    progress_percent = pyqtSignal(int)  # 백분율 진행 상황
-    conversion_finished = pyqtSignal(bool, str, str)  # 성공여부, 메시지, 파일경로
+def sanitize_filename(filename):
+    """파일명에 사용할 수 없는 문자 제거"""
+    # 파일명으로 사용할 수 없는 문자 제거
+    invalid_chars = r'[\\/*?:"<>|]'
+    sanitized = re.sub(invalid_chars, '', filename)
+    # 긴 파일명은 축약
+    if len(sanitized) > 50:
+        sanitized = sanitized[:47] + '...'
+    return sanitized
+
+
+@profiled("html.parse", "parse")
+def extract_m3u8_from_html(html_file_path):
+    """저장된 HTML 파일에서 (페이지 제목, m3u8 URL 목록) 추출"""
+    # 여러 인코딩을 시도
+    encodings = ['utf-8', 'cp949', 'euc-kr']
+    html_content = None
     
-    def __init__(self, m3u8_url, output_path, output_format, ffmpeg_manager):
-        super().__init__()
-        self.m3u8_url = m3u8_url
-        self.output_path = output_path
-        self.output_format = output_format
-        self.duration_ms = None  # 총 재생 시간 (밀리초)
-        self.ffmpeg_manager = ffmpeg_manager
-        
-    def run(self):
+    for encoding in encodings:
         try:
-            # 먼저 duration 정보 가져오기
-            self.get_duration()
-            
-            # 출력 형식에 따른 명령어 설정
-            ffmpeg_cmd = self.ffmpeg_manager.get_ffmpeg_command()
-            
-            if self.output_format == 'mp3':
-                # MP3로 변환할 때는 오디오만 추출
-                command = [
-                    ffmpeg_cmd,
-                    '-i', self.m3u8_url,
-                    '-b:a', '192k',  # 기본 비트레이트
-                    '-codec:a', 'libmp3lame',  # MP3 인코더 사용
-                    self.output_path
-                ]
-            else:
-                # MP4로 변환 (기본 방식)
-                command = [
-                    ffmpeg_cmd,
-                    '-i', self.m3u8_url,
-                    '-c', 'copy',  # 코덱 복사
-                    '-bsf:a', 'aac_adtstoasc',  # AAC 필터
-                    self.output_path
-                ]
-                
-            self.progress_update.emit(f"실행 명령어: {' '.join(command)}")
-            
-            # 프로세스 실행 및 출력 캡처 (인코딩 명시)
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                encoding='utf-8',
-                errors='replace'
-            )
+            with open(html_file_path, 'r', encoding=encoding) as file:
+                html_content = file.read()
+            break  # 성공적으로 읽었으면 반복 중단
+        except UnicodeDecodeError:
+            continue
             
-            # 출력 모니터링
-            while process.poll() is None:
-                output = process.stderr.readline()
-                if output:
-                    self.progress_update.emit(output.strip())
-                    
-                    # 진행률 추출 및 업데이트
-                    if self.duration_ms:
-                        time_match = re.search(r'time=(\d+):(\d+):(\d+)\.(\d+)', output)
-                        if time_match:
-                            hours, minutes, seconds, ms = map(int, time_match.groups())
-                            current_ms = hours * 3600000 + minutes * 60000 + seconds * 1000 + ms * 10
-                            percent = min(int(current_ms / self.duration_ms * 100), 100)
-                            self.progress_percent.emit(percent)
-            
-            # 완료 확인
-            return_code = process.poll()
-            if return_code == 0:
-                self.progress_percent.emit(100)  # 완료 시 100%로 설정
-                self.conversion_finished.emit(True, "변환 완료!", self.output_path)
-            else:
-                try:
-                    error_output = process.stderr.read()
-                    self.conversion_finished.emit(False, f"변환 실패: {error_output}", "")
-                except UnicodeDecodeError:
-                    self.conversion_finished.emit(False, "변환 실패: 인코딩 오류가 발생했습니다", "")
-                    
-        except Exception as e:
-            self.conversion_finished.emit(False, f"오류 발생: {str(e)}", "")
+    if html_content is None:
+        raise Exception("HTML 파일을 읽을 수 없습니다. 지원되지 않는 인코딩입니다.")
+        
+    # BeautifulSoup으로 파싱
+    soup = BeautifulSoup(html_content, 'html.parser')
     
-    def get_duration(self):
-        """미디어 파일의 총 재생 시간을 가져옵니다."""
-        try:
-            ffprobe_cmd = self.ffmpeg_manager.get_ffprobe_command()
-            
-            command = [ffprobe_cmd, '-v', 'error', '-show_entries', 'format=duration', 
-                      '-of', 'default=noprint_wrappers=1:nokey=1', self.m3u8_url]
-            
-            result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace')
-            
-            if result.returncode == 0 and result.stdout.strip():
-                # 초 단위 -> 밀리초 단위로 변환
-                try:
-                    duration_sec = float(result.stdout.strip())
-                    self.duration_ms = int(duration_sec * 1000)
-                    self.progress_update.emit(f"총 재생 시간: {format_time(duration_sec)}")
-                except ValueError:
-                    self.progress_update.emit("재생 시간을 파싱할 수 없습니다.")
-            else:
-                self.progress_update.emit("재생 시간을 가져올 수 없습니다.")
-        except Exception as e:
-            self.progress_update.emit(f"재생 시간 정보 가져오기 오류: {str(e)}")
+    # 페이지 제목 추출 (자동 파일명 생성용)
+    title_tag = soup.find('title')
+    if title_tag and title_tag.string:
+        page_title = sanitize_filename(title_tag.string.strip())
+    else:
+        # 제목이 없으면 HTML 파일명을 기반으로 제목 설정
+        page_title = sanitize_filename(os.path.splitext(os.path.basename(html_file_path))[0])
+    
+    # m3u8 URL 정규식 패턴
+    m3u8_pattern = r'https?://[^\s\'\"]+\.m3u8[^\s\'\"]*'
+    
+    # HTML에서 스크립트와 소스 속성 검색
+    m3u8_urls = []
+    
+    # 스크립트 내용에서 검색
+    for script in soup.find_all('script'):
+        if script.string:
+            urls = re.findall(m3u8_pattern, script.string)
+            m3u8_urls.extend(urls)
+    
+    # 소스 태그에서 검색
+    for source in soup.find_all('source'):
+        if source.get('src'):
+            url = source.get('src')
+            if '.m3u8' in url:
+                m3u8_urls.append(url)
+    
+    # video 태그에서 검색
+    for video in soup.find_all('video'):
+        if video.get('src'):
+            url = video.get('src')
+            if '.m3u8' in url:
+                m3u8_urls.append(url)
+    
+    # 전체 HTML 텍스트에서 추가 검색
+    additional_urls = re.findall(m3u8_pattern, html_content)
+    m3u8_urls.extend(additional_urls)
+    
+    # 중복 제거 (발견 순서 유지)
+    return page_title, list(dict.fromkeys(m3u8_urls))
 
 
-class GitHubUpdaterManager:
-    """GitHub 업데이트 관리자"""
+class JsonArrayStream:
+    """큰 JSON 파일에서 지정한 경로의 배열 항목만 하나씩 꺼내는 스트리밍 파서
     
-    def __init__(self, parent):
-        """
-        parent: 부모 윈도우 (QMainWindow)
-        """
-        self.parent = parent
-        
-    def check_for_updates(self, silent=False):
-        """업데이트 확인 시작"""
-        self.checker = GitHubUpdateChecker(APP_VERSION, GITHUB_OWNER, GITHUB_REPO)
-        self.checker.update_available.connect(
-            lambda version, url, notes: self.on_update_available(version, url, notes, silent)
-        )
-        self.checker.start()
+    json.load처럼 파일 전체를 메모리에 올리지 않고, 청크 단위로 읽으면서 구조 문자만
+    따라가다가 대상 배열의 항목 하나가 끝날 때마다 그 부분만 json.loads 함.
+    메모리 사용량은 파일 크기가 아니라 가장 큰 항목 하나의 크기에 비례함.
+    """
     
-    def on_update_available(self, new_version, download_url, release_notes, silent):
-        """새 업데이트가 있을 때 호출"""
-        # silent 파라미터를 무시하고 항상 업데이트 대화상자 표시
-        detail_text = f"변경 사항:\n\n{release_notes}" if release_notes else ""
-        
-        msg_box = QMessageBox(self.parent)
-        msg_box.setWindowTitle("업데이트 가능")
-        msg_box.setText(f"새 버전({new_version})이 있습니다. 현재 버전: {APP_VERSION}")
-        msg_box.setInformativeText(
-            "지금 업데이트하시겠습니까?\n\n"
-            "업데이트가 완료되면 프로그램을 재시작해야 합니다."
-        )
-        if detail_text:
-            msg_box.setDetailedText(detail_text)
-        msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-        msg_box.setDefaultButton(QMessageBox.Yes)
-        
-        if msg_box.exec() == QMessageBox.Yes:
-            self.parent.status_text.append(f"새 버전 v{new_version} 업데이트를 시작합니다...")
-            self._start_update(download_url, new_version)
+    STRUCTURE = re.compile(r'[{}\[\]",:]')
     
-    def _start_update(self, download_url, version):
-        """업데이트 시작"""
-        # 현재 스크립트 경로
-        current_file = os.path.abspath(sys.argv[0])
-        
-        # 중복 인스턴스 확인
-        try:
-            script_name = os.path.basename(current_file)
-            import psutil
-            
-            count = 0
-            for proc in psutil.process_iter(['name', 'cmdline']):
-                try:
-                    cmdline = proc.info.get('cmdline', [])
-                    if len(cmdline) > 1 and script_name in cmdline[-1]:
-                        count += 1
-                except:
-                    pass
-                    
-            if count > 1:
-                QMessageBox.warning(
-                    self.parent,
-                    "업데이트 불가",
-                    "이 프로그램의 다른 인스턴스가 실행 중입니다.\n모든 인스턴스를 종료한 후에 업데이트를 진행해주세요."
-                )
-                return
-        except:
-            pass  # psutil 모듈이 없어도 계속 진행
-        
-        # 업데이트 스레드 시작
-        self.updater = DirectUpdater(download_url, current_file)
-        self.updater.progress_update.connect(self.parent.show_update_progress)
-        self.updater.update_completed.connect(self.on_update_completed)
-        self.updater.start()
+    def __init__(self, file, targets, chunk_size=1024 * 1024):
+        self.file = file  # 바이너리 모드 파일
+        self.targets = set(targets)  # 항목을 꺼낼 배열 경로, 예: ('log', 'entries')
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.buffer = ""
+        self.base = 0  # buffer[0]의 (디코딩된 문자열 기준) 절대 위치
+        self.keep = 0  # 이 절대 위치 앞부분은 더 필요 없음
+        self.eof = False
+    
+    def _read_more(self):
+        """필요 없는 앞부분을 버리고 버퍼에 다음 청크 추가 (더 없으면 False)
         
-        self.parent.status_text.append("업데이트 파일 다운로드 중...")
+        버퍼 복사는 청크를 읽을 때만 일어나므로 항목 수와 관계없이 청크당 한 번임."""
+        if self.eof:
+            return False
+        if self.keep > self.base:
+            self.buffer = self.buffer[self.keep - self.base:]
+            self.base = self.keep
+        data = self.file.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            self.buffer += self.decoder.decode(b"", final=True)
+            return False
+        self.buffer += self.decoder.decode(data)
+        return True
     
-    def on_update_completed(self, success, message):
-        """업데이트 완료 처리"""
-        if success:
-            result = QMessageBox.information(
-                self.parent,
-                "업데이트 준비 완료",
-                f"{message}\n\n지금 프로그램을 종료하고 업데이트를 진행하시겠습니까?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.Yes
-            )
+    def _string_end(self, start):
+        """start의 여는 따옴표와 짝이 되는 닫는 따옴표 위치 (절대 위치, 버퍼가 부족하면 더 읽음)"""
+        position = start + 1
+        while True:
+            end = self.buffer.find('"', position - self.base)
+            if end == -1:
+                position = self.base + len(self.buffer)
+                if not self._read_more():
+                    raise ValueError("JSON 문자열이 끝나지 않았습니다.")
+                # 청크 경계의 역슬래시는 다음 따옴표와 함께 다시 판단
+                while position > start + 1 and self.buffer[position - 1 - self.base] == '\\':
+                    position -= 1
+                continue
+            end += self.base
+            backslashes = 0
+            while self.buffer[end - 1 - backslashes - self.base] == '\\':
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return end
+            position = end + 1
+    
+    def __iter__(self):
+        """(배열 경로, 항목) 순서대로 반환"""
+        stack = []  # [종류('{' 또는 '['), 경로, 마지막 키]
+        key_expected = False
+        item_start = None  # 꺼내는 중인 항목의 시작 위치
+        item_depth = None
+        position = 0  # 위치는 모두 파일 처음부터의 절대 위치 (버퍼 앞부분을 버려도 바뀌지 않음)
+        self._read_more()
+        if self.buffer.startswith('\ufeff'):
+            self.buffer = self.buffer[1:]
         
-            if result == QMessageBox.Yes:
-                # 현재 디렉토리의 update.bat 실행 후 프로그램 종료
-                update_bat = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), "update.bat")
-                if os.path.exists(update_bat):
-                    subprocess.Popen([update_bat], shell=True)
-                    QApplication.quit()  # 프로그램 종료
-        else:
-            QMessageBox.warning(self.parent, "업데이트 실패", message)
+        while True:
+            # 꺼내는 중인 항목이 없으면 현재 위치 앞부분은 다음에 읽을 때 버림
+            self.keep = item_start if item_start is not None else position
+            match = self.STRUCTURE.search(self.buffer, position - self.base)
+            if match is None:
+                position = self.base + len(self.buffer)
+                if item_start is None:
+                    self.keep = position
+                if not self._read_more():
+                    return
+                continue
+            
+            char = match.group()
+            index = match.start() + self.base
+            if char == '"':
+                end = self._string_end(index)
+                if key_expected and item_start is None:
+                    stack[-1][2] = json.loads(self.buffer[index - self.base:end + 1 - self.base])
+                key_expected = False
+                position = end + 1
+                continue
+            
+            position = index + 1
+            if char == ':':
+                continue
+            if char == ',':
+                key_expected = bool(stack) and stack[-1][0] == '{'
+                continue
+            
+            if char in '{[':
+                if stack:
+                    parent_kind, parent_path, parent_key = stack[-1]
+                    path = parent_path + (parent_key,) if parent_kind == '{' else parent_path
+                    if item_start is None and parent_kind == '[' and parent_path in self.targets:
+                        item_start, item_depth = index, len(stack)
+                else:
+                    path = ()
+                stack.append([char, path, None])
+                key_expected = char == '{'
+                continue
+            
+            # '}' 또는 ']'
+            array_path = stack[-2][1] if len(stack) > 1 else None
+            stack.pop()
+            key_expected = False
+            if item_start is not None and len(stack) == item_depth:
+                yield array_path, json.loads(self.buffer[item_start - self.base:position - self.base])
+                item_start = item_depth = None
 
-class CoursemosDownloader(QMainWindow):
-    """Coursemos 다운로더 메인 윈도우"""
+
+# HAR에서 찾은 강의 하나 (m3u8 후보 URL 목록, 페이지 제목, 처음 요청 시각)
+HarLecture = namedtuple('HarLecture', ['title', 'urls', 'timestamp'])
+
+
+def har_group_key(groups, pageref, folder):
+    """m3u8 요청이 속할 강의 묶음 키 (같은 페이지에서 폴더가 같거나 상위/하위 폴더면 기존 묶음 사용)"""
+    for key in groups:
+        if key[0] == pageref and (f"{folder}/".startswith(f"{key[1]}/") or f"{key[1]}/".startswith(f"{folder}/")):
+            return key
+    return (pageref, folder)
+
+
+@profiled("har.parse", "parse")
+def extract_lectures_from_har(har_file_path):
+    """브라우저 HAR 내보내기 파일에서 페이지별 m3u8 요청을 모아 강의 목록으로 반환"""
+    pages = {}  # 페이지 ID -> 제목
+    groups = {}  # (페이지 ID, 호스트를 뺀 m3u8 폴더) -> [처음 요청 시각, URL 목록]
     
-    def __init__(self):
-        super().__init__()
-        self.m3u8_urls = []
-        self.selected_url = None
-        self.ffmpeg_thread = None
-        self.save_folder = os.path.expanduser("~/Downloads")  # 기본 다운로드 폴더
-        self.settings = QSettings("CoursemosDownloader", "Settings")
-        self.load_settings()
-        
-        # ffmpeg 관리자 초기화
-        self.ffmpeg_manager = FFmpegManager()
-        
-        # 로고 설정
-        icon_path = self.resource_path("logo.png")  # 로고 파일 경로
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
-        
-        self.init_ui()
-        
-        # 업데이트 관리자 초기화
-        self.updater_manager = GitHubUpdaterManager(self)
-        
-        # 앱 시작 시 자동 업데이트 확인
-        QTimer.singleShot(1000, lambda: self.updater_manager.check_for_updates())
+    with open(har_file_path, 'rb') as f:
+        for path, item in JsonArrayStream(f, [('log', 'pages'), ('log', 'entries')]):
+            if path == ('log', 'pages'):
+                pages[item.get('id')] = item.get('title') or ""
+                continue
+            
+            request = item.get('request') or {}
+            url = request.get('url') or ""
+            status = (item.get('response') or {}).get('status') or 0
+            if not url.startswith('http') or '.m3u8' not in urlparse(url).path or status >= 400:
+                continue
+            # 같은 페이지의 여러 영상은 나누고, 호스트만 다른 미러와 마스터/변형 플레이리스트는 한 강의로 묶음
+            group_key = har_group_key(groups, item.get('pageref'), urlparse(url).path.rsplit('/', 1)[0])
+            group = groups.setdefault(group_key, [item.get('startedDateTime') or "", []])
+            if url not in group[1]:
+                group[1].append(url)
     
-    def resource_path(self, relative_path):
-        """애플리케이션 리소스 파일의 절대 경로를 반환합니다.
-        PyInstaller로 패키징된 경우와 일반 Python 실행 시 모두 작동합니다."""
+    lectures = []
+    used_titles = {}
+    for group_key, (timestamp, urls) in sorted(groups.items(), key=lambda item: item[1][0]):
+        title = sanitize_filename(pages.get(group_key[0], "").strip())
+        if not title:
+            title = "lecture_" + re.sub(r'[^0-9]', '', timestamp)[:14]
+        # 같은 제목의 페이지가 여러 개면 번호를 붙여 파일이 겹치지 않게 함
+        used_titles[title] = used_titles.get(title, 0) + 1
+        if used_titles[title] > 1:
+            title = f"{title}_{used_titles[title]}"
+        lectures.append(HarLecture(title, urls, timestamp))
+    return lectures
+
+
+def har_job_specs(har_file_path, base_spec):
+    """HAR의 강의마다 작업 명세 생성 (base_spec의 형식/구간 등 옵션을 그대로 사용)"""
+    specs = []
+    for lecture in extract_lectures_from_har(har_file_path):
+        spec = dict(base_spec)
+        spec.pop('har', None)
+        spec['candidates'] = lecture.urls
+        spec['title'] = lecture.title
+        spec['recorded_at'] = lecture.timestamp
+        specs.append(spec)
+    return specs
+
+
+def parse_time_value(text):
+    """HH:MM:SS(.ms), MM:SS 또는 초 단위 문자열을 초로 변환"""
+    parts = text.strip().split(':')
+    if not text.strip() or len(parts) > 3:
+        raise ValueError(f"시간 형식이 올바르지 않습니다: {text}")
+    seconds = 0.0
+    for part in parts:
         try:
-            # PyInstaller가 생성한 임시 폴더 경로
+            seconds = seconds * 60 + float(part)
+        except ValueError:
+            raise ValueError(f"시간 형식이 올바르지 않습니다: {text}") from None
+    if seconds < 0:
+        raise ValueError(f"시간은 0 이상이어야 합니다: {text}")
+    return seconds
+
+
+def clip_file_suffix(start_time, end_time):
+    """구간 다운로드 파일명에 붙일 접미사 (예: _00-10-00~00-20-00)"""
+    def stamp(seconds):
+        seconds = int(seconds)
+        return f"{seconds // 3600:02d}-{seconds % 3600 // 60:02d}-{seconds % 60:02d}"
+    
+    start = stamp(start_time or 0)
+    end = stamp(end_time) if end_time is not None else "end"
+    return f"_{start}~{end}"
+
+
+def get_app_data_dir():
+    """앱 데이터(로그 등) 저장 경로 반환"""
+    base_dir = QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation)
+    if not base_dir:
+        base_dir = os.path.expanduser("~")
+    app_dir = os.path.join(base_dir, "CoursemosDownloader")
+    os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+
+# 로그 항목 (시각, 레벨, 작업 ID, 메시지)
+LogEntry = namedtuple('LogEntry', ['timestamp', 'level', 'job', 'message'])
+
+# 로그 레벨 (표시 이름, 레벨 값)
+LOG_LEVELS = [
+    ("DEBUG", logging.DEBUG),
+    ("INFO", logging.INFO),
+    ("WARNING", logging.WARNING),
+    ("ERROR", logging.ERROR),
+]
+
+# 레벨별 표시 색상
+LOG_LEVEL_COLORS = {
+    logging.DEBUG: "#777777",
+    logging.INFO: "#000000",
+    logging.WARNING: "#b36b00",
+    logging.ERROR: "#c0392b",
+}
+
+# 앱 전반의 메시지에 사용하는 작업 ID
+APP_LOG_JOB = "app"
+
+
+class JobLogFiles:
+    """작업별 회전 로그 파일 관리 클래스
+
+    write()/close()는 큐에 넣기만 하고 실제 파일 기록은 QueueListener 스레드에서
+    하므로 UI 스레드가 디스크 I/O를 기다리지 않습니다."""
+
+    def __init__(self, log_dir, max_bytes=5 * 1024 * 1024, backup_count=3):
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.handlers = {}  # 작업 ID -> RotatingFileHandler (리스너 스레드에서만 사용, 전역 로거 목록에 등록하지 않음)
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.queue = queue.Queue()
+        self.queue_handler = QueueHandler(self.queue)
+        self.listener = QueueListener(self.queue, JobLogRouter(self))
+        self.listener.start()
+        self.stopped = False
+        atexit.register(self.close_all)
+
+    def _get_handler(self, job):
+        """작업 ID에 해당하는 파일 핸들러 반환 (없으면 생성)"""
+        handler = self.handlers.get(job)
+        if handler is None:
+            file_name = re.sub(r'[\\/*?:"<>|\s]', '_', job) + ".log"
+            handler = RotatingFileHandler(
+                os.path.join(self.log_dir, file_name),
+                maxBytes=self.max_bytes,
+                backupCount=self.backup_count,
+                encoding='utf-8',
+                delay=True
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+            self.handlers[job] = handler
+        return handler
+
+    def _enqueue(self, job, level, message, timestamp, close=False):
+        record = logging.LogRecord(f"coursemos.job.{job}", level, "", 0, message, None, None)
+        record.created = timestamp
+        record.msecs = (timestamp - int(timestamp)) * 1000
+        record.job = job
+        record.close_job = close
+        self.queue_handler.handle(record)
+
+    def write(self, entry):
+        """로그 항목을 작업별 파일 기록 큐에 추가"""
+        if self.stopped:
+            return
+        self._enqueue(entry.job, entry.level, entry.message, entry.timestamp)
+
+    def close(self, job):
+        """작업이 끝나면 앞서 넣은 항목을 모두 기록한 뒤 해당 파일 핸들러를 닫음"""
+        if self.stopped:
+            return
+        self._enqueue(job, logging.INFO, "", time.time(), close=True)
+
+    def _close_handler(self, job):
+        handler = self.handlers.pop(job, None)
+        if handler:
+            handler.close()
+
+    def close_all(self):
+        """남은 항목을 모두 기록하고 리스너와 파일 핸들러 종료"""
+        if self.stopped:
+            return
+        self.stopped = True
+        self.listener.stop()
+        for job in list(self.handlers):
+            self._close_handler(job)
+
+
+class JobLogRouter(logging.Handler):
+    """큐에서 꺼낸 레코드를 작업별 파일 핸들러로 전달 (QueueListener 스레드에서 실행)"""
+
+    def __init__(self, log_files):
+        super().__init__()
+        self.log_files = log_files
+
+    def emit(self, record):
+        try:
+            if record.close_job:
+                self.log_files._close_handler(record.job)
+            else:
+                self.log_files._get_handler(record.job).handle(record)
+        except Exception as e:
+            print(f"로그 파일 기록 오류: {str(e)}")
+
+
+class LogListModel(QAbstractListModel):
+    """고정 크기 링 버퍼 기반 로그 모델
+
+    메모리에는 최근 capacity개의 항목만 유지하고, 추가된 항목은 타이머로 모아서
+    한 번에 반영하므로 로그 양과 관계없이 추가 비용이 일정합니다."""
+    jobs_dropped = pyqtSignal(list)  # 링 버퍼에 더 이상 항목이 남지 않은 작업 ID 목록
+
+    def __init__(self, capacity=5000, flush_interval_ms=100, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self.entries = deque(maxlen=capacity)  # 전체 항목 (링 버퍼)
+        self.job_counts = {}  # 작업 ID -> 링 버퍼에 남은 항목 수
+        self.visible = deque()  # 필터를 통과한 항목
+        self.pending = []  # 아직 뷰에 반영되지 않은 항목
+        self.min_level = logging.DEBUG
+        self.job_filter = None  # None이면 모든 작업 표시
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(flush_interval_ms)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.visible):
+            return None
+        entry = self.visible[index.row()]
+        if role == Qt.DisplayRole:
+            return f"[{time.strftime('%H:%M:%S', time.localtime(entry.timestamp))}] {entry.message}"
+        if role == Qt.ForegroundRole:
+            return QColor(LOG_LEVEL_COLORS.get(entry.level, "#000000"))
+        if role == Qt.ToolTipRole:
+            return f"{logging.getLevelName(entry.level)} / {entry.job}"
+        return None
+
+    def _matches(self, entry):
+        """현재 필터 조건과 일치하는지 확인"""
+        if entry.level < self.min_level:
+            return False
+        return self.job_filter is None or entry.job == self.job_filter
+
+    def append(self, entry):
+        """항목 추가 (다음 flush 때 뷰에 반영)"""
+        self.pending.append(entry)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    @profiled("ui.log_flush", "ui")
+    def flush(self):
+        """대기 중인 항목을 링 버퍼와 뷰에 반영"""
+        self.flush_timer.stop()
+        if not self.pending:
+            return
+
+        # 버퍼보다 많이 쌓였으면 어차피 밀려날 앞부분은 버림 (작업별 항목 수에는 반영)
+        self._count_jobs(self.pending, len(self.entries) + len(self.pending) - self.capacity)
+        pending = self.pending[-self.capacity:]
+        self.pending = []
+
+        # 링 버퍼에서 밀려나는 항목 중 화면에 보이던 것 제거
+        overflow = len(self.entries) + len(pending) - self.capacity
+        evicted_visible = 0
+        if overflow > 0:
+            for i in range(min(overflow, len(self.entries))):
+                if evicted_visible < len(self.visible) and self.visible[evicted_visible] is self.entries[i]:
+                    evicted_visible += 1
+
+        if evicted_visible:
+            self.beginRemoveRows(QModelIndex(), 0, evicted_visible - 1)
+            for _ in range(evicted_visible):
+                self.visible.popleft()
+            self.endRemoveRows()
+
+        new_visible = [entry for entry in pending if self._matches(entry)]
+        self.entries.extend(pending)
+
+        # 새 항목이 pending 내부에서 서로 밀어낸 경우를 고려해 표시 항목 수도 제한
+        new_visible = new_visible[-self.capacity:]
+        if new_visible:
+            start = len(self.visible)
+            self.beginInsertRows(QModelIndex(), start, start + len(new_visible) - 1)
+            self.visible.extend(new_visible)
+            self.endInsertRows()
+
+    def _count_jobs(self, pending, overflow):
+        """작업별 항목 수 갱신 후 항목이 모두 밀려난 작업 알림 (pending을 자르기 전에 호출)"""
+        for entry in pending:
+            self.job_counts[entry.job] = self.job_counts.get(entry.job, 0) + 1
+        dropped = []
+        if overflow > 0:
+            # 기존 항목, 그다음 새 항목 순서로 앞에서부터 밀려남
+            for entry in islice(chain(self.entries, pending), overflow):
+                self.job_counts[entry.job] -= 1
+                if not self.job_counts[entry.job]:
+                    del self.job_counts[entry.job]
+                    dropped.append(entry.job)
+        if dropped:
+            self.jobs_dropped.emit(dropped)
+
+    def set_filter(self, min_level, job_filter):
+        """레벨/작업 필터 변경 (사용자 조작 시에만 전체 재계산)"""
+        self.flush()
+        self.beginResetModel()
+        self.min_level = min_level
+        self.job_filter = job_filter
+        self.visible = deque(entry for entry in self.entries if self._matches(entry))
+        self.endResetModel()
+
+    def clear(self):
+        """메모리의 로그 항목 모두 삭제 (파일은 유지)"""
+        self.beginResetModel()
+        self.pending = []
+        self.entries.clear()
+        self.visible.clear()
+        self.endResetModel()
+        dropped = list(self.job_counts)
+        self.job_counts = {}
+        if dropped:
+            self.jobs_dropped.emit(dropped)
+
+
+_http_session = None
+
+
+def get_http_session():
+    """공유 HTTP 세션 반환 (연결 재사용)"""
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        _http_session.mount('http://', adapter)
+        _http_session.mount('https://', adapter)
+    return _http_session
+
+
+# HLS 마스터 플레이리스트의 화질 정보 (대역폭, 해상도, URL)
+HlsVariant = namedtuple('HlsVariant', ['bandwidth', 'resolution', 'url'])
+
+# HLS 암호화 키 정보 (방식, 키 URI, IV 16진수 문자열 또는 None)
+HlsKey = namedtuple('HlsKey', ['method', 'uri', 'iv'])
+
+# HLS 미디어 세그먼트 (순번, URL, 길이(초), 시작 시각(초), 미디어 시퀀스 번호, HlsKey 또는 None)
+HlsSegment = namedtuple('HlsSegment', ['index', 'url', 'duration', 'start', 'sequence', 'key'])
+
+
+def parse_m3u8_attributes(text):
+    """KEY=VALUE,KEY="VALUE" 형식의 m3u8 태그 속성 파싱"""
+    attributes = {}
+    for match in re.finditer(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)', text):
+        attributes[match.group(1)] = match.group(2).strip('"')
+    return attributes
+
+
+class M3U8Playlist:
+    """m3u8 플레이리스트 파싱 클래스"""
+
+    # 직접 세그먼트를 이어 붙이는 방식으로 처리할 수 없는 태그
+    UNSUPPORTED_TAGS = ('#EXT-X-BYTERANGE', '#EXT-X-MAP')
+
+    def __init__(self, url, text):
+        self.url = url
+        self.variants = []  # HlsVariant 목록 (마스터 플레이리스트)
+        self.segments = []  # HlsSegment 목록 (미디어 플레이리스트)
+        self.media_sequence = 0
+        self.target_duration = None
+        self.unsupported_tags = set()
+        self.bandwidth = None  # 마스터 플레이리스트에서 선택된 화질의 대역폭 (bps)
+        self.parse(text)
+
+    @property
+    def is_master(self):
+        return bool(self.variants)
+
+    @property
+    def total_duration(self):
+        """#EXTINF 길이의 합 (초)"""
+        return sum(segment.duration for segment in self.segments)
+
+    @property
+    def is_encrypted(self):
+        return any(segment.key is not None for segment in self.segments)
+
+    @property
+    def is_native_supported(self):
+        """세그먼트를 직접 받아 이어 붙일 수 있는 플레이리스트인지 확인"""
+        if not self.segments or self.unsupported_tags:
+            return False
+        for segment in self.segments:
+            if segment.key is not None and (segment.key.method != 'AES-128' or not HAS_CRYPTOGRAPHY):
+                return False
+        return True
+
+    def parse(self, text):
+        """플레이리스트 텍스트 파싱"""
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if not lines or not lines[0].startswith('#EXTM3U'):
+            raise ValueError("m3u8 플레이리스트 형식이 아닙니다.")
+
+        pending_duration = None
+        pending_variant = None
+        current_key = None  # 키 교체(rotation) 시 이후 세그먼트부터 새 키 적용
+        start = 0.0
+
+        for line in lines[1:]:
+            if line.startswith('#EXT-X-STREAM-INF:'):
+                pending_variant = parse_m3u8_attributes(line.split(':', 1)[1])
+            elif line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+                self.media_sequence = int(line.split(':', 1)[1])
+            elif line.startswith('#EXT-X-TARGETDURATION:'):
+                self.target_duration = float(line.split(':', 1)[1])
+            elif line.startswith('#EXTINF:'):
+                pending_duration = float(line.split(':', 1)[1].split(',')[0])
+            elif line.startswith('#EXT-X-KEY:'):
+                attributes = parse_m3u8_attributes(line.split(':', 1)[1])
+                method = attributes.get('METHOD', 'NONE')
+                if method == 'NONE':
+                    current_key = None
+                else:
+                    key_uri = urljoin(self.url, attributes['URI']) if 'URI' in attributes else None
+                    current_key = HlsKey(method, key_uri, attributes.get('IV'))
+            elif line.startswith(self.UNSUPPORTED_TAGS):
+                self.unsupported_tags.add(line.split(':', 1)[0])
+            elif line.startswith('#EXT-X-MEDIA:') and 'URI=' in line:
+                # 별도 오디오/자막 트랙은 ffmpeg에 맡김
+                self.unsupported_tags.add('#EXT-X-MEDIA')
+            elif line.startswith('#'):
+                continue
+            else:
+                url = urljoin(self.url, line)
+                if pending_variant is not None:
+                    bandwidth = int(pending_variant.get('BANDWIDTH', 0) or 0)
+                    self.variants.append(HlsVariant(bandwidth, pending_variant.get('RESOLUTION', ''), url))
+                    pending_variant = None
+                elif pending_duration is not None:
+                    index = len(self.segments)
+                    self.segments.append(
+                        HlsSegment(index, url, pending_duration, start, self.media_sequence + index, current_key)
+                    )
+                    start += pending_duration
+                    pending_duration = None
+
+    @classmethod
+    def fetch(cls, url, session=None, timeout=15):
+        """URL에서 플레이리스트를 받아 파싱"""
+        response = (session or get_http_session()).get(url, timeout=timeout)
+        response.raise_for_status()
+        return cls(response.url, response.text)
+
+
+def load_media_playlist(url, session=None):
+    """미디어 플레이리스트 반환 (마스터면 ffmpeg와 같이 최고 대역폭 화질 선택)"""
+    playlist = M3U8Playlist.fetch(url, session)
+    if playlist.is_master:
+        best = max(playlist.variants, key=lambda variant: variant.bandwidth)
+        master_tags = playlist.unsupported_tags
+        playlist = M3U8Playlist.fetch(best.url, session)
+        playlist.unsupported_tags |= master_tags
+        playlist.bandwidth = best.bandwidth or None
+    return playlist
+
+
+def estimate_bandwidth(playlist, session=None, timeout=10):
+    """대역폭 정보가 없을 때 첫 세그먼트 크기(HEAD)로 비트레이트 추정 (bps)"""
+    if not playlist.segments or playlist.segments[0].duration <= 0:
+        return None
+    try:
+        response = (session or get_http_session()).head(playlist.segments[0].url, timeout=timeout,
+                                                         allow_redirects=True)
+        size = int(response.headers.get('content-length', 0))
+    except (requests.RequestException, ValueError):
+        return None
+    return int(size * 8 / playlist.segments[0].duration) if size else None
+
+
+class KeyCache:
+    """HLS 복호화 키 캐시 (키 URI별로 한 번만 받음)"""
+
+    def __init__(self, session=None):
+        self.session = session or get_http_session()
+        self.keys = {}  # 키 URI -> 16바이트 키
+        self.locks = {}  # 키 URI -> 같은 키를 동시에 여러 번 받지 않기 위한 잠금
+        self.lock = threading.Lock()
+
+    def get(self, key_uri, timeout=15):
+        """키 URI에 해당하는 키 반환 (캐시에 없으면 받아서 저장)"""
+        key = self.keys.get(key_uri)
+        if key is not None:
+            return key
+
+        with self.lock:
+            uri_lock = self.locks.setdefault(key_uri, threading.Lock())
+
+        with uri_lock:
+            key = self.keys.get(key_uri)
+            if key is None:
+                response = self.session.get(key_uri, timeout=timeout)
+                response.raise_for_status()
+                key = response.content
+                if len(key) != 16:
+                    raise ValueError(f"AES-128 키 길이가 올바르지 않습니다: {len(key)}바이트")
+                self.keys[key_uri] = key
+        return key
+
+
+_key_cache = None
+
+
+def get_key_cache():
+    """공유 키 캐시 반환 (같은 프로세스의 모든 작업이 같은 키를 다시 받지 않도록)"""
+    global _key_cache
+    if _key_cache is None:
+        _key_cache = KeyCache()
+    return _key_cache
+
+
+@profiled("segment.decrypt", "segment")
+def decrypt_segment(data, key, iv):
+    """AES-128-CBC 세그먼트 복호화 (PKCS#7 패딩 제거)
+
+    OpenSSL 기반 cryptography 구현을 사용하므로 세그먼트 전체를 한 번에
+    AES-NI 명령으로 처리합니다. 패딩이 올바르지 않으면 (잘못된 키나 IV,
+    잘린 응답) 깨진 데이터를 그대로 쓰지 않도록 ValueError를 발생시킵니다."""
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    unpadder = padding.PKCS7(128).unpadder()
+    try:
+        plain = decryptor.update(data) + decryptor.finalize()
+        return unpadder.update(plain) + unpadder.finalize()
+    except ValueError as e:
+        raise ValueError(f"세그먼트 복호화 실패 (키, IV 또는 패딩이 올바르지 않습니다): {str(e)}") from e
+
+
+def segment_iv(segment):
+    """세그먼트의 IV (명시되지 않으면 미디어 시퀀스 번호 사용)"""
+    if segment.key.iv:
+        iv_hex = segment.key.iv[2:] if segment.key.iv.lower().startswith('0x') else segment.key.iv
+        return bytes.fromhex(iv_hex.rjust(32, '0'))
+    return segment.sequence.to_bytes(16, 'big')
+
+
+class RequestAbandoned(Exception):
+    """다른 요청이 먼저 끝나 더 받을 필요가 없어진 세그먼트 요청"""
+
+
+def read_abandonable(session, url, timeout, cancel_event, chunk_size=64 * 1024):
+    """응답 본문을 조각 단위로 받다가 cancel_event가 설정되면 연결을 닫고 RequestAbandoned 발생"""
+    with session.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        chunks = []
+        for chunk in response.iter_content(chunk_size):
+            if cancel_event.is_set():
+                raise RequestAbandoned(url)
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+@profiled("segment.fetch", "segment")
+def fetch_segment(segment, session=None, timeout=30, retries=3, key_cache=None, cancel_event=None):
+    """세그먼트 하나를 받아 (필요하면 복호화 후) 바이트로 반환 (실패 시 재시도)
+    cancel_event가 있으면 스트리밍으로 받으면서 설정되는 즉시 중단합니다."""
+    session = session or get_http_session()
+    for attempt in range(retries):
+        try:
+            if cancel_event is not None:
+                data = read_abandonable(session, segment.url, timeout, cancel_event)
+                break
+            response = session.get(segment.url, timeout=timeout)
+            response.raise_for_status()
+            data = response.content
+            break
+        except requests.RequestException:
+            if attempt == retries - 1:
+                raise
+            time.sleep(0.5 * (2 ** attempt))
+
+    if segment.key is not None:
+        if segment.key.method != 'AES-128':
+            raise ValueError(f"지원하지 않는 암호화 방식입니다: {segment.key.method}")
+        key_cache = key_cache or get_key_cache()
+        data = decrypt_segment(data, key_cache.get(segment.key.uri), segment_iv(segment))
+    return data
+
+
+class SegmentFetcher:
+    """세그먼트 병렬 다운로드 클래스"""
+
+    def __init__(self, max_workers=8, session=None, key_cache=None):
+        self.max_workers = max_workers
+        self.session = session or get_http_session()
+        self.key_cache = key_cache or get_key_cache()
+        self.latencies = deque(maxlen=2000)  # 최근 세그먼트 처리 시간 (초)
+
+    def fetch_iter(self, segments):
+        """세그먼트를 병렬로 받아 원래 순서대로 (세그먼트, 데이터)를 반환
+        메모리 사용량을 제한하기 위해 동시에 최대 max_workers * 2개만 요청합니다."""
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            segment_iter = iter(segments)
+            pending = deque()
+            for segment in islice(segment_iter, self.max_workers * 2):
+                pending.append((segment, self._submit(executor, segment)))
+
+            while pending:
+                segment, future = pending.popleft()
+                data = future.result()
+                next_segment = next(segment_iter, None)
+                if next_segment is not None:
+                    pending.append((next_segment, self._submit(executor, next_segment)))
+                yield segment, data
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, executor, segment):
+        """세그먼트 다운로드(및 복호화)를 작업자 풀에 제출"""
+        return executor.submit(self._fetch_timed, segment)
+
+    def _fetch_timed(self, segment):
+        """세그먼트를 받으면서 걸린 시간 기록"""
+        started = time.monotonic()
+        data = fetch_segment(segment, self.session, key_cache=self.key_cache)
+        self.latencies.append(time.monotonic() - started)
+        return data
+
+    def summary(self):
+        """세그먼트 지연 시간 요약"""
+        latencies = list(self.latencies)
+        if not latencies:
+            return "세그먼트 통계 없음"
+        return (f"세그먼트 지연 p50 {percentile(latencies, 0.5) * 1000:.0f}ms, "
+                f"p99 {percentile(latencies, 0.99) * 1000:.0f}ms ({len(latencies)}개)")
+
+
+def percentile(values, fraction):
+    """값 목록의 백분위수 (fraction: 0~1)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def playlists_equivalent(first, second, tolerance=0.05):
+    """두 미디어 플레이리스트가 같은 강의의 미러인지 확인 (세그먼트 수와 길이 비교)"""
+    if len(first.segments) != len(second.segments):
+        return False
+    return all(abs(a.duration - b.duration) <= tolerance for a, b in zip(first.segments, second.segments))
+
+
+class MirrorStats:
+    """미러(호스트)별 세그먼트 응답 시간 및 실패 통계"""
+
+    def __init__(self, name, window=100):
+        self.name = name
+        self.latencies = deque(maxlen=window)
+        self.slow_flags = deque(maxlen=window)  # 헤지 임계값을 넘겼는지 여부
+        self.failures = 0  # 연속 실패 횟수
+        self.wins = 0
+
+    def record(self, latency, slow):
+        self.latencies.append(latency)
+        self.slow_flags.append(slow)
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        self.slow_flags.append(True)
+
+    def record_abandoned(self):
+        """다른 미러에 져서 중단된 요청 (실패는 아니지만 느린 것으로 기록)"""
+        self.slow_flags.append(True)
+
+    def score(self):
+        """낮을수록 우선 (중간 응답 시간 + 느림/실패 벌점)"""
+        median = percentile(self.latencies, 0.5) if self.latencies else 0.0
+        slow_ratio = sum(self.slow_flags) / len(self.slow_flags) if self.slow_flags else 0.0
+        return median * (1 + 4 * slow_ratio) + self.failures * 5.0
+
+
+class HedgedSegmentFetcher(SegmentFetcher):
+    """여러 미러에 헤지 요청을 보내는 세그먼트 다운로드 클래스
+
+    요청이 최근 응답 시간의 백분위 임계값을 넘기면 다음 순위 미러에 같은
+    세그먼트를 중복 요청하고 먼저 끝난 쪽을 사용합니다. 계속 느리거나 실패하는
+    미러는 점수가 나빠져 뒤로 밀립니다."""
+
+    def __init__(self, mirrors, max_workers=8, session=None, key_cache=None,
+                 hedge_percentile=0.9, min_samples=10):
+        super().__init__(max_workers, session, key_cache)
+        self.mirrors = mirrors  # 세그먼트 구성이 같은 미디어 플레이리스트 목록 (첫 번째가 기본)
+        self.stats = [MirrorStats(urlparse(mirror.url).netloc or mirror.url) for mirror in mirrors]
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.request_executor = None
+        self.hedged_count = 0  # 중복 요청 횟수
+        self.hedge_wins = 0  # 기본 미러가 아닌 쪽이 먼저 끝난 횟수
+        self.abandoned_count = 0  # 다른 미러가 먼저 끝나 중단한 요청 수
+
+    def fetch_iter(self, segments):
+        self.request_executor = ThreadPoolExecutor(max_workers=self.max_workers * len(self.mirrors))
+        try:
+            yield from super().fetch_iter(segments)
+        finally:
+            self.request_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, executor, segment):
+        return executor.submit(self._fetch_hedged, segment)
+
+    def hedge_threshold(self):
+        """중복 요청을 보낼 대기 시간 (표본이 적으면 목표 세그먼트 길이 사용)"""
+        latencies = list(self.latencies)
+        if len(latencies) < self.min_samples:
+            return self.mirrors[0].target_duration or 5.0
+        return max(percentile(latencies, self.hedge_percentile), 0.2)
+
+    def ranked_mirrors(self):
+        """점수순으로 정렬된 미러 번호 목록"""
+        with self.lock:
+            return sorted(range(len(self.mirrors)), key=lambda index: (self.stats[index].score(), index))
+
+    def _request(self, mirror_index, segment_index, threshold, cancel_event):
+        """미러 하나에 세그먼트 요청 (재시도는 헤지가 대신함, 다른 요청이 이기면 중단)"""
+        segment = self.mirrors[mirror_index].segments[segment_index]
+        started = time.monotonic()
+        try:
+            data = fetch_segment(segment, self.session, retries=1, key_cache=self.key_cache,
+                                 cancel_event=cancel_event)
+        except RequestAbandoned:
+            with self.lock:
+                self.abandoned_count += 1
+                self.stats[mirror_index].record_abandoned()
+            raise
+        except Exception:
+            with self.lock:
+                self.stats[mirror_index].record_failure()
+            raise
+        latency = time.monotonic() - started
+        with self.lock:
+            self.stats[mirror_index].record(latency, latency > threshold)
+        return data
+
+    def _fetch_hedged(self, segment):
+        """세그먼트 하나를 헤지 요청으로 받음"""
+        started = time.monotonic()
+        order = self.ranked_mirrors()
+        threshold = self.hedge_threshold()
+        futures = {}
+        launched = 0
+        cancel_event = threading.Event()  # 한 요청이 끝나면 나머지 요청을 중단시킴
+
+        def launch():
+            nonlocal launched
+            mirror_index = order[launched]
+            launched += 1
+            future = self.request_executor.submit(self._request, mirror_index, segment.index, threshold,
+                                                  cancel_event)
+            futures[future] = mirror_index
+
+        launch()
+        while futures:
+            can_hedge = launched < len(order)
+            done, _ = wait(futures, timeout=threshold if can_hedge else None, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # 임계값 초과: 다음 미러에 중복 요청
+                with self.lock:
+                    self.hedged_count += 1
+                launch()
+                continue
+
+            for future in done:
+                mirror_index = futures.pop(future)
+                if future.exception() is None:
+                    # 진 쪽은 다음 조각을 읽을 때 연결을 닫고, 아직 시작 전이면 실행하지 않음
+                    cancel_event.set()
+                    for loser in futures:
+                        loser.cancel()
+                    with self.lock:
+                        self.stats[mirror_index].wins += 1
+                        if mirror_index != order[0]:
+                            self.hedge_wins += 1
+                    self.latencies.append(time.monotonic() - started)
+                    return future.result()
+
+            # 진행 중인 요청이 모두 실패했으면 남은 미러로 바로 넘어감
+            if not futures and launched < len(order):
+                launch()
+
+        # 모든 미러가 실패하면 가장 좋은 미러로 일반 재시도
+        data = fetch_segment(self.mirrors[order[0]].segments[segment.index], self.session,
+                             key_cache=self.key_cache)
+        self.latencies.append(time.monotonic() - started)
+        return data
+
+    def summary(self):
+        """지연 시간 및 미러별 통계 요약"""
+        with self.lock:
+            mirror_info = ", ".join(
+                f"{stats.name}: {stats.wins}회" + (f" (연속 실패 {stats.failures})" if stats.failures else "")
+                for stats in self.stats
+            )
+        return (f"{super().summary()}, 헤지 요청 {self.hedged_count}회 (미러 우세 {self.hedge_wins}회, "
+                f"중단 {self.abandoned_count}회) / {mirror_info}")
+
+
+# m3u8 후보 URL 검사 결과
+ProbeResult = namedtuple('ProbeResult', [
+    'url', 'ok', 'playlist_latency', 'bandwidth', 'resolution',
+    'segment_latency', 'throughput', 'segment_count', 'duration', 'error'
+])
+
+# 후보 선택 정책 (설정 값, 표시 이름)
+PROBE_POLICIES = [
+    ("balanced", "균형 (실시간 이상 속도 중 최고 화질)"),
+    ("fastest", "가장 빠른 서버"),
+    ("quality", "최고 화질"),
+]
+
+
+class CandidateProber:
+    """m3u8 후보 URL들을 병렬로 검사하고 정책에 따라 순위를 매기는 클래스"""
+
+    def __init__(self, policy="balanced", max_workers=8, sample_bytes=512 * 1024, timeout=10, session=None):
+        self.policy = policy
+        self.max_workers = max_workers
+        self.sample_bytes = sample_bytes  # 처리량 측정에 사용할 첫 세그먼트 크기
+        self.timeout = timeout
+        self.session = session or get_http_session()
+
+    @profiled("probe.candidate", "probe")
+    def probe(self, url):
+        """후보 하나 검사: 플레이리스트 응답 시간, 화질, 첫 세그먼트 지연/처리량"""
+        try:
+            started = time.monotonic()
+            playlist = M3U8Playlist.fetch(url, self.session, self.timeout)
+            playlist_latency = time.monotonic() - started
+
+            bandwidth = 0
+            resolution = ''
+            if playlist.is_master:
+                # 실제로 받게 될 최고 대역폭 화질 기준으로 측정
+                best = max(playlist.variants, key=lambda variant: variant.bandwidth)
+                bandwidth, resolution = best.bandwidth, best.resolution
+                playlist = M3U8Playlist.fetch(best.url, self.session, self.timeout)
+
+            if not playlist.segments:
+                raise ValueError("세그먼트가 없습니다.")
+
+            # 첫 세그먼트 일부만 받아 지연 시간과 처리량 측정
+            started = time.monotonic()
+            with self.session.get(playlist.segments[0].url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                received = 0
+                segment_latency = None
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    if segment_latency is None:
+                        segment_latency = time.monotonic() - started
+                    received += len(chunk)
+                    if received >= self.sample_bytes:
+                        break
+            elapsed = max(time.monotonic() - started, 1e-3)
+            throughput = received / elapsed  # 바이트/초
+
+            # 대역폭 정보가 없으면 첫 세그먼트 크기로 추정
+            if not bandwidth and received < self.sample_bytes and playlist.segments[0].duration > 0:
+                bandwidth = int(received * 8 / playlist.segments[0].duration)
+
+            return ProbeResult(url, True, playlist_latency, bandwidth, resolution, segment_latency or elapsed,
+                               throughput, len(playlist.segments), playlist.total_duration, None)
+        except Exception as e:
+            return ProbeResult(url, False, None, 0, '', None, 0.0, 0, 0.0, str(e))
+
+    def sort_key(self, result):
+        """정책에 따른 정렬 키 (측정 잡음으로 순위가 흔들리지 않도록 값을 구간화하고 URL로 동점 처리)"""
+        if not result.ok:
+            return (1, 0, 0, 0, result.url)
+
+        throughput = round(result.throughput / (100 * 1024))  # 100KB/s 단위
+        latency = round((result.segment_latency or 0) * 100)  # 10ms 단위
+        bandwidth = result.bandwidth
+
+        if self.policy == "fastest":
+            return (0, -throughput, latency, -bandwidth, result.url)
+        if self.policy == "quality":
+            return (0, -bandwidth, -throughput, latency, result.url)
+
+        # 균형: 실시간 재생 이상(처리량 >= 비트레이트)으로 받을 수 있는 후보 중 최고 화질 우선
+        realtime = bandwidth == 0 or result.throughput * 8 >= bandwidth
+        return (0, 0 if realtime else 1, -bandwidth if realtime else -throughput, latency, result.url)
+
+    def rank(self, urls):
+        """모든 후보를 병렬로 검사한 뒤 순위순으로 정렬한 ProbeResult 목록 반환"""
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            results = list(executor.map(self.probe, urls))
+        return sorted(results, key=self.sort_key)
+
+
+def find_mirror_urls(results):
+    """1순위 후보와 세그먼트 수/길이가 같은 나머지 정상 후보 URL (미러로 사용)"""
+    if not results or not results[0].ok:
+        return []
+    best = results[0]
+    return [result.url for result in results[1:]
+            if result.ok and result.segment_count == best.segment_count
+            and abs(result.duration - best.duration) < 1.0]
+
+
+def format_probe_result(rank, result):
+    """후보 검사 결과를 한 줄로 표시"""
+    if not result.ok:
+        return f"{rank}. [실패] {result.url} ({result.error})"
+    details = [f"{result.throughput / (1024 * 1024):.2f} MB/s",
+               f"지연 {result.segment_latency * 1000:.0f}ms"]
+    if result.bandwidth:
+        details.append(f"{result.bandwidth / 1000:.0f} kbps")
+    if result.resolution:
+        details.append(result.resolution)
+    return f"{rank}. {', '.join(details)} - {result.url}"
+
+
+class UrlProbeThread(QThread):
+    """m3u8 후보 검사를 위한 스레드"""
+    probe_finished = pyqtSignal(list)  # 순위순 ProbeResult 목록
+
+    def __init__(self, urls, policy):
+        super().__init__()
+        self.urls = urls
+        self.policy = policy
+
+    @profiled_thread("UrlProbeThread")
+    def run(self):
+        try:
+            results = CandidateProber(self.policy).rank(self.urls)
+        except Exception as e:
+            print(f"후보 검사 오류: {str(e)}")
+            results = []
+        self.probe_finished.emit(results)
+
+
+def format_size(num_bytes):
+    """바이트 수를 읽기 쉬운 단위로 변환"""
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+# 느린 저장소로 취급하는 네트워크 파일 시스템
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'sshfs', 'fuse.sshfs', 'davfs',
+                       'fuse.rclone', '9p', 'afpfs', 'webdav'}
+
+
+def is_slow_destination(path):
+    """저장 경로가 네트워크 드라이브 등 느린 저장소인지 확인"""
+    path = os.path.abspath(path)
+    if os.name == 'nt':
+        if path.startswith('\\\\'):  # UNC 경로
+            return True
+        try:
+            import ctypes
+            drive = os.path.splitdrive(path)[0] + '\\'
+            return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+        except Exception:
+            return False
+
+    # 가장 길게 일치하는 마운트 지점의 파일 시스템 확인
+    try:
+        mount_point, fs_type = '', ''
+        with open('/proc/mounts', 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                point = fields[1].replace('\\040', ' ')
+                if (path == point or path.startswith(point.rstrip('/') + '/')) and len(point) > len(mount_point):
+                    mount_point, fs_type = point, fields[2]
+        return fs_type in NETWORK_FILESYSTEMS
+    except OSError:
+        return False
+
+
+def get_staging_dir():
+    """느린 저장소에 저장하기 전 결과를 만들 로컬 임시 폴더"""
+    staging_dir = os.path.join(tempfile.gettempdir(), "coursemos_staging")
+    os.makedirs(staging_dir, exist_ok=True)
+    return staging_dir
+
+
+def check_free_space(requirements, margin_bytes=200 * 1024 * 1024):
+    """(경로, 필요 바이트) 목록의 여유 공간 확인 (같은 디스크는 합산)
+    부족하면 오류 메시지, 충분하면 None 반환"""
+    needed_by_device = {}
+    for path, needed in requirements:
+        if not needed:
+            continue
+        device = os.stat(path).st_dev
+        device_path, total = needed_by_device.get(device, (path, 0))
+        needed_by_device[device] = (device_path, total + needed)
+
+    for path, needed in needed_by_device.values():
+        free = shutil.disk_usage(path).free
+        if free < needed + margin_bytes:
+            return (f"디스크 공간 부족: {path} - 필요 약 {format_size(needed + margin_bytes)}, "
+                    f"여유 {format_size(free)}")
+    return None
+
+
+class PreallocatedWriter:
+    """예상 크기만큼 미리 공간을 확보하고 큰 정렬 버퍼 단위로 쓰는 파일 쓰기 클래스
+
+    직접 쓰는 파일(받은 세그먼트를 이어 붙인 stream.ts, 최종 위치로 옮기는 복사본)에만
+    사용합니다. ffmpeg 출력은 ffmpeg가 파일을 새로 만들면서 확보한 공간을 잘라내고 MP4는
+    탐색 가능한 출력이 필요해 파이프로 받을 수도 없으므로, 느린 저장소에는 로컬에서 만든 뒤
+    BackgroundMover가 이 클래스로 미리 공간을 확보해 복사합니다."""
+
+    BLOCK_SIZE = 1024 * 1024  # 쓰기 정렬 단위
+
+    def __init__(self, path, expected_size=None, buffer_size=8 * 1024 * 1024):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        self.written = 0
+        self.file = open(path, 'wb', buffering=0)
+        if expected_size:
+            self._preallocate(expected_size)
+
+    def _preallocate(self, size):
+        """파일 공간 미리 확보 (단편화 및 쓰기 중 공간 부족 방지)"""
+        try:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(self.file.fileno(), 0, size)
+            else:
+                self.file.truncate(size)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise
+            # 파일 시스템이 지원하지 않으면 그냥 진행
+
+    def _write_all(self, data):
+        """버퍼 전체를 씀 (os.write는 일부만 쓰고 반환할 수 있음)"""
+        view = memoryview(data)
+        while view:
+            count = os.write(self.file.fileno(), view)
+            if not count:
+                raise OSError(errno.EIO, "파일에 쓸 수 없습니다.", self.path)
+            view = view[count:]
+        self.written += len(data)
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= self.buffer_size:
+            # 정렬 단위의 배수만 쓰고 나머지는 다음 쓰기로 넘김
+            aligned = len(self.buffer) - len(self.buffer) % self.BLOCK_SIZE
+            self._write_all(self.buffer[:aligned])
+            del self.buffer[:aligned]
+
+    def close(self):
+        """남은 버퍼를 쓰고 실제 크기로 자른 뒤 닫음"""
+        if self.file.closed:
+            return
+        try:
+            if self.buffer:
+                self._write_all(self.buffer)
+                self.buffer = bytearray()
+            self.file.truncate(self.written)
+        finally:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BackgroundMover(QObject):
+    """로컬에 먼저 저장한 결과 파일을 최종 위치로 옮기는 백그라운드 작업 관리자"""
+    move_finished = pyqtSignal(bool, str, str)  # 성공 여부, 최종 경로, 메시지
+
+    def __init__(self, max_workers=2):
+        super().__init__()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mover")
+        self.futures = []
+
+    def submit(self, source, destination):
+        """이동 작업 추가 (매니페스트도 함께 이동)"""
+        self.futures = [future for future in self.futures if not future.done()]
+        self.futures.append(self.executor.submit(self._move, source, destination))
+
+    def _move(self, source, destination):
+        try:
+            with PROFILER.span("output.move", "io", destination=destination):
+                # 복사 중인 불완전한 파일이 최종 이름으로 보이지 않도록 임시 이름 사용
+                temp_path = destination + ".part"
+                if os.stat(source).st_dev == os.stat(os.path.dirname(os.path.abspath(destination))).st_dev:
+                    os.replace(source, temp_path)
+                else:
+                    self._copy(source, temp_path)
+                    os.remove(source)
+                os.replace(temp_path, destination)
+                if os.path.exists(manifest_path_for(source)):
+                    shutil.move(manifest_path_for(source), manifest_path_for(destination))
+            self.move_finished.emit(True, destination, "최종 위치로 이동 완료")
+        except Exception as e:
+            self.move_finished.emit(False, destination, f"이동 실패: {str(e)} (임시 파일: {source})")
+
+    @staticmethod
+    def _copy(source, destination, chunk_size=8 * 1024 * 1024):
+        """다른 저장소로 복사 (전체 크기를 미리 확보하고 큰 단위로 씀)"""
+        with open(source, 'rb') as src, PreallocatedWriter(destination, os.path.getsize(source)) as dst:
+            while True:
+                data = src.read(chunk_size)
+                if not data:
+                    break
+                dst.write(data)
+        shutil.copystat(source, destination)
+
+    def wait(self):
+        """진행 중인 이동 작업이 모두 끝날 때까지 대기"""
+        for future in list(self.futures):
+            future.result()
+
+
+_background_mover = None
+
+
+def get_background_mover():
+    """공유 백그라운드 이동 관리자 반환"""
+    global _background_mover
+    if _background_mover is None:
+        _background_mover = BackgroundMover()
+    return _background_mover
+
+
+class ArchiveEncoder(QObject):
+    """슬라이드 위주 강의 영상을 작게 다시 인코딩하는 백그라운드 CPU 작업 관리자
+
+    정지 화면이 대부분인 강의에 맞춰 낮은 프레임 레이트, 장면 전환 기반 키프레임,
+    음성용 낮은 오디오 비트레이트로 인코딩하고 원본보다 작을 때만 교체합니다."""
+    archive_finished = pyqtSignal(bool, str, str)  # 성공 여부, 파일 경로, 메시지
+
+    FRAME_RATE = 5  # 슬라이드 영상에 충분한 프레임 레이트
+    VIDEO_CRF = 28
+    AUDIO_BITRATE = '48k'  # 모노 음성 기준
+
+    def __init__(self, ffmpeg_manager, max_workers=None):
+        super().__init__()
+        self.ffmpeg_manager = ffmpeg_manager
+        cpu_count = os.cpu_count() or 2
+        self.max_workers = max_workers or max(1, cpu_count // 4)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="archive")
+        self.futures = []
+
+    def build_command(self, source, output):
+        """아카이브 프로필 ffmpeg 명령"""
+        return [
+            self.ffmpeg_manager.get_ffmpeg_command(), '-y', '-v', 'error',
+            '-i', source,
+            '-vf', f"fps={self.FRAME_RATE}",
+            '-c:v', 'libx264', '-preset', 'slow', '-tune', 'stillimage', '-crf', str(self.VIDEO_CRF),
+            # 긴 GOP + 장면 전환(슬라이드 넘김) 시에만 키프레임
+            '-x264-params', f"keyint={self.FRAME_RATE * 120}:min-keyint={self.FRAME_RATE}:scenecut=60",
+            '-c:a', 'aac', '-b:a', self.AUDIO_BITRATE, '-ac', '1',
+            '-movflags', '+faststart',
+            output
+        ]
+
+    def submit(self, source, move_to=None):
+        """아카이브 인코딩 작업 추가 (move_to가 있으면 끝난 뒤 최종 위치로 이동)"""
+        self.futures = [future for future in self.futures if not future.done()]
+        self.futures.append(self.executor.submit(self._encode, source, move_to))
+
+    def _encode(self, source, move_to):
+        result_path = move_to or source
+        temp_output = os.path.splitext(source)[0] + ".archive.tmp.mp4"
+        try:
+            original_size = os.path.getsize(source)
+
+            with PROFILER.span("archive.encode", "transcode", source=os.path.basename(source)):
+                started = time.monotonic()
+                # 스레드 수와 우선순위는 CPU 관리자가 동시 작업 수에 맞춰 정함
+                result = get_cpu_governor().run(self.build_command(source, temp_output), 'encode',
+                                                capture_output=True, text=True, encoding='utf-8',
+                                                errors='replace')
+                elapsed = time.monotonic() - started
+
+            if result.returncode != 0:
+                self.archive_finished.emit(False, result_path, f"아카이브 인코딩 실패: {result.stderr.strip()}")
+                return
+
+            archived_size = os.path.getsize(temp_output)
+            if archived_size >= original_size:
+                self.archive_finished.emit(True, result_path,
+                                           f"아카이브 인코딩 결과가 더 커서 원본 유지 ({format_size(original_size)})")
+                return
+
+            # 교체 전에 인코딩 결과가 원본 길이와 맞고 끊긴 구간이 없는지 확인
+            verifier = IntegrityVerifier(self.ffmpeg_manager)
+            problem = self._check_output(verifier, source, temp_output)
+            if problem:
+                self.archive_finished.emit(False, result_path, f"아카이브 결과 검증 실패, 원본 유지: {problem}")
+                return
+
+            os.replace(temp_output, source)
+            # 내용이 바뀌었으므로 매니페스트 갱신
+            verify_result = verifier.verify(source)
+            if not verify_result.ok:
+                self.archive_finished.emit(False, result_path,
+                                           f"아카이브 인코딩 후 검사 실패: {verify_result.message}")
+                return
+            self.archive_finished.emit(
+                True, result_path,
+                f"아카이브 인코딩 완료: {format_size(original_size)} → {format_size(archived_size)} "
+                f"({original_size / archived_size:.1f}배 감소, {format_time(elapsed)})"
+            )
+        except Exception as e:
+            self.archive_finished.emit(False, result_path, f"아카이브 인코딩 오류: {str(e)}")
+        finally:
+            # 원본을 교체하지 않았으면 (실패, 예외, 결과가 더 큼) 남은 인코딩 결과 삭제
+            try:
+                if os.path.exists(temp_output):
+                    os.remove(temp_output)
+            except OSError as e:
+                print(f"임시 파일 삭제 오류: {str(e)}")
+            if move_to:
+                get_background_mover().submit(source, move_to)
+
+    def _check_output(self, verifier, source, temp_output):
+        """인코딩 결과를 원본과 비교해 문제 설명 반환 (문제가 없으면 None)"""
+        original_duration = verifier.probe_duration(source)
+        archived_duration = verifier.probe_duration(temp_output)
+        if original_duration is None or archived_duration is None:
+            return "재생 시간을 읽을 수 없습니다"
+        if abs(archived_duration - original_duration) > verifier.duration_tolerance:
+            return f"길이 불일치 ({archived_duration:.1f}초 / 원본 {original_duration:.1f}초)"
+        _, gaps = verifier.probe_gaps(temp_output)
+        if gaps:
+            return f"타임스탬프 불연속 {len(gaps)}곳"
+        return None
+
+    def wait(self):
+        """진행 중인 인코딩 작업이 모두 끝날 때까지 대기"""
+        for future in list(self.futures):
+            future.result()
+
+
+_archive_encoder = None
+
+
+def get_archive_encoder(ffmpeg_manager):
+    """공유 아카이브 인코더 반환"""
+    global _archive_encoder
+    if _archive_encoder is None:
+        _archive_encoder = ArchiveEncoder(ffmpeg_manager)
+    return _archive_encoder
+
+
+class FFmpegThread(QObject):
+    """ffmpeg 변환 작업 하나 (단계 파이프라인의 작업자나 호출한 스레드에서 실행)"""
+    progress_update = pyqtSignal(str)
+    progress_percent = pyqtSignal(int)  # 백분율 진행 상황
+    conversion_finished = pyqtSignal(bool, str, str)  # 성공여부, 메시지, 파일경로
+    
+    def __init__(self, m3u8_url, output_path, output_format, ffmpeg_manager, start_time=None, end_time=None,
+                 mirror_urls=None, archive_profile=False, job_id=None):
+        super().__init__()
+        self.job_id = job_id or uuid.uuid4().hex[:12]  # 임시 파일 이름 구분용 (데몬 작업이면 작업 ID)
+        self.archive_profile = archive_profile  # MP4를 강의 아카이브용으로 다시 인코딩할지 여부
+        self.m3u8_url = m3u8_url
+        self.mirror_urls = mirror_urls or []  # 같은 강의를 제공하는 다른 m3u8 URL
+        self.output_path = output_path  # ffmpeg가 쓰는 경로 (느린 저장소면 로컬 임시 경로)
+        self.final_path = output_path  # 최종 저장 경로
+        self.expected_stream_bytes = None  # 받을 스트림의 예상 크기
+        self.output_format = output_format
+        self.duration_ms = None  # 총 재생 시간 (밀리초)
+        self.ffmpeg_manager = ffmpeg_manager
+        self.start_time = start_time  # 구간 다운로드 시작/끝 (초, None이면 전체)
+        self.end_time = end_time
+        self.playlist = None  # 세그먼트를 직접 받는 경우의 미디어 플레이리스트
+        self.mirrors = []  # 세그먼트 구성이 같은 미러 플레이리스트
+        self.percent_base = 0  # ffmpeg 진행률을 표시할 구간 (시작, 폭)
+        self.percent_span = 100
+        self.process = None  # 실행 중인 ffmpeg 프로세스
+        self.cancel_event = threading.Event()
+        self.work_dir = None  # 단계 사이에 넘기는 상태 (작업 폴더, ffmpeg 입력, 자르기 구간)
+        self.input_path = None
+        self.clip_start = 0.0
+        self.clip_end = None
+        self.seek_offset = 0.0
+        self.result_reported = False  # 결과를 이미 알렸는지 여부
+    
+    @property
+    def is_clip(self):
+        return self.start_time is not None or self.end_time is not None
+    
+    def cancel(self):
+        """진행 중인 작업 취소 (세그먼트 다운로드 중단, ffmpeg 종료)"""
+        self.cancel_event.set()
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.terminate()
+    
+    def check_cancelled(self):
+        """취소 요청이 있으면 예외 발생"""
+        if self.cancel_event.is_set():
+            raise RuntimeError("작업이 취소되었습니다.")
+    
+        
+    @profiled_thread("FFmpegThread")
+    def run(self):
+        """모든 단계를 현재 스레드에서 차례로 실행 (파이프라인을 거치지 않을 때)"""
+        try:
+            for stage in (self.stage_fetch, self.stage_encode, self.stage_verify):
+                if self.result_reported:
+                    break
+                stage()
+        except Exception as e:
+            self.fail(e)
+        finally:
+            self.cleanup()
+    
+    def finish(self, success, message, file_path):
+        """결과를 한 번만 알림 (이후 단계는 실행하지 않음)"""
+        if not self.result_reported:
+            self.result_reported = True
+            self.conversion_finished.emit(success, message, file_path)
+    
+    def fail(self, error):
+        self.finish(False, f"오류 발생: {str(error)}", "")
+    
+    def cleanup(self):
+        """작업 폴더 정리"""
+        if self.work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = None
+    
+    @property
+    def encode_stage(self):
+        """코덱 복사만 하면 remux, 다시 인코딩하면 transcode"""
+        return "transcode" if self.output_format == 'mp3' or self.is_clip else "remux"
+    
+    def stage_fetch(self):
+        """받기 단계: 재생 정보 확인, 여유 공간 확인, 세그먼트 다운로드"""
+        self.clip_start = self.start_time or 0.0
+        self.seek_offset = self.clip_start  # 입력 파일 기준 자르기 시작 위치
+        segments = None
+        
+        # 세그먼트를 직접 병렬로 받을 수 있는지 확인
+        self.playlist = self.load_native_playlist()
+        if self.playlist is not None:
+            total_duration = self.playlist.total_duration
+            self.progress_update.emit(f"총 재생 시간: {format_time(total_duration)}")
+            
+            # 구간 다운로드면 겹치는 세그먼트만 받음
+            segments = self.select_segments(self.playlist.segments)
+            if self.is_clip:
+                self.seek_offset = self.clip_start - segments[0].start
+        else:
+            # 먼저 duration 정보 가져오기
+            self.get_duration()
+            total_duration = self.duration_ms / 1000 if self.duration_ms else None
+        
+        self.set_clip_range(total_duration)
+        
+        # 디스크 여유 공간 확인 및 작업 위치 결정
+        self.work_dir = tempfile.mkdtemp(prefix="coursemos_")
+        if not self.prepare_output(self.work_dir, segments):
+            return
+        
+        # 직접 받을 수 있으면 먼저 로컬 파일로 받음
+        if segments is not None:
+            self.input_path = os.path.join(self.work_dir, "stream.ts")
+            self.fetch_segments(self.input_path, segments)
+            self.percent_base, self.percent_span = 90, 10
+        else:
+            self.input_path = self.m3u8_url
+    
+    def stage_encode(self):
+        """remux/transcode 단계: ffmpeg로 출력 파일 생성"""
+        # 출력 형식에 따른 명령어 설정
+        ffmpeg_cmd = self.ffmpeg_manager.get_ffmpeg_command()
+        
+        # 구간 자르기 옵션 (입력 앞의 -ss: 필요한 위치로 바로 이동 후 정확히 자름)
+        input_args = ['-i', self.input_path]
+        trim_args = []
+        if self.is_clip:
+            input_args = ['-ss', f"{self.seek_offset:.3f}"] + input_args
+            if self.clip_end is not None:
+                trim_args = ['-t', f"{self.clip_end - self.clip_start:.3f}"]
+        
+        if self.output_format == 'mp3':
+            # MP3로 변환할 때는 오디오만 추출
+            command = [
+                ffmpeg_cmd,
+                *input_args,
+                *trim_args,
+                '-b:a', '192k',  # 기본 비트레이트
+                '-codec:a', 'libmp3lame',  # MP3 인코더 사용
+                self.output_path
+            ]
+        elif self.is_clip:
+            # 구간 MP4는 경계를 프레임 단위로 정확히 자르기 위해 다시 인코딩
+            command = [
+                ffmpeg_cmd,
+                *input_args,
+                *trim_args,
+                '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '20',
+                '-c:a', 'aac', '-b:a', '128k',
+                self.output_path
+            ]
+        else:
+            # MP4로 변환 (기본 방식)
+            command = [
+                ffmpeg_cmd,
+                *input_args,
+                '-c', 'copy',  # 코덱 복사
+                '-bsf:a', 'aac_adtstoasc',  # AAC 필터
+                self.output_path
+            ]
+            
+        self.progress_update.emit(f"실행 명령어: {' '.join(command)}")
+        
+        if self.encode_stage == 'transcode':
+            self.progress_update.emit(f"CPU 배분: {get_cpu_governor().summary()}")
+        self.check_cancelled()
+        with PROFILER.span(f"ffmpeg.{self.encode_stage}", "ffmpeg", output=os.path.basename(self.output_path)):
+            process = self.run_ffmpeg(command)
+        self.check_cancelled()
+        
+        # 완료 확인
+        if process.poll() != 0:
+            try:
+                error_output = process.stderr.read()
+                self.finish(False, f"변환 실패: {error_output}", "")
+            except UnicodeDecodeError:
+                self.finish(False, "변환 실패: 인코딩 오류가 발생했습니다", "")
+    
+    def stage_verify(self):
+        """검증 단계: 결과 파일 확인 후 아카이브 인코딩/이동 넘기기"""
+        self.progress_percent.emit(100)  # 완료 시 100%로 설정
+        
+        # 종료 코드만 믿지 않고 결과 파일 검증
+        verify_result = self.verify_output()
+        success = verify_result.ok
+        message = "변환 완료!" if success else f"검증 실패: {verify_result.message}"
+        
+        # 아카이브 프로필은 CPU 작업자 풀에서 백그라운드로 인코딩 (이동은 그 이후)
+        move_to = self.final_path if self.output_path != self.final_path else None
+        if success and self.archive_profile and self.output_format == 'mp4':
+            get_archive_encoder(self.ffmpeg_manager).submit(self.output_path, move_to)
+            message += " (아카이브 인코딩 대기 중)"
+        elif move_to:
+            # 로컬에 먼저 저장했으면 최종 위치로 백그라운드 이동
+            get_background_mover().submit(self.output_path, move_to)
+            message += " (최종 위치로 옮기는 중)"
+        self.finish(success, message, self.final_path)
+    
+    def estimate_sizes(self, segments):
+        """(받을 스트림 크기, 출력 파일 크기) 추정 = 대역폭 x 재생 시간 (모르면 None)"""
+        duration = self.duration_ms / 1000 if self.duration_ms else None
+        if not duration:
+            return None, None
+        
+        bandwidth = None
+        stream_duration = duration
+        if self.playlist is not None:
+            bandwidth = self.playlist.bandwidth or estimate_bandwidth(self.playlist)
+            stream_duration = sum(segment.duration for segment in segments)
+        
+        stream_bytes = int(bandwidth / 8 * stream_duration * 1.1) if bandwidth else None
+        if self.output_format == 'mp3':
+            output_bytes = int(192000 / 8 * duration * 1.05)  # 192kbps
+        elif bandwidth:
+            output_bytes = int(bandwidth / 8 * duration * 1.1)
+        else:
+            output_bytes = None
+        return stream_bytes, output_bytes
+    
+    def prepare_output(self, work_dir, segments):
+        """여유 공간을 미리 확인하고, 느린 저장소면 로컬 디스크에서 작업하도록 설정"""
+        stream_bytes, output_bytes = self.estimate_sizes(segments)
+        self.expected_stream_bytes = stream_bytes if segments is not None else None
+        if output_bytes:
+            self.progress_update.emit(f"예상 출력 크기: {format_size(output_bytes)}")
+        
+        final_dir = os.path.dirname(os.path.abspath(self.final_path))
+        os.makedirs(final_dir, exist_ok=True)
+        if is_slow_destination(final_dir):
+            # 같은 제목의 작업이 동시에 실행되어도 겹치지 않도록 작업 ID를 붙임
+            self.output_path = os.path.join(get_staging_dir(), f"{self.job_id}_{os.path.basename(self.final_path)}")
+            self.progress_update.emit("네트워크 저장소로 판단되어 로컬 디스크에 먼저 저장한 뒤 옮깁니다.")
+        
+        requirements = [(os.path.dirname(self.output_path), output_bytes)]
+        if segments is not None:
+            requirements.append((work_dir, stream_bytes))
+        if self.output_path != self.final_path:
+            requirements.append((final_dir, output_bytes))
+        
+        problem = check_free_space(requirements)
+        if problem:
+            self.finish(False, problem, "")
+            return False
+        return True
+    
+    def run_ffmpeg(self, command):
+        """ffmpeg 실행 후 출력을 모니터링하며 진행률 전달 (종료된 프로세스 반환)"""
+        # 프로세스 실행 및 출력 캡처 (인코딩 명시)
+        governor = get_cpu_governor()
+        process = governor.popen(
+            command,
+            'encode' if self.encode_stage == 'transcode' else 'remux',
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            encoding='utf-8',
+            errors='replace'
+        )
+        self.process = process
+        
+        try:
+            self.monitor_ffmpeg(process)
+        finally:
+            governor.release(process)
+        return process
+    
+    def monitor_ffmpeg(self, process):
+        """ffmpeg 출력에서 진행률을 읽어 전달 (프로세스가 끝날 때까지)"""
+        while process.poll() is None:
+            output = process.stderr.readline()
+            if output:
+                self.progress_update.emit(output.strip())
+                
+                # 진행률 추출 및 업데이트
+                if self.duration_ms:
+                    time_match = re.search(r'time=(\d+):(\d+):(\d+)\.(\d+)', output)
+                    if time_match:
+                        hours, minutes, seconds, ms = map(int, time_match.groups())
+                        current_ms = hours * 3600000 + minutes * 60000 + seconds * 1000 + ms * 10
+                        percent = min(int(current_ms / self.duration_ms * 100), 100)
+                        self.progress_percent.emit(self.percent_base + percent * self.percent_span // 100)
+    
+    def load_native_playlist(self):
+        """세그먼트를 직접 받을 수 있으면 미디어 플레이리스트 반환 (아니면 None)"""
+        try:
+            playlist = load_media_playlist(self.m3u8_url)
+        except Exception as e:
+            self.progress_update.emit(f"플레이리스트 분석 실패, ffmpeg로 직접 다운로드합니다: {str(e)}")
+            return None
+        
+        if not playlist.is_native_supported:
+            if playlist.is_encrypted and not HAS_CRYPTOGRAPHY:
+                self.progress_update.emit("암호화된 스트림입니다. cryptography 모듈이 없어 ffmpeg로 다운로드합니다.")
+            else:
+                self.progress_update.emit("직접 다운로드를 지원하지 않는 플레이리스트입니다. ffmpeg로 다운로드합니다.")
+            return None
+        
+        self.mirrors = self.load_mirrors(playlist)
+        return playlist
+    
+    def load_mirrors(self, playlist):
+        """다른 후보 URL 중 세그먼트 구성이 같은 미러 플레이리스트 로드"""
+        if not self.mirror_urls:
+            return []
+        
+        def load(url):
+            try:
+                return load_media_playlist(url)
+            except Exception:
+                return None
+        
+        with ThreadPoolExecutor(max_workers=len(self.mirror_urls)) as executor:
+            candidates = list(executor.map(load, self.mirror_urls))
+        
+        mirrors = [mirror for mirror in candidates
+                   if mirror is not None and mirror.is_native_supported and playlists_equivalent(playlist, mirror)]
+        if mirrors:
+            hosts = ", ".join(urlparse(mirror.url).netloc for mirror in mirrors)
+            self.progress_update.emit(f"미러 {len(mirrors)}개 사용 (헤지 요청): {hosts}")
+        return mirrors
+    
+    def set_clip_range(self, total_duration):
+        """구간 끝과 진행률 기준 길이 계산 (끝 시간이 재생 시간보다 뒤면 재생 시간까지만)"""
+        self.clip_end = self.end_time if self.end_time is not None else total_duration
+        if self.clip_end is not None and total_duration:
+            self.clip_end = min(self.clip_end, total_duration)
+        if self.is_clip:
+            if self.clip_end is not None:
+                # ffmpeg 경로는 세그먼트 선택을 거치지 않으므로 여기서 확인
+                if self.clip_end <= self.clip_start:
+                    raise ValueError("선택한 구간이 영상 길이를 벗어났습니다.")
+                self.duration_ms = int((self.clip_end - self.clip_start) * 1000)
+            self.progress_update.emit(
+                f"구간 다운로드: {format_time(self.clip_start)} ~ "
+                f"{format_time(self.clip_end) if self.clip_end is not None else '끝'}"
+            )
+        elif total_duration:
+            self.duration_ms = int(total_duration * 1000)
+    
+    def select_segments(self, segments):
+        """구간 다운로드 시 #EXTINF 시작 시각 기준으로 겹치는 세그먼트만 선택"""
+        if not self.is_clip:
+            return segments
+        
+        start = self.start_time or 0.0
+        end = self.end_time if self.end_time is not None else float('inf')
+        selected = [segment for segment in segments
+                    if segment.start < end and segment.start + segment.duration > start]
+        if not selected:
+            raise ValueError("선택한 구간이 영상 길이를 벗어났습니다.")
+        
+        self.progress_update.emit(f"전체 세그먼트 {len(segments)}개 중 {len(selected)}개만 받습니다.")
+        return selected
+    
+    @profiled("fetch.segments", "fetch")
+    def fetch_segments(self, output_path, segments):
+        """세그먼트를 병렬로 받아(암호화된 경우 복호화) 하나의 TS 파일로 저장"""
+        total = len(segments)
+        if self.playlist.is_encrypted:
+            self.progress_update.emit("AES-128 암호화 스트림: 세그먼트를 병렬로 받아 복호화합니다.")
+        self.progress_update.emit(f"세그먼트 {total}개 다운로드 시작")
+        
+        if self.mirrors:
+            fetcher = HedgedSegmentFetcher([self.playlist] + self.mirrors)
+        else:
+            fetcher = SegmentFetcher()
+        with PreallocatedWriter(output_path, self.expected_stream_bytes) as f:
+            for done, (segment, data) in enumerate(fetcher.fetch_iter(segments), 1):
+                self.check_cancelled()
+                f.write(data)
+                if done % 10 == 0 or done == total:
+                    self.progress_update.emit(f"세그먼트 다운로드 중... {done}/{total}")
+                self.progress_percent.emit(done * 90 // total)
+        self.progress_update.emit(fetcher.summary())
+    
+    def verify_output(self):
+        """출력 파일을 플레이리스트와 비교 검증하고 누락 세그먼트가 있으면 복구"""
+        try:
+            self.progress_update.emit("다운로드 결과 검증 중...")
+            verifier = IntegrityVerifier(self.ffmpeg_manager)
+            
+            # 구간 다운로드는 자른 길이와만 비교 (부분 복구 대상 아님)
+            if self.is_clip:
+                clip_end = self.clip_end if self.clip_end is not None else self.start_time + self.duration_ms / 1000
+                result = verifier.verify(self.output_path, source_url=self.m3u8_url,
+                                         clip=(self.start_time or 0.0, clip_end))
+                self.progress_update.emit(f"검증 결과: {result.message}")
+                return result
+            
+            playlist = self.playlist
+            if playlist is None:
+                try:
+                    playlist = load_media_playlist(self.m3u8_url)
+                except Exception as e:
+                    self.progress_update.emit(f"플레이리스트를 가져올 수 없어 길이만 검사합니다: {str(e)}")
+            
+            # 다운로드마다 하는 검사는 길이만 확인 (체크섬/패킷 검사는 정밀 검사에서만)
+            result = verifier.verify(self.output_path, playlist, source_url=self.m3u8_url)
+            if not result.ok and result.missing_segments and playlist is not None:
+                self.progress_update.emit(f"검증 실패 ({result.message}), 누락 구간 복구를 시도합니다.")
+                if verifier.repair(self.output_path, playlist, result.missing_segments,
+                                   log=self.progress_update.emit):
+                    result = verifier.verify(self.output_path, playlist, source_url=self.m3u8_url)
+            
+            self.progress_update.emit(f"검증 결과: {result.message}")
+            return result
+        except Exception as e:
+            # 검증 자체가 실패하면 결과를 믿을 수 없으므로 작업 실패로 처리
+            return VerifyResult(self.output_path, False, None, None, 0, [], None, f"검증 중 오류: {str(e)}")
+    
+    @profiled("ffprobe.duration", "probe")
+    def get_duration(self):
+        """미디어 파일의 총 재생 시간을 가져옵니다."""
+        try:
+            ffprobe_cmd = self.ffmpeg_manager.get_ffprobe_command()
+            
+            command = [ffprobe_cmd, '-v', 'error', '-show_entries', 'format=duration', 
+                      '-of', 'default=noprint_wrappers=1:nokey=1', self.m3u8_url]
+            
+            result = get_cpu_governor().run(command, 'probe', capture_output=True, text=True,
+                                            encoding='utf-8', errors='replace')
+            
+            if result.returncode == 0 and result.stdout.strip():
+                # 초 단위 -> 밀리초 단위로 변환
+                try:
+                    duration_sec = float(result.stdout.strip())
+                    self.duration_ms = int(duration_sec * 1000)
+                    self.progress_update.emit(f"총 재생 시간: {format_time(duration_sec)}")
+                except ValueError:
+                    self.progress_update.emit("재생 시간을 파싱할 수 없습니다.")
+            else:
+                self.progress_update.emit("재생 시간을 가져올 수 없습니다.")
+        except Exception as e:
+            self.progress_update.emit(f"재생 시간 정보 가져오기 오류: {str(e)}")
+
+
+PIPELINE_STAGES = ('fetch', 'remux', 'transcode', 'verify')
+STAGE_LABELS = {'fetch': "받기", 'remux': "remux", 'transcode': "변환", 'verify': "검증"}
+
+
+class StagePipeline:
+    """받기 → remux/transcode → 검증 단계를 단계별 작업자 풀로 실행하는 파이프라인
+    
+    단계 사이 큐는 크기가 제한되어 있어 뒤 단계가 밀리면 앞 단계가 기다림.
+    다음 강의를 받는 동안 이전 강의를 변환하므로 네트워크와 CPU를 함께 사용함.
+    """
+    
+    def __init__(self, workers=None, queue_size=2):
+        self.workers = {
+            'fetch': 2,
+            'remux': 1,
+            'transcode': max(1, (os.cpu_count() or 2) // 2),
+            'verify': 1,
+        }
+        self.workers.update({stage: count for stage, count in (workers or {}).items() if count})
+        self.queues = {stage: queue.Queue(maxsize=queue_size) for stage in PIPELINE_STAGES}
+        self.active = dict.fromkeys(PIPELINE_STAGES, 0)  # 단계별 처리 중인 작업 수
+        self.lock = threading.Lock()
+        for stage in PIPELINE_STAGES:
+            for number in range(self.workers[stage]):
+                threading.Thread(target=self._worker, args=(stage,), name=f"{stage}-{number}", daemon=True).start()
+    
+    def submit(self, thread, on_done=None):
+        """FFmpegThread 작업 추가 (받기 큐가 가득 차면 자리가 날 때까지 대기)"""
+        self.queues['fetch'].put((thread, on_done))
+    
+    def depths(self):
+        """단계별 (처리 중, 대기) 작업 수"""
+        with self.lock:
+            return {stage: (self.active[stage], self.queues[stage].qsize()) for stage in PIPELINE_STAGES}
+    
+    def _worker(self, stage):
+        while True:
+            thread, on_done = self.queues[stage].get()
+            with self.lock:
+                self.active[stage] += 1
+            next_stage = None
+            try:
+                with PROFILER.thread_run(f"stage.{stage}"):
+                    thread.check_cancelled()
+                    getattr(thread, f"stage_{'encode' if stage in ('remux', 'transcode') else stage}")()
+                if not thread.result_reported and stage != 'verify':
+                    next_stage = thread.encode_stage if stage == 'fetch' else 'verify'
+            except Exception as e:
+                thread.fail(e)
+            
+            if next_stage:
+                # 다음 단계 큐에 자리가 날 때까지 이 작업자가 기다림 (처리 중으로 계속 표시)
+                self.queues[next_stage].put((thread, on_done))
+            else:
+                thread.cleanup()
+                if on_done:
+                    on_done(thread)
+            with self.lock:
+                self.active[stage] -= 1
+
+
+def format_stage_depths(depths):
+    """단계별 대기열 상태 문자열 (예: 받기 1 (대기 0) · 변환 1 (대기 2))"""
+    return " · ".join(f"{STAGE_LABELS[stage]} {active} (대기 {waiting})"
+                      for stage, (active, waiting) in depths.items())
+
+
+_stage_pipeline = None
+
+
+def get_stage_pipeline(workers=None):
+    """공유 단계 파이프라인 반환 (처음 호출할 때의 작업자 수로 생성)"""
+    global _stage_pipeline
+    if _stage_pipeline is None:
+        _stage_pipeline = StagePipeline(workers)
+    return _stage_pipeline
+
+
+# 무결성 검사 결과
+VerifyResult = namedtuple('VerifyResult', [
+    'file_path', 'ok', 'duration', 'expected_duration',
+    'segment_count', 'missing_segments', 'checksum', 'message'
+])
+
+
+def file_sha256(file_path, chunk_size=4 * 1024 * 1024):
+    """파일의 SHA-256 체크섬 계산"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path_for(file_path):
+    """출력 파일의 체크섬 매니페스트 경로"""
+    return file_path + ".manifest.json"
+
+
+def load_manifest(file_path):
+    """체크섬 매니페스트 읽기 (없거나 손상되었으면 None)"""
+    try:
+        with open(manifest_path_for(file_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(file_path, manifest):
+    """체크섬 매니페스트 저장"""
+    temp_path = manifest_path_for(file_path) + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, manifest_path_for(file_path))
+
+
+class IntegrityVerifier:
+    """다운로드 결과 무결성 검사 클래스
+
+    전체 디코딩 없이 컨테이너 길이와 오디오 패킷 타임스탬프만 읽어
+    플레이리스트의 #EXTINF 합계 및 세그먼트 구간과 비교합니다."""
+
+    def __init__(self, ffmpeg_manager, duration_tolerance=2.0, gap_tolerance=1.0):
+        self.ffmpeg_manager = ffmpeg_manager
+        self.duration_tolerance = duration_tolerance  # 허용하는 전체 길이 차이 (초)
+        self.gap_tolerance = gap_tolerance  # 누락으로 판단하는 타임스탬프 간격 (초)
+
+    def probe_duration(self, file_path):
+        """컨테이너에 기록된 재생 시간 (초)"""
+        command = [self.ffmpeg_manager.get_ffprobe_command(), '-v', 'error',
+                   '-show_entries', 'format=duration',
+                   '-of', 'default=noprint_wrappers=1:nokey=1', file_path]
+        result = get_cpu_governor().run(command, 'probe', capture_output=True, text=True,
+                                        encoding='utf-8', errors='replace')
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            return None
+
+    def probe_gaps(self, file_path):
+        """오디오 패킷 타임스탬프의 불연속 구간 검사 (디먹싱만 수행)
+        반환값: (마지막 패킷 끝 시각, [(간격 시작, 간격 끝), ...])"""
+        command = [self.ffmpeg_manager.get_ffprobe_command(), '-v', 'error',
+                   '-select_streams', 'a:0',
+                   '-show_entries', 'packet=pts_time,duration_time',
+                   '-of', 'csv=p=0', file_path]
+        governor = get_cpu_governor()
+        process = governor.popen(command, 'probe', stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                 universal_newlines=True, encoding='utf-8', errors='replace')
+        first_pts = None
+        previous_end = None
+        gaps = []
+
+        for line in process.stdout:
+            fields = line.strip().split(',')
+            try:
+                pts = float(fields[0])
+                duration = float(fields[1]) if len(fields) > 1 else 0.0
+            except ValueError:
+                continue  # N/A 등
+
+            if first_pts is None:
+                first_pts = pts
+            pts -= first_pts
+
+            if previous_end is not None and pts - previous_end > self.gap_tolerance:
+                gaps.append((previous_end, pts))
+            previous_end = max(previous_end or 0.0, pts + duration)
+
+        process.wait()
+        governor.release(process)
+        return previous_end, gaps
+
+    def find_missing_segments(self, segment_durations, covered_end, gaps):
+        """불연속 구간과 끝부분 부족분에 해당하는 세그먼트 번호 목록"""
+        missing = []
+        start = 0.0
+        for index, duration in enumerate(segment_durations):
+            end = start + duration
+            # 세그먼트 대부분이 간격 안에 있거나 파일 끝 이후에 있으면 누락으로 판단
+            in_gap = any(gap_start <= start + duration / 2 <= gap_end for gap_start, gap_end in gaps)
+            beyond_end = covered_end is not None and start + duration / 2 > covered_end
+            if in_gap or beyond_end:
+                missing.append(index)
+            start = end
+        return missing
+
+    @profiled("verify", "verify")
+    def verify(self, file_path, playlist=None, source_url=None, deep=False, clip=None):
+        """파일 검사 후 매니페스트 기록
+
+        playlist가 없으면 매니페스트에 저장된 세그먼트 정보를 사용합니다.
+        deep=False이면 재생 시간만 비교하고 이미 검증된 뒤 변경되지 않은 파일은 건너뜁니다.
+        deep=True이면 오디오 패킷 타임스탬프로 중간 누락을 찾고 체크섬을 다시 계산합니다.
+        clip=(시작, 끝)이면 구간 다운로드로 보고 구간 길이만 비교합니다."""
+        if not os.path.exists(file_path):
+            return VerifyResult(file_path, False, None, None, 0, [], None, "파일이 없습니다.")
+
+        manifest = load_manifest(file_path) or {}
+        stat = os.stat(file_path)
+        unchanged = manifest.get('size') == stat.st_size and manifest.get('mtime') == stat.st_mtime
+
+        # 빠른 경로: 검증 이후 변경되지 않은 파일
+        if not deep and playlist is None and unchanged and manifest.get('verified'):
+            return VerifyResult(file_path, True, manifest.get('duration'), manifest.get('expected_duration'),
+                                len(manifest.get('segment_durations', [])), [], manifest.get('sha256'),
+                                "변경 없음 (이전 검증 결과 사용)")
+
+        clip = clip or manifest.get('clip')
+        if clip:
+            # 구간 파일은 세그먼트 경계와 맞지 않으므로 구간 전체를 하나로 취급
+            segment_durations = [clip[1] - clip[0]]
+        elif playlist is not None:
+            segment_durations = [segment.duration for segment in playlist.segments]
+        else:
+            segment_durations = manifest.get('segment_durations', [])
+        expected_duration = sum(segment_durations) if segment_durations else None
+
+        duration = self.probe_duration(file_path)
+        # 패킷 검사는 파일 전체를 읽으므로 정밀 검사에서만
+        covered_end, gaps = self.probe_gaps(file_path) if deep else (None, [])
+        if covered_end is None:
+            covered_end = duration
+
+        problems = []
+        missing = []
+        if duration is None:
+            problems.append("재생 시간을 읽을 수 없습니다")
+        if segment_durations:
+            missing = self.find_missing_segments(segment_durations, covered_end, gaps)
+            if missing:
+                problems.append(f"누락 세그먼트 {len(missing)}/{len(segment_durations)}개")
+            if duration is not None and abs(duration - expected_duration) > self.duration_tolerance:
+                problems.append(f"길이 불일치 ({duration:.1f}초 / 예상 {expected_duration:.1f}초)")
+        elif gaps:
+            problems.append(f"타임스탬프 불연속 {len(gaps)}곳")
+
+        # 정밀 검사에서만 체크섬 계산 후 이전 값과 비교 (내용이 바뀌지 않았어야 하는데 해시가 다르면 손상)
+        if deep:
+            checksum = file_sha256(file_path)
+            if unchanged and manifest.get('sha256') and checksum != manifest['sha256']:
+                problems.append("체크섬 불일치")
+        else:
+            checksum = manifest.get('sha256') if unchanged else None
+
+        ok = not problems
+        save_manifest(file_path, {
+            'version': 1,
+            'source_url': source_url or manifest.get('source_url'),
+            'playlist_url': playlist.url if playlist is not None else manifest.get('playlist_url'),
+            'format': os.path.splitext(file_path)[1].lstrip('.').lower(),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': checksum,
+            'duration': duration,
+            'expected_duration': expected_duration,
+            'segment_durations': segment_durations,
+            'missing_segments': missing,
+            'clip': list(clip) if clip else None,
+            'verified': ok,
+            'verified_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+
+        message = "정상" if ok else ", ".join(problems)
+        return VerifyResult(file_path, ok, duration, expected_duration,
+                            len(segment_durations), missing, checksum, message)
+
+    @profiled("repair", "verify")
+    def repair(self, file_path, playlist, missing_segments, log=print):
+        """누락된 세그먼트만 다시 받아 기존 파일의 정상 구간과 이어 붙여 재구성"""
+        output_format = os.path.splitext(file_path)[1].lstrip('.').lower()
+        ffmpeg_cmd = self.ffmpeg_manager.get_ffmpeg_command()
+        missing = set(missing_segments)
+        work_dir = tempfile.mkdtemp(prefix="coursemos_repair_")
+
+        try:
+            # 정상/누락 구간을 연속된 묶음으로 나눔
+            runs = []
+            for segment in playlist.segments:
+                is_missing = segment.index in missing
+                if runs and runs[-1][0] == is_missing:
+                    runs[-1][1].append(segment)
+                else:
+                    runs.append((is_missing, [segment]))
+
+            fetcher = SegmentFetcher()
+            part_ext = 'mp3' if output_format == 'mp3' else 'ts'
+            part_paths = []
+
+            for run_index, (is_missing, segments) in enumerate(runs):
+                part_path = os.path.join(work_dir, f"part{run_index:05d}.{part_ext}")
+                run_start = segments[0].start
+                run_end = segments[-1].start + segments[-1].duration
+
+                if is_missing:
+                    # 누락 구간: 해당 세그먼트만 다시 받기
+                    log(f"세그먼트 {segments[0].index + 1}~{segments[-1].index + 1} 다시 받는 중...")
+                    raw_path = os.path.join(work_dir, f"raw{run_index:05d}.ts")
+                    with open(raw_path, 'wb') as f:
+                        for _, data in fetcher.fetch_iter(segments):
+                            f.write(data)
+                    if output_format == 'mp3':
+                        command = [ffmpeg_cmd, '-y', '-v', 'error', '-i', raw_path, '-vn',
+                                   '-codec:a', 'libmp3lame', '-b:a', '192k', '-f', 'mp3', part_path]
+                    else:
+                        os.replace(raw_path, part_path)
+                        command = None
+                else:
+                    # 정상 구간: 기존 파일에서 그대로 잘라냄 (세그먼트 경계는 키프레임)
+                    command = [ffmpeg_cmd, '-y', '-v', 'error', '-ss', f"{run_start:.3f}", '-to', f"{run_end:.3f}",
+                               '-i', file_path, '-c', 'copy',
+                               '-f', 'mp3' if output_format == 'mp3' else 'mpegts', part_path]
+
+                if command:
+                    result = get_cpu_governor().run(command, 'encode' if is_missing else 'remux',
+                                                    capture_output=True, text=True, encoding='utf-8',
+                                                    errors='replace')
+                    if result.returncode != 0:
+                        log(f"구간 처리 실패: {result.stderr.strip()}")
+                        return False
+                part_paths.append(part_path)
+
+            # concat demuxer로 다시 합치기
+            list_path = os.path.join(work_dir, "parts.txt")
+            with open(list_path, 'w', encoding='utf-8') as f:
+                for part_path in part_paths:
+                    f.write("file '{}'\n".format(part_path.replace("'", "'\\''")))
+
+            repaired_path = os.path.join(work_dir, f"repaired.{output_format}")
+            command = [ffmpeg_cmd, '-y', '-v', 'error', '-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy']
+            if output_format != 'mp3':
+                command += ['-bsf:a', 'aac_adtstoasc']
+            command.append(repaired_path)
+            result = get_cpu_governor().run(command, 'remux', capture_output=True, text=True,
+                                            encoding='utf-8', errors='replace')
+            if result.returncode != 0:
+                log(f"리먹싱 실패: {result.stderr.strip()}")
+                return False
+
+            shutil.move(repaired_path, file_path)
+            log(f"복구 완료: {file_path}")
+            return True
+
+        except Exception as e:
+            log(f"복구 중 오류: {str(e)}")
+            return False
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class VerifyThread(QThread):
+    """저장된 파일들을 병렬로 검사(및 복구)하는 스레드"""
+    progress_update = pyqtSignal(str)
+    progress_percent = pyqtSignal(int)
+    verify_finished = pyqtSignal(list)  # 문제가 있는 VerifyResult 목록
+
+    MEDIA_EXTENSIONS = ('.mp4', '.mp3')
+
+    def __init__(self, paths, ffmpeg_manager, repair=False, deep=False):
+        super().__init__()
+        self.paths = paths  # 폴더 또는 파일 경로 목록
+        self.verifier = IntegrityVerifier(ffmpeg_manager)
+        self.repair = repair
+        self.deep = deep
+
+    def collect_files(self):
+        """검사할 미디어 파일 목록 수집"""
+        files = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                for root, dirs, names in os.walk(path):
+                    for name in sorted(names):
+                        if name.lower().endswith(self.MEDIA_EXTENSIONS):
+                            files.append(os.path.join(root, name))
+            elif os.path.isfile(path):
+                files.append(path)
+        return files
+
+    def check_file(self, file_path):
+        """파일 하나 검사 후 필요하면 누락 세그먼트 복구"""
+        result = self.verifier.verify(file_path, deep=self.deep)
+        if result.ok or not self.repair or not result.missing_segments:
+            return result
+
+        manifest = load_manifest(file_path) or {}
+        playlist_url = manifest.get('playlist_url') or manifest.get('source_url')
+        if not playlist_url or manifest.get('clip'):
+            return result  # 구간 파일은 원본 세그먼트 구성과 달라 부분 복구 불가
+
+        playlist = load_media_playlist(playlist_url)
+        if self.verifier.repair(file_path, playlist, result.missing_segments, log=self.progress_update.emit):
+            result = self.verifier.verify(file_path, playlist, deep=self.deep)
+        return result
+
+    @profiled_thread("VerifyThread")
+    def run(self):
+        files = self.collect_files()
+        self.progress_update.emit(f"검사할 파일: {len(files)}개")
+        problems = []
+
+        if files:
+            # ffprobe는 별도 프로세스이므로 코어 수만큼 병렬 실행
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+                futures = {executor.submit(self.check_file, file_path): file_path for file_path in files}
+                for done, future in enumerate(as_completed(futures), 1):
+                    file_path = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = VerifyResult(file_path, False, None, None, 0, [], None, f"검사 오류: {str(e)}")
+
+                    if not result.ok:
+                        problems.append(result)
+                        self.progress_update.emit(f"[문제] {os.path.basename(file_path)}: {result.message}")
+                    self.progress_percent.emit(int(done / len(files) * 100))
+
+        self.progress_update.emit(f"검사 완료: 정상 {len(files) - len(problems)}개, 문제 {len(problems)}개")
+        self.verify_finished.emit(problems)
+
+
+class GitHubUpdaterManager:
+    """GitHub 업데이트 관리자"""
+    
+    def __init__(self, parent):
+        """
+        parent: 부모 윈도우 (QMainWindow)
+        """
+        self.parent = parent
+        
+    def check_for_updates(self, silent=False):
+        """업데이트 확인 시작"""
+        self.checker = GitHubUpdateChecker(APP_VERSION, GITHUB_OWNER, GITHUB_REPO)
+        self.checker.update_available.connect(
+            lambda version, url, notes: self.on_update_available(version, url, notes, silent)
+        )
+        self.checker.start()
+    
+    def on_update_available(self, new_version, download_url, release_notes, silent):
+        """새 업데이트가 있을 때 호출"""
+        # silent 파라미터를 무시하고 항상 업데이트 대화상자 표시
+        detail_text = f"변경 사항:\n\n{release_notes}" if release_notes else ""
+        
+        msg_box = QMessageBox(self.parent)
+        msg_box.setWindowTitle("업데이트 가능")
+        msg_box.setText(f"새 버전({new_version})이 있습니다. 현재 버전: {APP_VERSION}")
+        msg_box.setInformativeText(
+            "지금 업데이트하시겠습니까?\n\n"
+            "업데이트가 완료되면 프로그램을 재시작해야 합니다."
+        )
+        if detail_text:
+            msg_box.setDetailedText(detail_text)
+        msg_box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        msg_box.setDefaultButton(QMessageBox.Yes)
+        
+        if msg_box.exec() == QMessageBox.Yes:
+            self.parent.log(f"새 버전 v{new_version} 업데이트를 시작합니다...", job="update")
+            self._start_update(download_url, new_version)
+    
+    def _start_update(self, download_url, version):
+        """업데이트 시작"""
+        # 현재 스크립트 경로
+        current_file = os.path.abspath(sys.argv[0])
+        
+        # 중복 인스턴스 확인
+        try:
+            script_name = os.path.basename(current_file)
+            import psutil
+            
+            count = 0
+            for proc in psutil.process_iter(['name', 'cmdline']):
+                try:
+                    cmdline = proc.info.get('cmdline', [])
+                    if len(cmdline) > 1 and script_name in cmdline[-1]:
+                        count += 1
+                except:
+                    pass
+                    
+            if count > 1:
+                QMessageBox.warning(
+                    self.parent,
+                    "업데이트 불가",
+                    "이 프로그램의 다른 인스턴스가 실행 중입니다.\n모든 인스턴스를 종료한 후에 업데이트를 진행해주세요."
+                )
+                return
+        except:
+            pass  # psutil 모듈이 없어도 계속 진행
+        
+        # 업데이트 스레드 시작
+        self.updater = DirectUpdater(download_url, current_file)
+        self.updater.progress_update.connect(self.parent.show_update_progress)
+        self.updater.update_completed.connect(self.on_update_completed)
+        self.updater.start()
+        
+        self.parent.log("업데이트 파일 다운로드 중...", job="update")
+    
+    def on_update_completed(self, success, message):
+        """업데이트 완료 처리"""
+        if success:
+            result = QMessageBox.information(
+                self.parent,
+                "업데이트 준비 완료",
+                f"{message}\n\n지금 프로그램을 종료하고 업데이트를 진행하시겠습니까?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes
+            )
+        
+            if result == QMessageBox.Yes:
+                # 현재 디렉토리의 update.bat 실행 후 프로그램 종료
+                update_bat = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), "update.bat")
+                if os.path.exists(update_bat):
+                    subprocess.Popen([update_bat], shell=True)
+                    QApplication.quit()  # 프로그램 종료
+        else:
+            QMessageBox.warning(self.parent, "업데이트 실패", message)
+
+class CoursemosDownloader(QMainWindow):
+    """Coursemos 다운로더 메인 윈도우"""
+    
+    def __init__(self):
+        super().__init__()
+        self.m3u8_urls = []
+        self.selected_url = None
+        self.ffmpeg_threads = {}  # 형식 -> 진행 중인 변환 작업
+        self.save_folder = os.path.expanduser("~/Downloads")  # 기본 다운로드 폴더
+        self.settings = QSettings("CoursemosDownloader", "Settings")
+        self.current_job = APP_LOG_JOB  # 현재 로그를 기록할 작업 ID
+        self.load_settings()
+        
+        # 로그 파일 관리자 (작업별 회전 파일)
+        self.log_files = JobLogFiles(os.path.join(get_app_data_dir(), "logs"))
+        self.known_log_jobs = set()
+        
+        # 설정에서 프로파일링 모드가 켜져 있으면 시작
+        if self.settings.value("profiling", False, type=bool):
+            PROFILER.enable(os.path.join(get_app_data_dir(), "profiles"),
+                            cprofile=self.settings.value("profiling_cprofile", False, type=bool))
+        
+        # ffmpeg 관리자 초기화
+        self.ffmpeg_manager = FFmpegManager()
+        
+        # 백그라운드 작업(로컬 저장 후 이동, 아카이브 인코딩) 결과 표시
+        get_background_mover().move_finished.connect(self.move_completed)
+        get_archive_encoder(self.ffmpeg_manager).archive_finished.connect(self.move_completed)
+        
+        # 로고 설정
+        icon_path = self.resource_path("logo.png")  # 로고 파일 경로
+        if os.path.exists(icon_path):
+            self.setWindowIcon(QIcon(icon_path))
+        
+        self.init_ui()
+        
+        # 업데이트 관리자 초기화
+        self.updater_manager = GitHubUpdaterManager(self)
+        
+        # 앱 시작 시 자동 업데이트 확인
+        QTimer.singleShot(1000, lambda: self.updater_manager.check_for_updates())
+    
+    def resource_path(self, relative_path):
+        """애플리케이션 리소스 파일의 절대 경로를 반환합니다.
+        PyInstaller로 패키징된 경우와 일반 Python 실행 시 모두 작동합니다."""
+        try:
+            # PyInstaller가 생성한 임시 폴더 경로
             base_path = sys._MEIPASS
         except Exception:
             # 일반적인 Python 실행 시 스크립트 위치 기준
@@ -636,6 +3218,30 @@ class CoursemosDownloader(QMainWindow):
         self.setWindowTitle(f'Coursemos Downloader v{APP_VERSION}')
         self.setGeometry(100, 100, 1000, 500)
         
+        # 도구 메뉴 (프로파일링)
+        tools_menu = self.menuBar().addMenu("도구")
+        self.profiling_action = QAction("프로파일링 모드", self, checkable=True)
+        self.profiling_action.setChecked(PROFILER.enabled)
+        self.profiling_action.toggled.connect(self.toggle_profiling)
+        tools_menu.addAction(self.profiling_action)
+        
+        # cProfile 함수별 통계 (.prof) 함께 저장 (다음에 프로파일링을 켤 때 적용)
+        self.cprofile_action = QAction("cProfile 통계도 저장", self, checkable=True)
+        self.cprofile_action.setChecked(self.settings.value("profiling_cprofile", False, type=bool))
+        self.cprofile_action.toggled.connect(self.toggle_cprofile)
+        tools_menu.addAction(self.cprofile_action)
+        
+        export_trace_action = QAction("추적 파일 내보내기", self)
+        export_trace_action.triggered.connect(self.export_trace)
+        tools_menu.addAction(export_trace_action)
+        
+        # 정밀 검사: 변경되지 않은 파일도 오디오 패킷으로 중간 누락을 찾고 체크섬을 새로 계산 (파일 전체를 읽음)
+        tools_menu.addSeparator()
+        self.deep_verify_action = QAction("정밀 검사 (패킷 및 체크섬 검사)", self, checkable=True)
+        self.deep_verify_action.setChecked(self.settings.value("deep_verify", False, type=bool))
+        self.deep_verify_action.toggled.connect(lambda checked: self.settings.setValue("deep_verify", checked))
+        tools_menu.addAction(self.deep_verify_action)
+        
         # 메인 레이아웃 - 좌측과 우측 패널 (좌측 1:2 우측 비율)
         main_layout = QHBoxLayout()
         
@@ -696,6 +3302,36 @@ class CoursemosDownloader(QMainWindow):
         format_layout.addWidget(self.mp3_checkbox)
         left_layout.addLayout(format_layout)
         
+        # 강의 아카이브 압축 (MP4를 슬라이드 영상용으로 다시 인코딩)
+        self.archive_checkbox = QCheckBox("아카이브 압축 (슬라이드 강의용)")
+        self.archive_checkbox.setChecked(self.settings.value("archive_profile", False, type=bool))
+        self.archive_checkbox.toggled.connect(lambda checked: self.settings.setValue("archive_profile", checked))
+        left_layout.addWidget(self.archive_checkbox)
+        
+        # 구간 다운로드 (비워두면 전체)
+        clip_layout = QHBoxLayout()
+        self.start_time_edit = QLineEdit()
+        self.start_time_edit.setPlaceholderText("시작 (HH:MM:SS)")
+        self.end_time_edit = QLineEdit()
+        self.end_time_edit.setPlaceholderText("끝 (HH:MM:SS)")
+        
+        clip_layout.addWidget(self.start_time_edit)
+        clip_layout.addWidget(QLabel("~"))
+        clip_layout.addWidget(self.end_time_edit)
+        left_layout.addLayout(clip_layout)
+        
+        # 여러 m3u8 후보 중 선택 정책
+        self.probe_policy_combo = QComboBox()
+        for policy, label in PROBE_POLICIES:
+            self.probe_policy_combo.addItem(label, policy)
+        saved_policy = self.settings.value("probe_policy", "balanced")
+        policy_index = self.probe_policy_combo.findData(saved_policy)
+        self.probe_policy_combo.setCurrentIndex(max(policy_index, 0))
+        self.probe_policy_combo.currentIndexChanged.connect(
+            lambda: self.settings.setValue("probe_policy", self.probe_policy_combo.currentData())
+        )
+        left_layout.addWidget(self.probe_policy_combo)
+        
         # 간격 추가
         left_layout.addSpacing(20)
         
@@ -720,6 +3356,12 @@ class CoursemosDownloader(QMainWindow):
         left_layout.addSpacing(20)
         left_layout.addLayout(save_layout)
         
+        # 저장된 파일 무결성 검사 버튼
+        self.verify_btn = QPushButton("Verify Folder")
+        self.verify_btn.setStyleSheet("background-color: #3498db; color: white;")
+        self.verify_btn.clicked.connect(self.verify_folder)
+        left_layout.addWidget(self.verify_btn)
+        
         # 좌측 패널에 빈 공간 추가
         left_layout.addStretch()
         
@@ -728,10 +3370,34 @@ class CoursemosDownloader(QMainWindow):
         right_panel.setFrameShape(QFrame.StyledPanel)
         right_layout = QVBoxLayout(right_panel)
         
-        # 상태 메시지
-        self.status_text = QTextEdit()
-        self.status_text.setReadOnly(True)
-        right_layout.addWidget(self.status_text)
+        # 로그 필터 (레벨/작업)
+        filter_layout = QHBoxLayout()
+        self.log_level_combo = QComboBox()
+        for level_name, level_value in LOG_LEVELS:
+            self.log_level_combo.addItem(level_name, level_value)
+        self.log_job_combo = QComboBox()
+        self.log_job_combo.addItem("모든 작업", None)
+        self.log_level_combo.currentIndexChanged.connect(self.apply_log_filter)
+        self.log_job_combo.currentIndexChanged.connect(self.apply_log_filter)
+        
+        filter_layout.addWidget(QLabel("레벨:"))
+        filter_layout.addWidget(self.log_level_combo)
+        filter_layout.addWidget(QLabel("작업:"))
+        filter_layout.addWidget(self.log_job_combo, 1)
+        right_layout.addLayout(filter_layout)
+        
+        # 상태 메시지 (링 버퍼 + 가상화된 리스트 뷰)
+        self.log_model = LogListModel(parent=self)
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)  # 보이는 행만 그리도록 고정 높이 사용
+        self.log_view.setEditTriggers(QListView.NoEditTriggers)
+        self.log_view.setSelectionMode(QListView.ExtendedSelection)
+        self.log_model.rowsAboutToBeInserted.connect(self._remember_log_scroll)
+        self.log_model.rowsInserted.connect(self._follow_log_scroll)
+        self.log_model.jobs_dropped.connect(self.remove_log_jobs)
+        self.log_follow = True
+        right_layout.addWidget(self.log_view)
         
         # 진행 상태바
         self.progress_bar = QProgressBar()
@@ -740,6 +3406,13 @@ class CoursemosDownloader(QMainWindow):
         self.progress_bar.setVisible(True)
         right_layout.addWidget(self.progress_bar)
         
+        # 단계별 대기열 상태
+        self.stage_label = QLabel(format_stage_depths(get_stage_pipeline().depths()))
+        right_layout.addWidget(self.stage_label)
+        self.stage_timer = QTimer(self)
+        self.stage_timer.timeout.connect(self.update_stage_depths)
+        self.stage_timer.start(500)
+        
         # 패널 추가
         main_layout.addWidget(left_panel, 1)
         main_layout.addWidget(right_panel, 2)
@@ -750,9 +3423,54 @@ class CoursemosDownloader(QMainWindow):
         self.setCentralWidget(main_widget)
         
         # 초기 상태 메시지
-        self.status_text.append("Coursemos Downloader가 시작되었습니다.")
-        self.status_text.append("HTML 파일을 선택하여 시작하세요.")
-        self.status_text.append(f"저장 경로: {self.save_folder}")
+        self.log("Coursemos Downloader가 시작되었습니다.")
+        self.log("HTML 파일을 선택하여 시작하세요.")
+        self.log(f"저장 경로: {self.save_folder}")
+    
+    def log(self, message, level=logging.INFO, job=None):
+        """로그 기록 (메모리 링 버퍼 + 작업별 파일)"""
+        if isinstance(level, str):
+            level = logging.getLevelName(level)
+        entry = LogEntry(time.time(), level, job or self.current_job, message)
+        self.log_model.append(entry)
+        self.log_files.write(entry)
+        
+        # 새 작업이면 작업 필터 목록에 추가
+        if entry.job not in self.known_log_jobs:
+            self.known_log_jobs.add(entry.job)
+            self.log_job_combo.addItem(entry.job, entry.job)
+    
+    def remove_log_jobs(self, jobs):
+        """항목이 모두 밀려난 작업을 필터 목록에서 제거 (지금 선택한 작업은 유지)"""
+        selected = self.log_job_combo.currentData()
+        for job in jobs:
+            index = self.log_job_combo.findData(job)
+            if job == selected or index < 0:
+                continue
+            self.log_job_combo.removeItem(index)
+            self.known_log_jobs.discard(job)
+    
+    def clear_log(self):
+        """화면의 로그 비우기 (파일 로그는 유지)"""
+        self.log_model.clear()
+    
+    def apply_log_filter(self):
+        """레벨/작업 필터 적용"""
+        self.log_model.set_filter(
+            self.log_level_combo.currentData(),
+            self.log_job_combo.currentData()
+        )
+        self.log_view.scrollToBottom()
+    
+    def _remember_log_scroll(self):
+        """항목 추가 전 스크롤이 맨 아래였는지 기록"""
+        scroll_bar = self.log_view.verticalScrollBar()
+        self.log_follow = scroll_bar.value() >= scroll_bar.maximum()
+    
+    def _follow_log_scroll(self):
+        """맨 아래를 보고 있었으면 새 항목을 따라 스크롤"""
+        if self.log_follow:
+            self.log_view.scrollToBottom()
     
     def select_html_file(self):
         """HTML 파일 선택 다이얼로그"""
@@ -761,14 +3479,14 @@ class CoursemosDownloader(QMainWindow):
         )
         
         if file_path:
-            self.status_text.clear()
+            self.clear_log()
             file_name = os.path.basename(file_path)
             self.selected_file_label.setText(f"Selected: {file_name}")
             self.html_file_path = file_path
-            self.status_text.append(f"HTML 파일을 선택했습니다: {file_path}")
+            self.log(f"HTML 파일을 선택했습니다: {file_path}")
             
             # URL 추출 시작
-            self.status_text.append("m3u8 링크를 찾을 수 없습니다. HTML 파일을 확인해주세요.")
+            self.log("m3u8 링크를 찾을 수 없습니다. HTML 파일을 확인해주세요.")
             
             # 자동으로 URL 추출 실행
             self.extract_urls()
@@ -782,107 +3500,70 @@ class CoursemosDownloader(QMainWindow):
         if folder_path:
             self.save_folder = folder_path
             self.save_path_label.setText(f"Save to: {folder_path}")
-            self.status_text.append(f"저장 폴더가 설정되었습니다: {folder_path}")
+            self.log(f"저장 폴더가 설정되었습니다: {folder_path}")
             
             # 설정 저장
             self.settings.setValue("save_folder", folder_path)
     
     def sanitize_filename(self, filename):
         """파일명에 사용할 수 없는 문자 제거"""
-        # 파일명으로 사용할 수 없는 문자 제거
-        invalid_chars = r'[\\/*?:"<>|]'
-        sanitized = re.sub(invalid_chars, '', filename)
-        # 긴 파일명은 축약
-        if len(sanitized) > 50:
-            sanitized = sanitized[:47] + '...'
-        return sanitized
+        return sanitize_filename(filename)
     
+    @profiled("ui.extract_urls", "ui")
     def extract_urls(self):
         """HTML 파일에서 m3u8 URL 추출"""
         if not hasattr(self, 'html_file_path'):
-            self.status_text.append("HTML 파일을 먼저 선택해주세요.")
+            self.log("HTML 파일을 먼저 선택해주세요.")
             return
             
         try:
-            # 여러 인코딩을 시도
-            encodings = ['utf-8', 'cp949', 'euc-kr']
-            html_content = None
-            
-            for encoding in encodings:
-                try:
-                    with open(self.html_file_path, 'r', encoding=encoding) as file:
-                        html_content = file.read()
-                    break  # 성공적으로 읽었으면 반복 중단
-                except UnicodeDecodeError:
-                    continue
-                    
-            if html_content is None:
-                raise Exception("HTML 파일을 읽을 수 없습니다. 지원되지 않는 인코딩입니다.")
-                
-            # BeautifulSoup으로 파싱
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 페이지 제목 추출 (자동 파일명 생성용)
-            title_tag = soup.find('title')
-            if title_tag and title_tag.string:
-                self.page_title = self.sanitize_filename(title_tag.string.strip())
-            else:
-                # 제목이 없으면 HTML 파일명을 기반으로 제목 설정
-                self.page_title = self.sanitize_filename(os.path.splitext(os.path.basename(self.html_file_path))[0])
-            
-            # m3u8 URL 정규식 패턴
-            m3u8_pattern = r'https?://[^\s\'\"]+\.m3u8[^\s\'\"]*'
-            
-            # HTML에서 스크립트와 소스 속성 검색
-            self.m3u8_urls = []
-            
-            # 스크립트 내용에서 검색
-            for script in soup.find_all('script'):
-                if script.string:
-                    urls = re.findall(m3u8_pattern, script.string)
-                    self.m3u8_urls.extend(urls)
-            
-            # 소스 태그에서 검색
-            for source in soup.find_all('source'):
-                if source.get('src'):
-                    url = source.get('src')
-                    if '.m3u8' in url:
-                        self.m3u8_urls.append(url)
-            
-            # video 태그에서 검색
-            for video in soup.find_all('video'):
-                if video.get('src'):
-                    url = video.get('src')
-                    if '.m3u8' in url:
-                        self.m3u8_urls.append(url)
-            
-            # 전체 HTML 텍스트에서 추가 검색
-            additional_urls = re.findall(m3u8_pattern, html_content)
-            self.m3u8_urls.extend(additional_urls)
-            
-            # 중복 제거
-            self.m3u8_urls = list(set(self.m3u8_urls))
+            self.page_title, self.m3u8_urls = extract_m3u8_from_html(self.html_file_path)
             
             # 결과 표시
             if self.m3u8_urls:
-                self.status_text.clear()
-                self.status_text.append(f"HTML 파일을 선택했습니다: {self.html_file_path}")
-                self.status_text.append(f"m3u8 링크를 찾을 수 있습니다.")
-                self.status_text.append(f"{len(self.m3u8_urls)}개의 m3u8 URL을 발견했습니다.")
+                self.clear_log()
+                self.log(f"HTML 파일을 선택했습니다: {self.html_file_path}")
+                self.log(f"m3u8 링크를 찾을 수 있습니다.")
+                self.log(f"{len(self.m3u8_urls)}개의 m3u8 URL을 발견했습니다.")
                 
                 for i, url in enumerate(self.m3u8_urls):
-                    self.status_text.append(f"{i+1}. {url}")
+                    self.log(f"{i+1}. {url}")
                 
-                # 첫 번째 URL 선택
-                self.selected_url = self.m3u8_urls[0]
-                self.download_btn.setEnabled(True)
+                # 모든 후보를 병렬로 검사해 가장 좋은 URL 선택
+                self.selected_url = None
+                self.download_btn.setEnabled(False)
+                self.log("후보 URL을 검사하는 중...")
+                self.probe_thread = UrlProbeThread(self.m3u8_urls, self.probe_policy_combo.currentData())
+                self.probe_thread.probe_finished.connect(self.probe_completed)
+                self.probe_thread.start()
             else:
-                self.status_text.clear()
-                self.status_text.append("m3u8 URL을 찾을 수 없습니다. HTML 파일을 확인해주세요.")
+                self.clear_log()
+                self.log("m3u8 URL을 찾을 수 없습니다. HTML 파일을 확인해주세요.")
                 self.download_btn.setEnabled(False)
                 
         except Exception as e:
-            self.status_text.append(f"URL 추출 중 오류가 발생했습니다: {str(e)}")
+            self.log(f"URL 추출 중 오류가 발생했습니다: {str(e)}", logging.ERROR)
+    
+    @profiled("ui.probe_completed", "ui")
+    def probe_completed(self, results):
+        """후보 검사 결과 표시 및 최적 URL 선택"""
+        self.probe_results = results
+        self.log("후보 URL 순위:")
+        for rank, result in enumerate(results, 1):
+            self.log(format_probe_result(rank, result), logging.INFO if result.ok else logging.WARNING)
+        
+        if results and results[0].ok:
+            self.selected_url = results[0].url
+            self.log(f"선택된 URL: {self.selected_url}")
+            self.mirror_urls = find_mirror_urls(results)
+            if self.mirror_urls:
+                self.log(f"같은 강의의 미러 {len(self.mirror_urls)}개를 헤지 요청에 사용합니다.")
+        else:
+            # 모두 실패하면 발견 순서상 첫 번째 URL로 시도 (ffmpeg가 처리할 수 있는 경우 대비)
+            self.selected_url = self.m3u8_urls[0]
+            self.mirror_urls = []
+            self.log("응답하는 후보가 없어 첫 번째 URL을 사용합니다.", logging.WARNING)
+        self.download_btn.setEnabled(True)
     
     def start_download(self):
         """다운로드 시작"""
@@ -893,6 +3574,21 @@ class CoursemosDownloader(QMainWindow):
         if not hasattr(self, 'selected_url') or not self.selected_url:
             QMessageBox.warning(self, "경고", "변환할 URL이 선택되지 않았습니다.")
             return
+        
+        # 구간 다운로드 시간 확인
+        try:
+            start_text = self.start_time_edit.text().strip()
+            end_text = self.end_time_edit.text().strip()
+            start_time = parse_time_value(start_text) if start_text else None
+            end_time = parse_time_value(end_text) if end_text else None
+        except ValueError as e:
+            QMessageBox.warning(self, "경고", str(e))
+            return
+        
+        if start_time is not None and end_time is not None and start_time >= end_time:
+            QMessageBox.warning(self, "경고", "끝 시간은 시작 시간보다 뒤여야 합니다.")
+            return
+        self.clip_range = (start_time, end_time)
             
         # 내장된 ffmpeg 사용
         if not self.ffmpeg_manager.ffmpeg_path:
@@ -903,84 +3599,174 @@ class CoursemosDownloader(QMainWindow):
             )
             return
         
-        # 선택된 형식에 따라 다운로드 시작
-        if self.mp4_checkbox.isChecked():
-            self._download_file('mp4')
-        
-        if self.mp3_checkbox.isChecked():
-            if not self.mp4_checkbox.isChecked():  # MP4가 선택되지 않은 경우에만 바로 시작
-                self._download_file('mp3')
-            else:
-                # MP4 변환이 완료된 후 MP3 변환 시작 (conversion_finished 시그널에서 처리)
-                pass
+        # 선택된 형식을 모두 파이프라인에 넣음 (MP4를 변환하는 동안 MP3를 받음)
+        formats = [format_type for format_type, checkbox in (('mp4', self.mp4_checkbox), ('mp3', self.mp3_checkbox))
+                   if checkbox.isChecked()]
+        self.ffmpeg_threads = {}
+        self.download_percents = dict.fromkeys(formats, 0)
+        self.download_results = {}
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.download_btn.setEnabled(False)
+        for format_type in formats:
+            self._download_file(format_type)
     
     def _download_file(self, format_type):
-        """파일 다운로드 공통 처리 로직"""
+        """형식 하나의 변환 작업을 만들어 단계 파이프라인에 제출"""
         # 출력 파일 경로 설정
-        output_path = os.path.join(self.save_folder, f"{self.page_title}.{format_type}")
+        start_time, end_time = getattr(self, 'clip_range', (None, None))
+        is_clip = start_time is not None or end_time is not None
+        file_title = self.page_title + (clip_file_suffix(start_time, end_time) if is_clip else "")
+        output_path = os.path.join(self.save_folder, f"{file_title}.{format_type}")
         
-        # 변환 시작
-        self.status_text.append(f"{format_type.upper()} 변환 시작: {self.selected_url}")
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        self.download_btn.setEnabled(False)
+        # 형식마다 동시에 진행되므로 로그는 형식별 작업 ID로 기록
+        job = f"{file_title}.{format_type}"
+        self.log(f"{format_type.upper()} 변환 시작: {self.selected_url}", job=job)
         
-        # 변환 스레드 시작 (ffmpeg_manager 추가)
-        self.ffmpeg_thread = FFmpegThread(self.selected_url, output_path, format_type, self.ffmpeg_manager)
-        self.ffmpeg_thread.progress_update.connect(self.update_progress)
-        self.ffmpeg_thread.progress_percent.connect(self.update_progress_bar)
-        self.ffmpeg_thread.conversion_finished.connect(self.conversion_completed)
-        self.ffmpeg_thread.start()
+        thread = FFmpegThread(self.selected_url, output_path, format_type, self.ffmpeg_manager,
+                              start_time, end_time, getattr(self, 'mirror_urls', []),
+                              self.archive_checkbox.isChecked())
+        thread.progress_update.connect(lambda message: self.update_progress(message, job))
+        thread.progress_percent.connect(lambda percent: self.update_download_percent(format_type, percent))
+        thread.conversion_finished.connect(
+            lambda success, message, file_path: self.conversion_completed(format_type, job, success, message,
+                                                                          file_path))
+        self.ffmpeg_threads[format_type] = thread
+        # GUI는 형식당 하나씩 최대 2개만 넣으므로 받기 큐(크기 2)에서 기다리지 않음
+        get_stage_pipeline().submit(thread)
     
-    def update_progress(self, message):
+    @profiled("ui.update_progress", "ui")
+    def update_progress(self, message, job=None):
         """변환 진행 상황 업데이트"""
         try:
-            self.status_text.append(message)
-            # 스크롤을 항상 아래로 유지
-            self.status_text.verticalScrollBar().setValue(
-                self.status_text.verticalScrollBar().maximum()
-            )
+            # ffmpeg 출력은 양이 많으므로 DEBUG 레벨로 기록
+            self.log(message, logging.DEBUG, job=job)
         except Exception as e:
-            self.status_text.append(f"로그 업데이트 중 오류: {str(e)}")
+            print(f"로그 업데이트 중 오류: {str(e)}")
+    
+    def update_stage_depths(self):
+        """단계별 대기열 상태 갱신"""
+        self.stage_label.setText(format_stage_depths(get_stage_pipeline().depths()))
     
+    @profiled("ui.update_progress_bar", "ui")
     def update_progress_bar(self, percent):
         """진행률 업데이트"""
         self.progress_bar.setValue(percent)
     
-    def conversion_completed(self, success, message, file_path):
-        """변환 완료 처리"""
-        # 현재 변환 형식 확인
-        current_format = "MP3" if hasattr(self, 'ffmpeg_thread') and self.ffmpeg_thread.output_format == 'mp3' else "MP4"
-        
+    def update_download_percent(self, format_type, percent):
+        """형식별 진행률을 받아 전체 진행률(평균) 표시"""
+        self.download_percents[format_type] = percent
+        self.update_progress_bar(sum(self.download_percents.values()) // len(self.download_percents))
+    
+    @profiled("ui.conversion_completed", "ui")
+    def conversion_completed(self, format_type, job, success, message, file_path):
+        """형식 하나의 변환 완료 처리 (모든 형식이 끝나면 결과 알림)"""
+        current_format = format_type.upper()
         if success:
-            self.progress_bar.setValue(100)
-            self.status_text.append(f"{current_format} 변환 완료: {file_path}")
-            
-            # MP4 변환 완료 후 MP3도 선택되어 있는 경우
-            if current_format == "MP4" and self.mp3_checkbox.isChecked():
-                self._download_file('mp3')
-                return
+            self.log(f"{current_format} 변환 완료: {file_path}", job=job)
+            self.update_download_percent(format_type, 100)
         else:
-            self.status_text.append(f"{current_format} 변환 실패: {message}")
+            self.log(f"{current_format} 변환 실패: {message}", logging.ERROR, job=job)
+        self.log_files.close(job)
+        self.ffmpeg_threads.pop(format_type, None)
+        self.download_results[format_type] = success
+        
+        if len(self.download_results) < len(self.download_percents):
+            return
         
         # 모든 변환이 완료되거나 실패한 경우
         self.download_btn.setEnabled(True)
+        if all(self.download_results.values()):
+            if len(self.download_results) > 1:
+                QMessageBox.information(self, "완료", "모든 다운로드가 완료되었습니다.")
+            else:
+                QMessageBox.information(self, "완료", f"{current_format} 다운로드가 완료되었습니다.")
+    
+    def verify_folder(self):
+        """폴더 안의 저장된 파일들을 검사"""
+        folder_path = QFileDialog.getExistingDirectory(
+            self, "검사할 폴더 선택", self.save_folder
+        )
+        
+        if folder_path:
+            self._start_verify([folder_path], repair=False)
+    
+    def _start_verify(self, paths, repair):
+        """검사(복구) 스레드 시작"""
+        self.log("복구 시작" if repair else f"검사 시작: {', '.join(paths)}", job="verify")
+        self.verify_btn.setEnabled(False)
+        self.progress_bar.setValue(0)
+        
+        self.verify_thread = VerifyThread(paths, self.ffmpeg_manager, repair=repair,
+                                          deep=self.deep_verify_action.isChecked())
+        self.verify_thread.progress_update.connect(lambda message: self.log(message, job="verify"))
+        self.verify_thread.progress_percent.connect(self.update_progress_bar)
+        self.verify_thread.verify_finished.connect(self.verify_completed)
+        self.verify_thread.start()
+    
+    @profiled("ui.verify_completed", "ui")
+    def verify_completed(self, problems):
+        """검사 완료 처리"""
+        was_repair = self.verify_thread.repair
+        self.verify_btn.setEnabled(True)
+        
+        for result in problems:
+            self.log(f"{result.file_path}: {result.message}", logging.WARNING, job="verify")
+        
+        repairable = [result.file_path for result in problems if result.missing_segments]
+        if repairable and not was_repair:
+            answer = QMessageBox.question(
+                self, "복구",
+                f"{len(repairable)}개 파일에서 누락된 구간이 발견되었습니다.\n"
+                "누락된 세그먼트만 다시 받아 복구하시겠습니까?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+            )
+            if answer == QMessageBox.Yes:
+                self._start_verify(repairable, repair=True)
+                return
         
-        if success and current_format == "MP3" and self.mp4_checkbox.isChecked():
-            # MP4와 MP3 모두 선택되어 있고, MP3까지 완료된 경우
-            QMessageBox.information(self, "완료", "모든 다운로드가 완료되었습니다.")
-        elif success and ((current_format == "MP4" and not self.mp3_checkbox.isChecked()) or 
-                          (current_format == "MP3" and not self.mp4_checkbox.isChecked())):
-            # 하나의 형식만 선택되어 있고 완료된 경우
-            QMessageBox.information(self, "완료", f"{current_format} 다운로드가 완료되었습니다.")
+        self.log(f"검사 완료: 문제 {len(problems)}개", job="verify")
+        self.log_files.close("verify")
+    
+    def move_completed(self, success, file_path, message):
+        """백그라운드 작업(이동, 아카이브 인코딩) 결과 표시"""
+        self.log(f"{message}: {file_path}", logging.INFO if success else logging.ERROR)
+    
+    def toggle_profiling(self, checked):
+        """프로파일링 모드 켜기/끄기 (설정에 저장)"""
+        self.settings.setValue("profiling", checked)
+        if checked:
+            PROFILER.enable(os.path.join(get_app_data_dir(), "profiles"),
+                            cprofile=self.settings.value("profiling_cprofile", False, type=bool))
+            self.log(f"프로파일링을 시작합니다. 저장 위치: {PROFILER.output_dir}")
+        else:
+            path = PROFILER.disable()
+            if path:
+                self.log(f"프로파일링을 중지했습니다. 추적 파일: {path}")
+    
+    def toggle_cprofile(self, checked):
+        """cProfile 통계 저장 켜기/끄기 (설정에 저장, 프로파일링 중이면 다시 켤 때 적용)"""
+        self.settings.setValue("profiling_cprofile", checked)
+        if PROFILER.enabled and PROFILER.cprofile_enabled != checked:
+            self.log("cProfile 설정은 프로파일링 모드를 다시 켤 때 적용됩니다.")
+    
+    def export_trace(self):
+        """지금까지의 프로파일링 기록을 Chrome trace 파일로 저장"""
+        if not PROFILER.enabled:
+            QMessageBox.information(self, "프로파일링", "프로파일링 모드가 꺼져 있습니다. 도구 메뉴에서 먼저 켜주세요.")
+            return
+        path = PROFILER.export()
+        if path:
+            self.log(f"추적 파일을 저장했습니다 (chrome://tracing 또는 Perfetto에서 열기): {path}")
     
     def show_update_notification(self, new_version):
         """새 버전 알림 표시"""
-        self.status_text.append(f"새 버전({new_version})이 있습니다.")
+        self.log(f"새 버전({new_version})이 있습니다.")
     
+    @profiled("ui.show_update_progress", "ui")
     def show_update_progress(self, message, percent):
         """업데이트 진행 상황 표시"""
-        self.status_text.append(message)
+        self.log(message, job="update")
         self.progress_bar.setValue(percent)
     
     def load_settings(self):
@@ -996,8 +3782,847 @@ class CoursemosDownloader(QMainWindow):
         event.accept()
 
 
+JOB_STATES = ('queued', 'running', 'completed', 'failed', 'cancelled')
+
+# 작업 명세 필드별 허용 타입 (HTTP 요청 등 외부 입력 검증용)
+JOB_SPEC_TYPES = {
+    'html': str,
+    'html_content': str,
+    'url': str,
+    'candidates': list,
+    'title': str,
+    'recorded_at': str,
+    'formats': (list, str),
+    'start': (str, int, float),
+    'end': (str, int, float),
+    'source_policy': str,
+    'archive_profile': bool,
+    'har': str,
+}
+
+
+def validate_job_spec(spec):
+    """작업 명세의 필드 타입 확인 (잘못되면 ValueError)"""
+    if not isinstance(spec, dict):
+        raise ValueError("작업 명세는 JSON 객체여야 합니다.")
+    for name, expected in JOB_SPEC_TYPES.items():
+        value = spec.get(name)
+        if value is None:
+            continue
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            raise ValueError(f"{name} 필드의 타입이 올바르지 않습니다.")
+    for name in ('candidates', 'formats'):
+        if isinstance(spec.get(name), list) and not all(isinstance(item, str) for item in spec[name]):
+            raise ValueError(f"{name}는 문자열 목록이어야 합니다.")
+
+
+class DownloadJob:
+    """데몬이 관리하는 다운로드 작업 하나"""
+    
+    def __init__(self, spec, output_dir):
+        validate_job_spec(spec)
+        self.id = uuid.uuid4().hex[:12]
+        self.html = spec.get('html')  # 저장된 HTML 파일 경로
+        self.html_content = spec.get('html_content')  # 또는 HTML 본문 자체
+        self.url = spec.get('url')
+        self.candidates = spec.get('candidates') or []  # HAR 등에서 찾은 m3u8 후보 목록
+        self.title = spec.get('title')
+        self.recorded_at = spec.get('recorded_at')  # HAR에서 강의 재생 요청이 처음 기록된 시각
+        self.formats = spec.get('formats') or ['mp4']
+        if isinstance(self.formats, str):
+            self.formats = [self.formats]
+        self.output_dir = output_dir  # 저장 위치는 실행하는 쪽에서 정함 (요청으로 바꿀 수 없음)
+        self.start_time = self._parse_time(spec, 'start')
+        self.end_time = self._parse_time(spec, 'end')
+        self.source_policy = spec.get('source_policy') or 'balanced'
+        self.archive_profile = bool(spec.get('archive_profile'))
+        self.state = 'queued'
+        self.progress = 0
+        self.message = ""
+        self.outputs = []
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.thread = None  # 실행 중인 FFmpegThread
+        self.cancel_requested = False
+        
+        if not (self.html or self.html_content or self.url or self.candidates):
+            raise ValueError("html, html_content, url, candidates 중 하나는 지정해야 합니다.")
+        if any(format_type not in ('mp4', 'mp3') for format_type in self.formats):
+            raise ValueError("formats는 mp4, mp3만 지원합니다.")
+        if self.source_policy not in [policy for policy, _ in PROBE_POLICIES]:
+            raise ValueError(f"알 수 없는 선택 정책: {self.source_policy}")
+        if self.start_time is not None and self.end_time is not None and self.start_time >= self.end_time:
+            raise ValueError("끝 시간은 시작 시간보다 뒤여야 합니다.")
+    
+    @staticmethod
+    def _parse_time(spec, name):
+        """구간 시간 필드를 초로 변환 (형식이 잘못되면 필드 이름을 담은 ValueError)"""
+        if spec.get(name) is None:
+            return None
+        try:
+            return parse_time_value(str(spec[name]))
+        except ValueError as e:
+            raise ValueError(f"{name} 필드: {str(e)}") from None
+    
+    @property
+    def is_clip(self):
+        return self.start_time is not None or self.end_time is not None
+    
+    @property
+    def is_done(self):
+        return self.state in ('completed', 'failed', 'cancelled')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'state': self.state,
+            'progress': self.progress,
+            'message': self.message,
+            'title': self.title,
+            'recorded_at': self.recorded_at,
+            'url': self.url,
+            'candidates': self.candidates,
+            'html': self.html,
+            'formats': self.formats,
+            'start': self.start_time,
+            'end': self.end_time,
+            'archive_profile': self.archive_profile,
+            'outputs': self.outputs,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+
+class JobScheduler:
+    """데몬 작업 스케줄러 (모든 작업이 작업자 풀, HTTP 연결 풀, 키 캐시, ffmpeg를 공유)"""
+    
+    def __init__(self, output_dir, max_jobs=2, log_dir=None, retention=3600, max_finished=200):
+        self.output_dir = output_dir
+        self.max_jobs = max_jobs
+        self.ffmpeg_manager = FFmpegManager()
+        self.executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="job")
+        self.log_files = JobLogFiles(log_dir or os.path.join(get_app_data_dir(), "logs"))
+        self.jobs = {}  # 작업 ID -> DownloadJob (등록 순서 유지)
+        self.retention = retention  # 끝난 작업을 목록에 남겨두는 시간 (초)
+        self.max_finished = max_finished  # 목록에 남겨둘 끝난 작업의 최대 개수
+        self.lock = threading.Lock()
+        self.subscribers = []  # SSE 클라이언트별 이벤트 큐
+        
+        # 아카이브 인코딩/이동 결과는 해당 작업의 이벤트로 전달 (이벤트 루프가 없으므로 바로 호출)
+        get_background_mover().move_finished.connect(self.background_finished, Qt.DirectConnection)
+        get_archive_encoder(self.ffmpeg_manager).archive_finished.connect(self.background_finished,
+                                                                          Qt.DirectConnection)
+    
+    def subscribe(self):
+        """이벤트 구독 큐 생성"""
+        events = queue.Queue(maxsize=1000)
+        with self.lock:
+            self.subscribers.append(events)
+        return events
+    
+    def unsubscribe(self, events):
+        with self.lock:
+            if events in self.subscribers:
+                self.subscribers.remove(events)
+    
+    def publish(self, event_type, data):
+        """모든 구독자에게 이벤트 전달 (느린 클라이언트의 큐가 가득 차면 해당 이벤트는 버림)"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for events in subscribers:
+            try:
+                events.put_nowait((event_type, data))
+            except queue.Full:
+                pass
+    
+    def log(self, job, message, level=logging.INFO):
+        """작업 로그를 파일에 기록하고 이벤트로 전달"""
+        with self.lock:
+            self.log_files.write(LogEntry(time.time(), level, job.id, message))
+        self.publish('log', {'job': job.id, 'level': logging.getLevelName(level), 'message': message})
+    
+    def update(self, job, **changes):
+        """작업 상태 변경 후 이벤트 전달"""
+        for name, value in changes.items():
+            setattr(job, name, value)
+        self.publish('job', job.to_dict())
+    
+    def submit(self, spec):
+        """작업 등록 (잘못된 요청이면 ValueError)"""
+        job = DownloadJob(spec, self.output_dir)
+        with self.lock:
+            self._prune()
+            self.jobs[job.id] = job
+        self.publish('job', job.to_dict())
+        self.executor.submit(self.run_job, job)
+        return job
+    
+    def _prune(self):
+        """오래되었거나 너무 많은 끝난 작업을 목록에서 제거 (lock을 잡은 상태에서 호출)"""
+        expire_before = time.time() - self.retention
+        finished = [job for job in self.jobs.values() if job.is_done and job.finished is not None]
+        finished.sort(key=lambda job: job.finished)
+        excess = len(finished) - self.max_finished
+        for index, job in enumerate(finished):
+            if index < excess or job.finished < expire_before:
+                del self.jobs[job.id]
+    
+    def get(self, job_id):
+        with self.lock:
+            self._prune()
+            return self.jobs.get(job_id)
+    
+    def list(self):
+        with self.lock:
+            self._prune()
+            return list(self.jobs.values())
+    
+    def cancel(self, job_id):
+        """작업 취소 (대기 중이면 실행하지 않고, 실행 중이면 ffmpeg까지 중단)"""
+        job = self.get(job_id)
+        if job is None or job.is_done:
+            return job
+        job.cancel_requested = True
+        thread = job.thread
+        if thread is not None:
+            thread.cancel()
+        elif job.state == 'queued':
+            self.update(job, state='cancelled', message="작업이 취소되었습니다.", finished=time.time())
+        return job
+    
+    @profiled("job.run", "job")
+    def run_job(self, job):
+        """작업자 스레드에서 작업 하나 실행"""
+        if job.cancel_requested:
+            return
+        self.update(job, state='running', started=time.time())
+        html_path = job.html
+        temp_html = None
+        try:
+            if job.html_content:
+                # 본문으로 받은 HTML은 임시 파일로 저장해 같은 추출 경로를 사용
+                fd, temp_html = tempfile.mkstemp(prefix="coursemos_", suffix=".html")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(job.html_content)
+                html_path = temp_html
+            
+            # 제목이 없는 URL 작업끼리 같은 파일에 쓰지 않도록 기본 제목에 작업 ID를 붙임
+            page_title, m3u8_url, mirror_urls = resolve_source(
+                html_path, job.url, job.source_policy, report=lambda message: self.log(job, message),
+                candidates=job.candidates, default_title=f"lecture_{time.strftime('%Y%m%d_%H%M%S')}_{job.id}")
+            if job.title:
+                page_title = sanitize_filename(job.title)
+            job.title = page_title
+            file_title = page_title + (clip_file_suffix(job.start_time, job.end_time) if job.is_clip else "")
+            os.makedirs(job.output_dir, exist_ok=True)
+            
+            results = []
+            for index, format_type in enumerate(job.formats):
+                if job.cancel_requested:
+                    break
+                output_path = os.path.join(job.output_dir, f"{file_title}.{format_type}")
+                self.log(job, f"{format_type.upper()} 변환 시작: {m3u8_url}")
+                
+                thread = FFmpegThread(m3u8_url, output_path, format_type, self.ffmpeg_manager,
+                                      job.start_time, job.end_time, mirror_urls, job.archive_profile, job.id)
+                base, span = index * 100 // len(job.formats), 100 // len(job.formats)
+                thread.progress_update.connect(lambda message: self.log(job, message), Qt.DirectConnection)
+                thread.progress_percent.connect(
+                    lambda percent, base=base, span=span: self.set_progress(job, base + percent * span // 100),
+                    Qt.DirectConnection)
+                
+                def on_finished(success, message, path, job=job):
+                    results.append(success)
+                    self.log(job, message, logging.INFO if success else logging.ERROR)
+                    if success:
+                        job.outputs.append(path)
+                
+                thread.conversion_finished.connect(on_finished, Qt.DirectConnection)
+                job.thread = thread
+                done = threading.Event()
+                get_stage_pipeline().submit(thread, lambda thread: done.set())
+                done.wait()  # 그동안 다른 작업은 앞뒤 단계에서 함께 진행
+                job.thread = None
+            
+            if job.cancel_requested:
+                self.update(job, state='cancelled', message="작업이 취소되었습니다.")
+            elif results and all(results):
+                self.update(job, state='completed', progress=100, message="완료")
+            else:
+                self.update(job, state='failed', message="일부 변환에 실패했습니다.")
+        except Exception as e:
+            self.log(job, f"오류 발생: {str(e)}", logging.ERROR)
+            self.update(job, state='failed', message=str(e))
+        finally:
+            job.thread = None
+            job.finished = time.time()
+            self.publish('job', job.to_dict())
+            if temp_html:
+                os.remove(temp_html)
+            with self.lock:
+                self.log_files.close(job.id)
+    
+    def set_progress(self, job, percent):
+        """진행률이 바뀐 경우에만 이벤트 전달"""
+        if percent != job.progress:
+            job.progress = percent
+            self.publish('progress', {'job': job.id, 'progress': percent})
+    
+    def background_finished(self, success, path, message):
+        """아카이브 인코딩/이동 완료를 해당 작업에 알림"""
+        for job in self.list():
+            if path in job.outputs:
+                self.log(job, f"{message}: {path}", logging.INFO if success else logging.ERROR)
+                return
+    
+    def shutdown(self):
+        """대기 중 작업을 취소하고 실행 중인 작업이 끝날 때까지 대기"""
+        for job in self.list():
+            if job.state == 'queued':
+                self.cancel(job.id)
+        self.executor.shutdown(wait=True)
+        get_archive_encoder(self.ffmpeg_manager).wait()
+        get_background_mover().wait()
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """로컬 HTTP/JSON API 요청 처리 (server.scheduler, server.api_token, server.input_dir 사용)"""
+    protocol_version = "HTTP/1.1"
+    
+    def log_message(self, format, *args):
+        pass  # 요청마다 stderr에 찍지 않음
+    
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_error_json(self, status, message):
+        self.send_json(status, {'error': message})
+    
+    def check_auth(self):
+        """Host/Origin이 로컬 주소인지(웹 페이지, DNS 리바인딩 차단), 토큰이 있으면 Bearer 헤더 확인"""
+        port = self.server.server_address[1]
+        local_hosts = {f"127.0.0.1:{port}", f"localhost:{port}"}
+        origin = self.headers.get('Origin')
+        if self.headers.get('Host') not in local_hosts or (
+                origin is not None and origin not in {f"http://{host}" for host in local_hosts}):
+            self.send_error_json(403, "로컬 클라이언트만 사용할 수 있습니다.")
+            return False
+        token = self.server.api_token
+        if token and self.headers.get('Authorization') != f"Bearer {token}":
+            self.send_error_json(401, "인증이 필요합니다.")
+            return False
+        return True
+    
+    def input_path(self, path):
+        """요청이 지정한 로컬 파일은 --input-dir 안에 있을 때만 허용"""
+        input_dir = self.server.input_dir
+        if not input_dir:
+            raise ValueError("파일 경로 입력이 허용되지 않습니다. (--input-dir 지정 필요, HTML은 html_content 사용)")
+        real_path = os.path.realpath(os.path.join(input_dir, path))
+        if os.path.commonpath([real_path, os.path.realpath(input_dir)]) != os.path.realpath(input_dir):
+            raise ValueError("--input-dir 밖의 파일은 읽을 수 없습니다.")
+        return real_path
+    
+    def route(self):
+        """경로를 (리소스, 작업 ID)로 분리"""
+        parts = [part for part in urlparse(self.path).path.split('/') if part]
+        if not parts:
+            return None, None
+        return parts[0], parts[1] if len(parts) > 1 else None
+    
+    def do_GET(self):
+        if not self.check_auth():
+            return
+        resource, job_id = self.route()
+        scheduler = self.server.scheduler
+        if resource == 'jobs' and job_id is None:
+            stages = {stage: {'active': active, 'queued': waiting}
+                      for stage, (active, waiting) in get_stage_pipeline().depths().items()}
+            self.send_json(200, {'jobs': [job.to_dict() for job in scheduler.list()], 'stages': stages})
+        elif resource == 'jobs':
+            job = scheduler.get(job_id)
+            if job is None:
+                self.send_error_json(404, "작업을 찾을 수 없습니다.")
+            else:
+                self.send_json(200, job.to_dict())
+        elif resource == 'events':
+            self.stream_events()
+        else:
+            self.send_error_json(404, "알 수 없는 경로입니다.")
+    
+    def do_POST(self):
+        if not self.check_auth():
+            return
+        resource, job_id = self.route()
+        if resource != 'jobs' or job_id is not None:
+            self.send_error_json(404, "알 수 없는 경로입니다.")
+            return
+        # 단순 요청(text/plain 등)은 브라우저가 사전 확인 없이 보내므로 JSON만 받음
+        content_type = (self.headers.get('Content-Type') or "").split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_error_json(415, "Content-Type은 application/json이어야 합니다.")
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            spec = json.loads(self.rfile.read(length).decode('utf-8') or "{}")
+            validate_job_spec(spec)
+            if spec.get('html'):
+                spec['html'] = self.input_path(spec['html'])
+            if spec.get('har'):
+                # HAR 파일 하나에서 찾은 강의마다 작업 등록
+                specs = har_job_specs(self.input_path(spec['har']), spec)
+                if not specs:
+                    raise ValueError("HAR 파일에서 m3u8 요청을 찾을 수 없습니다.")
+                jobs = [self.server.scheduler.submit(har_spec) for har_spec in specs]
+                self.send_json(201, {'jobs': [job.to_dict() for job in jobs]})
+                return
+            job = self.server.scheduler.submit(spec)
+        except (ValueError, OSError) as e:
+            self.send_error_json(400, str(e))
+            return
+        self.send_json(201, job.to_dict())
+    
+    def do_DELETE(self):
+        if not self.check_auth():
+            return
+        resource, job_id = self.route()
+        if resource != 'jobs' or job_id is None:
+            self.send_error_json(404, "알 수 없는 경로입니다.")
+            return
+        job = self.server.scheduler.cancel(job_id)
+        if job is None:
+            self.send_error_json(404, "작업을 찾을 수 없습니다.")
+        else:
+            self.send_json(200, job.to_dict())
+    
+    def stream_events(self):
+        """Server-Sent Events로 작업 상태/진행률/로그 전달 (연결이 끊길 때까지)"""
+        scheduler = self.server.scheduler
+        events = scheduler.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            
+            # 접속 시점의 작업 목록을 먼저 보냄
+            for job in scheduler.list():
+                self.write_event('job', job.to_dict())
+            while not self.server.stopping.is_set():
+                try:
+                    event_type, data = events.get(timeout=15)
+                except queue.Empty:
+                    self.wfile.write(b": keep-alive\n\n")  # 프록시/클라이언트 연결 유지
+                    self.wfile.flush()
+                    continue
+                self.write_event(event_type, data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            scheduler.unsubscribe(events)
+    
+    def write_event(self, event_type, data):
+        payload = json.dumps(data, ensure_ascii=False)
+        self.wfile.write(f"event: {event_type}\ndata: {payload}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+
+def run_daemon(args):
+    """로컬 HTTP/JSON API 데몬 실행 (Ctrl+C로 종료)"""
+    scheduler = JobScheduler(args.output_dir, max_jobs=args.max_jobs)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), DaemonRequestHandler)
+    server.daemon_threads = True
+    server.scheduler = scheduler
+    server.api_token = args.api_token
+    server.input_dir = args.input_dir
+    server.stopping = threading.Event()
+    print(f"데몬 시작: http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("데몬 종료 중...")
+    finally:
+        server.stopping.set()
+        server.server_close()
+        scheduler.shutdown()
+    return 0
+
+
+class SharedJobQueue:
+    """공유 폴더의 SQLite 파일로 여러 노드가 작업을 나눠 가지는 큐
+    
+    작업은 임대(lease) 방식으로 가져가고, 노드가 주기적으로 임대를 갱신하지 않으면
+    (노드 종료 등) 다른 노드가 다시 가져감. 임대 시각은 각 노드의 시계를 쓰므로
+    노드 간 시계는 NTP 등으로 맞춰져 있어야 함.
+    """
+    
+    def __init__(self, db_path, max_attempts=3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts  # 임대 만료로 다시 시도할 최대 횟수
+        with self.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    spec TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    message TEXT NOT NULL DEFAULT '',
+                    outputs TEXT NOT NULL DEFAULT '[]',
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )""")
+    
+    @contextmanager
+    def transaction(self):
+        """쓰기 잠금을 잡은 트랜잭션 (네트워크 파일시스템에서는 WAL을 쓸 수 없어 기본 저널 사용)"""
+        conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    
+    def add(self, spec):
+        """작업 추가 후 ID 반환"""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO jobs (id, spec, created, updated) VALUES (?, ?, ?, ?)",
+                         (job_id, json.dumps(spec, ensure_ascii=False), now, now))
+        return job_id
+    
+    def claim(self, worker_id, lease_seconds):
+        """대기 중이거나 임대가 만료된 작업 하나를 가져옴 ((ID, 작업 명세) 또는 None)"""
+        now = time.time()
+        with self.transaction() as conn:
+            # 재시도 횟수를 다 쓴 채 임대가 만료된 작업은 실패 처리
+            conn.execute("UPDATE jobs SET state = 'failed', message = ?, updated = ? "
+                         "WHERE state = 'running' AND lease_until < ? AND attempts >= ?",
+                         ("작업 노드 응답 없음 (재시도 횟수 초과)", now, now, self.max_attempts))
+            row = conn.execute("SELECT id, spec FROM jobs "
+                               "WHERE state = 'queued' OR (state = 'running' AND lease_until < ?) "
+                               "ORDER BY created LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET state = 'running', worker = ?, lease_until = ?, "
+                         "attempts = attempts + 1, updated = ? WHERE id = ?",
+                         (worker_id, now + lease_seconds, now, row[0]))
+        return row[0], json.loads(row[1])
+    
+    def heartbeat(self, job_id, worker_id, lease_seconds):
+        """임대 갱신 (다른 노드가 이미 가져갔으면 False)"""
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute("UPDATE jobs SET lease_until = ?, updated = ? "
+                                  "WHERE id = ? AND worker = ? AND state = 'running'",
+                                  (now + lease_seconds, now, job_id, worker_id))
+        return cursor.rowcount == 1
+    
+    def finish(self, job_id, worker_id, state, message, outputs):
+        """작업 결과 기록 (임대를 가진 노드만)"""
+        with self.transaction() as conn:
+            conn.execute("UPDATE jobs SET state = ?, message = ?, outputs = ?, lease_until = NULL, updated = ? "
+                         "WHERE id = ? AND worker = ? AND state = 'running'",
+                         (state, message, json.dumps(outputs, ensure_ascii=False), time.time(), job_id, worker_id))
+    
+    def release(self, job_id, worker_id):
+        """종료하는 노드가 끝내지 못한 작업을 바로 대기 상태로 돌려놓음"""
+        with self.transaction() as conn:
+            conn.execute("UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL, "
+                         "attempts = MAX(attempts - 1, 0), updated = ? "
+                         "WHERE id = ? AND worker = ? AND state = 'running'",
+                         (time.time(), job_id, worker_id))
+    
+    def counts(self):
+        """상태별 작업 수"""
+        with self.transaction() as conn:
+            return dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+
+class ClusterWorker:
+    """공유 큐에서 작업을 가져와 로컬 스케줄러로 실행하는 작업 노드"""
+    
+    def __init__(self, shared_queue, scheduler, lease_seconds=60):
+        self.queue = shared_queue
+        self.scheduler = scheduler
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = min(5.0, lease_seconds / 4)  # 임대가 끝나기 전에 여러 번 갱신
+        self.active = {}  # 공유 큐 작업 ID -> 로컬 DownloadJob
+        self.stopping = threading.Event()
+    
+    def run(self):
+        """중지될 때까지 임대 갱신, 완료 보고, 새 작업 가져오기를 반복"""
+        print(f"작업 노드 시작: {self.worker_id} (큐: {self.queue.db_path})")
+        while not self.stopping.is_set():
+            try:
+                self.step()
+            except sqlite3.Error as e:
+                print(f"공유 큐 접근 오류: {str(e)}")
+            self.stopping.wait(self.poll_interval)
+    
+    def step(self):
+        for shared_id, job in list(self.active.items()):
+            if job.is_done:
+                self.queue.finish(shared_id, self.worker_id, job.state, job.message, job.outputs)
+                print(f"[{shared_id}] {job.state}: {job.message}")
+                del self.active[shared_id]
+            elif not self.queue.heartbeat(shared_id, self.worker_id, self.lease_seconds):
+                # 임대가 만료되어 다른 노드가 가져갔으면 같은 파일을 동시에 쓰지 않도록 중단
+                print(f"[{shared_id}] 임대를 잃어 작업을 중단합니다.")
+                self.scheduler.cancel(job.id)
+                del self.active[shared_id]
+        
+        while len(self.active) < self.scheduler.max_jobs:
+            claimed = self.queue.claim(self.worker_id, self.lease_seconds)
+            if claimed is None:
+                break
+            shared_id, spec = claimed
+            try:
+                self.active[shared_id] = self.scheduler.submit(spec)
+                print(f"[{shared_id}] 작업 시작")
+            except ValueError as e:
+                self.queue.finish(shared_id, self.worker_id, 'failed', str(e), [])
+    
+    def stop(self):
+        """진행 중인 작업을 취소하고 다른 노드가 바로 가져가도록 반환"""
+        self.stopping.set()
+        for shared_id, job in self.active.items():
+            self.scheduler.cancel(job.id)
+            try:
+                self.queue.release(shared_id, self.worker_id)
+            except sqlite3.Error as e:
+                print(f"작업 반환 실패 ({shared_id}): {str(e)}")
+        self.active.clear()
+
+
+def run_worker(args):
+    """공유 큐 작업 노드 실행 (Ctrl+C로 종료)"""
+    shared_queue = SharedJobQueue(args.queue_db)
+    scheduler = JobScheduler(args.output_dir, max_jobs=args.max_jobs)
+    worker = ClusterWorker(shared_queue, scheduler, lease_seconds=args.lease)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        print("작업 노드 종료 중...")
+    finally:
+        worker.stop()
+        scheduler.shutdown()
+    return 0
+
+
+def cli_job_spec(args):
+    """명령줄 인자의 공통 옵션으로 작업 명세 생성"""
+    return {
+        'url': args.url,
+        'title': args.title,
+        'formats': args.format or ['mp4'],
+        'start': args.start,
+        'end': args.end,
+        'source_policy': args.source_policy,
+        'archive_profile': args.archive_profile,
+    }
+
+
+def enqueue_job(args):
+    """명령줄 인자로 공유 큐에 작업 추가 (HTML은 다른 노드도 읽을 수 있도록 내용을 저장)"""
+    if not (args.html or args.url or args.har):
+        print("--enqueue에는 --html, --url 또는 --har가 필요합니다.")
+        return 2
+    shared_queue = SharedJobQueue(args.queue_db)
+    if args.har:
+        specs = har_job_specs(args.har, cli_job_spec(args))
+        for spec in specs:
+            print(f"작업 추가: {shared_queue.add(spec)} ({spec['title']}, 후보 {len(spec['candidates'])}개)")
+        return 0 if specs else 1
+    
+    spec = cli_job_spec(args)
+    if args.html:
+        with open(args.html, 'r', encoding='utf-8', errors='replace') as f:
+            spec['html_content'] = f.read()
+    job_id = shared_queue.add(spec)
+    print(f"작업 추가: {job_id}")
+    return 0
+
+
+def run_har(args):
+    """HAR 파일에서 찾은 강의들을 로컬 작업 스케줄러로 한꺼번에 받음"""
+    specs = har_job_specs(args.har, cli_job_spec(args))
+    if not specs:
+        print("HAR 파일에서 m3u8 요청을 찾을 수 없습니다.")
+        return 1
+    print(f"HAR에서 강의 {len(specs)}개를 찾았습니다.")
+    
+    scheduler = JobScheduler(args.output_dir, max_jobs=args.max_jobs)
+    events = scheduler.subscribe()
+    jobs = [scheduler.submit(spec) for spec in specs]
+    states = {}
+    while not all(job.is_done for job in jobs):
+        try:
+            event_type, data = events.get(timeout=1)
+        except queue.Empty:
+            continue
+        # 작업 상태가 바뀔 때만 출력
+        if event_type == 'job' and states.get(data['id']) != data['state']:
+            states[data['id']] = data['state']
+            print(f"[{data['title']}] {data['state']} {data['message']}".rstrip())
+    scheduler.shutdown()
+    return 0 if all(job.state == 'completed' for job in jobs) else 1
+
+
+def parse_args(argv):
+    """명령줄 인자 파싱 (Qt 옵션 등 알 수 없는 인자는 그대로 남김)"""
+    parser = argparse.ArgumentParser(description="Coursemos Downloader")
+    parser.add_argument('--html', help="m3u8 URL을 추출할 저장된 HTML 파일 (지정하면 GUI 없이 실행)")
+    parser.add_argument('--url', help="m3u8 URL 직접 지정 (지정하면 GUI 없이 실행)")
+    parser.add_argument('--har', help="브라우저 HAR 내보내기 파일에서 찾은 강의를 모두 받음 (지정하면 GUI 없이 실행)")
+    parser.add_argument('--title', help="출력 파일 이름 (기본값: 페이지 제목)")
+    parser.add_argument('--format', choices=['mp4', 'mp3'], action='append',
+                        help="출력 형식, 여러 번 지정 가능 (기본값: mp4)")
+    parser.add_argument('--output-dir', default=os.path.expanduser("~/Downloads"), help="저장 폴더")
+    parser.add_argument('--start', type=parse_time_value, help="구간 시작 (HH:MM:SS)")
+    parser.add_argument('--end', type=parse_time_value, help="구간 끝 (HH:MM:SS)")
+    parser.add_argument('--source-policy', choices=[policy for policy, _ in PROBE_POLICIES], default='balanced',
+                        help="여러 m3u8 후보 중 선택 정책 (기본값: balanced)")
+    parser.add_argument('--archive-profile', action='store_true',
+                        help="MP4를 슬라이드 강의용 아카이브 프로필로 다시 인코딩해 용량 절감")
+    parser.add_argument('--profile', action='store_true',
+                        help="프로파일링 모드 (종료 시 Chrome trace 파일 저장)")
+    parser.add_argument('--profile-dir', help="추적 파일 저장 폴더 (기본값: 앱 데이터 폴더의 profiles)")
+    parser.add_argument('--profile-cprofile', action='store_true', help="스레드별 cProfile 통계도 저장")
+    parser.add_argument('--daemon', action='store_true', help="GUI 없이 로컬 HTTP/JSON API 데몬으로 실행")
+    parser.add_argument('--port', type=int, default=8750, help="데몬 포트 (127.0.0.1에만 바인딩, 기본값: 8750)")
+    parser.add_argument('--max-jobs', type=int, default=2, help="데몬에서 동시에 실행할 작업 수 (기본값: 2)")
+    parser.add_argument('--api-token', help="지정하면 Authorization: Bearer 토큰이 일치하는 요청만 허용")
+    parser.add_argument('--input-dir', help="데몬 요청이 html/har 파일 경로로 읽을 수 있는 폴더 (기본값: 허용 안 함)")
+    parser.add_argument('--queue-db', help="여러 노드가 공유하는 작업 큐 SQLite 파일 (공유 폴더)")
+    parser.add_argument('--worker', action='store_true', help="공유 큐에서 작업을 가져와 실행하는 작업 노드로 실행")
+    parser.add_argument('--enqueue', action='store_true', help="--html/--url 작업을 바로 실행하지 않고 공유 큐에 추가")
+    parser.add_argument('--lease', type=float, default=60, help="작업 임대 시간 (초, 기본값: 60)")
+    parser.add_argument('--fetch-workers', type=int, help="데몬/작업 노드의 받기 단계 작업자 수 (기본값: 2)")
+    parser.add_argument('--reserve-cores', type=int, default=1,
+                        help="ffmpeg에 배분하지 않고 UI/네트워크용으로 남길 코어 수 (기본값: 1)")
+    parser.add_argument('--cpu-affinity', action='store_true',
+                        help="인코딩 프로세스마다 겹치지 않는 코어를 배정하고 작업이 시작/종료될 때 다시 나눔 (Linux, "
+                             "끄면 -threads는 시작할 때 정해지고 이후에는 우선순위만 조정)")
+    parser.add_argument('--transcode-workers', type=int,
+                        help="데몬/작업 노드의 변환 단계 작업자 수 (기본값: CPU 코어 수의 절반)")
+    return parser.parse_known_args(argv)
+
+
+def resolve_source(html_path=None, m3u8_url=None, policy='balanced', report=print, candidates=None,
+                   default_title=None):
+    """HTML 파일, m3u8 후보 목록 또는 m3u8 URL에서 (제목, 선택된 m3u8 URL, 미러 URL 목록) 결정
+    default_title은 HTML이 없어 제목을 알 수 없을 때 사용 (기본값: lecture_날짜_시각)"""
+    default_title = default_title or f"lecture_{time.strftime('%Y%m%d_%H%M%S')}"
+    if html_path or candidates:
+        if html_path:
+            page_title, m3u8_urls = extract_m3u8_from_html(html_path)
+        else:
+            page_title, m3u8_urls = default_title, candidates
+        if not m3u8_urls:
+            raise ValueError("m3u8 URL을 찾을 수 없습니다. HTML 파일을 확인해주세요.")
+        
+        # 모든 후보를 병렬로 검사해 정책에 따라 선택
+        results = CandidateProber(policy).rank(m3u8_urls)
+        for rank, result in enumerate(results, 1):
+            report(format_probe_result(rank, result))
+        selected_url = results[0].url if results[0].ok else m3u8_urls[0]
+        return page_title, selected_url, find_mirror_urls(results)
+    
+    return default_title, m3u8_url, []
+
+
+def run_cli(args):
+    """GUI 없이 명령줄에서 다운로드 실행"""
+    if args.start is not None and args.end is not None and args.start >= args.end:
+        print("끝 시간은 시작 시간보다 뒤여야 합니다.")
+        return 2
+    
+    ffmpeg_manager = FFmpegManager()
+    
+    try:
+        page_title, m3u8_url, mirror_urls = resolve_source(args.html, args.url, args.source_policy)
+    except ValueError as e:
+        print(str(e))
+        return 1
+    
+    if args.title:
+        page_title = sanitize_filename(args.title)
+    
+    is_clip = args.start is not None or args.end is not None
+    file_title = page_title + (clip_file_suffix(args.start, args.end) if is_clip else "")
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    results = []
+    
+    # 아카이브 인코딩/이동 결과 (이벤트 루프가 없으므로 작업 스레드에서 바로 호출)
+    def on_background_finished(success, path, message):
+        results.append(success)
+        print(f"{message}: {path}")
+    
+    mover = get_background_mover()
+    mover.move_finished.connect(on_background_finished, Qt.DirectConnection)
+    archive_encoder = get_archive_encoder(ffmpeg_manager)
+    archive_encoder.archive_finished.connect(on_background_finished, Qt.DirectConnection)
+    
+    for format_type in args.format or ['mp4']:
+        output_path = os.path.join(args.output_dir, f"{file_title}.{format_type}")
+        print(f"{format_type.upper()} 변환 시작: {m3u8_url}")
+        
+        thread = FFmpegThread(m3u8_url, output_path, format_type, ffmpeg_manager, args.start, args.end, mirror_urls,
+                              args.archive_profile)
+        thread.progress_update.connect(print)
+        thread.conversion_finished.connect(lambda success, message, path: results.append(success) or print(message))
+        thread.run()  # 현재 스레드에서 바로 실행
+    
+    # 아카이브 인코딩과 그 뒤의 이동이 끝날 때까지 대기
+    archive_encoder.wait()
+    mover.wait()
+    
+    return 0 if results and all(results) else 1
+
+
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    cli_args, qt_args = parse_args(sys.argv[1:])
+    if cli_args.profile or cli_args.profile_cprofile:
+        PROFILER.enable(cli_args.profile_dir or os.path.join(get_app_data_dir(), "profiles"),
+                        cprofile=cli_args.profile_cprofile)
+    
+    if (cli_args.worker or cli_args.enqueue) and not cli_args.queue_db:
+        sys.exit("--worker/--enqueue에는 --queue-db가 필요합니다.")
+    get_cpu_governor(cli_args.reserve_cores, cli_args.cpu_affinity)
+    if cli_args.worker or cli_args.daemon or cli_args.har:
+        get_stage_pipeline({'fetch': cli_args.fetch_workers, 'transcode': cli_args.transcode_workers})
+    if cli_args.worker:
+        sys.exit(run_worker(cli_args))
+    if cli_args.enqueue:
+        sys.exit(enqueue_job(cli_args))
+    if cli_args.daemon:
+        sys.exit(run_daemon(cli_args))
+    if cli_args.har:
+        sys.exit(run_har(cli_args))
+    if cli_args.html or cli_args.url:
+        sys.exit(run_cli(cli_args))
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyle('Fusion')  # 모던한 스타일 적용
     downloader = CoursemosDownloader()
     downloader.show()
@@ -0,0 +1,104 @@
+"""아카이브 인코딩 결과 처리 테스트 (검증 후 교체, 실패 시 원본 유지와 임시 파일 정리)"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+from PyQt5.QtCore import Qt
+
+# ARCHIVE_MODE에 따라 작은 결과 / 결과 일부만 쓰고 실패
+FAKE_FFMPEG = r'''#!{python}
+import os, sys
+with open(sys.argv[-1], 'wb') as f:
+    f.write(b'a' * 100)
+if os.environ.get('ARCHIVE_MODE') == 'fail':
+    sys.stderr.write("encoder crashed\n")
+    sys.exit(1)
+'''
+
+# 인코딩 결과의 길이는 ARCHIVE_DURATION, 원본은 60초
+FAKE_FFPROBE = r'''#!{python}
+import os, sys
+if 'format=duration' in sys.argv:
+    print(os.environ.get('ARCHIVE_DURATION', '60.0') if 'archive' in sys.argv[-1] else "60.0")
+'''
+
+
+class FakeManager:
+    def __init__(self, bin_dir):
+        self.bin_dir = bin_dir
+
+    def get_ffmpeg_command(self):
+        return os.path.join(self.bin_dir, "ffmpeg")
+
+    def get_ffprobe_command(self):
+        return os.path.join(self.bin_dir, "ffprobe")
+
+
+class ArchiveEncoderTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        for name, template in (("ffmpeg", FAKE_FFMPEG), ("ffprobe", FAKE_FFPROBE)):
+            path = os.path.join(self.work_dir, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(template.format(python=sys.executable))
+            os.chmod(path, 0o755)
+
+        self.source = os.path.join(self.work_dir, "lecture.mp4")
+        self.original = os.urandom(5000)
+        with open(self.source, 'wb') as f:
+            f.write(self.original)
+
+        self.encoder = cd.ArchiveEncoder(FakeManager(self.work_dir), max_workers=1)
+        self.results = []
+        self.encoder.archive_finished.connect(lambda *result: self.results.append(result), Qt.DirectConnection)
+
+    def encode(self, **env):
+        with mock.patch.dict(os.environ, env):
+            self.encoder._encode(self.source, None)
+        return self.results[-1]
+
+    def assert_original_kept(self):
+        with open(self.source, 'rb') as f:
+            self.assertEqual(f.read(), self.original)
+        self.assertEqual(sorted(name for name in os.listdir(self.work_dir) if 'archive' in name), [])
+
+    def test_smaller_valid_result_replaces_original(self):
+        success, _, message = self.encode(ARCHIVE_DURATION="60.5")
+        self.assertTrue(success, message)
+        self.assertEqual(os.path.getsize(self.source), 100)
+
+    def test_duration_mismatch_keeps_original(self):
+        success, _, message = self.encode(ARCHIVE_DURATION="30.0")
+        self.assertFalse(success)
+        self.assertIn("원본 유지", message)
+        self.assert_original_kept()
+
+    def test_encoder_failure_removes_partial_output(self):
+        success, _, message = self.encode(ARCHIVE_MODE="fail")
+        self.assertFalse(success)
+        self.assertIn("encoder crashed", message)
+        self.assert_original_kept()
+
+    def test_exception_removes_partial_output(self):
+        def crash_after_writing(command, *args, **kwargs):
+            with open(command[-1], 'wb') as f:
+                f.write(b'partial')
+            raise OSError("disk error")
+
+        with mock.patch.object(cd.CpuGovernor, 'run', side_effect=crash_after_writing):
+            success, _, message = self.encode()
+        self.assertFalse(success)
+        self.assertIn("disk error", message)
+        self.assert_original_kept()
+
+
+if __name__ == '__main__':
+    unittest.main()
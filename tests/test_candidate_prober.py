@@ -0,0 +1,74 @@
+"""m3u8 후보 순위 테스트 (구간화된 측정값, 실패한 후보, 구간 안의 동점 처리)"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+KB = 1024
+
+
+def result(url, throughput_kb=1000, latency=0.1, bandwidth=2000000, ok=True):
+    if not ok:
+        return cd.ProbeResult(url, False, None, 0, "", None, 0, 0, 0, "timeout")
+    return cd.ProbeResult(url, True, 0.05, bandwidth, "1280x720", latency, throughput_kb * KB, 10, 600.0, None)
+
+
+def ranked(policy, results):
+    prober = cd.CandidateProber(policy)
+    return [item.url for item in sorted(results, key=prober.sort_key)]
+
+
+class SortKeyTest(unittest.TestCase):
+    def test_failed_probe_is_always_last(self):
+        results = [result("https://a/failed.m3u8", ok=False), result("https://z/slow.m3u8", throughput_kb=10)]
+        for policy, _ in cd.PROBE_POLICIES:
+            with self.subTest(policy=policy):
+                self.assertEqual(ranked(policy, results), ["https://z/slow.m3u8", "https://a/failed.m3u8"])
+
+    def test_noise_within_a_bin_is_a_tie_broken_by_url(self):
+        # 처리량 1000/1020KB/s(같은 100KB/s 구간), 지연 101/104ms(같은 10ms 구간)
+        results = [result("https://b/index.m3u8", throughput_kb=1020, latency=0.101),
+                   result("https://a/index.m3u8", throughput_kb=1000, latency=0.104)]
+        for policy, _ in cd.PROBE_POLICIES:
+            with self.subTest(policy=policy):
+                self.assertEqual(ranked(policy, results), ["https://a/index.m3u8", "https://b/index.m3u8"])
+                self.assertEqual(ranked(policy, list(reversed(results))),
+                                 ["https://a/index.m3u8", "https://b/index.m3u8"])
+
+    def test_fastest_prefers_throughput_then_latency(self):
+        results = [result("https://a/slow.m3u8", throughput_kb=500),
+                   result("https://b/fast-far.m3u8", throughput_kb=2000, latency=0.3),
+                   result("https://c/fast-near.m3u8", throughput_kb=2000, latency=0.05)]
+        self.assertEqual(ranked("fastest", results),
+                         ["https://c/fast-near.m3u8", "https://b/fast-far.m3u8", "https://a/slow.m3u8"])
+
+    def test_quality_prefers_bandwidth(self):
+        results = [result("https://a/low.m3u8", throughput_kb=5000, bandwidth=1000000),
+                   result("https://b/high.m3u8", throughput_kb=100, bandwidth=4000000)]
+        self.assertEqual(ranked("quality", results), ["https://b/high.m3u8", "https://a/low.m3u8"])
+
+    def test_balanced_prefers_best_quality_that_plays_in_real_time(self):
+        # 4Mbps 화질은 200KB/s(1.6Mbps)로 실시간 재생 불가, 1Mbps 화질은 가능
+        results = [result("https://a/high.m3u8", throughput_kb=200, bandwidth=4000000),
+                   result("https://b/low.m3u8", throughput_kb=200, bandwidth=1000000),
+                   result("https://c/mid-slow.m3u8", throughput_kb=100, bandwidth=2000000)]
+        self.assertEqual(ranked("balanced", results),
+                         ["https://b/low.m3u8", "https://a/high.m3u8", "https://c/mid-slow.m3u8"])
+
+    def test_rank_sorts_probe_results(self):
+        prober = cd.CandidateProber("fastest")
+        probes = {"https://a/1.m3u8": result("https://a/1.m3u8", ok=False),
+                  "https://b/2.m3u8": result("https://b/2.m3u8", throughput_kb=3000)}
+        with mock.patch.object(prober, 'probe', side_effect=probes.get):
+            ranking = prober.rank(list(probes))
+        self.assertEqual([item.url for item in ranking], ["https://b/2.m3u8", "https://a/1.m3u8"])
+        self.assertEqual(prober.rank([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""구간 다운로드 시간 처리 테스트 (시간 파싱, 파일명 접미사, 세그먼트 선택, 구간 끝 제한)"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+
+def make_segments(durations):
+    segments = []
+    start = 0.0
+    for index, duration in enumerate(durations):
+        segments.append(cd.HlsSegment(index, f"seg{index}.ts", duration, start, index, None))
+        start += duration
+    return segments
+
+
+def make_thread(start_time=None, end_time=None):
+    return cd.FFmpegThread("http://example.com/index.m3u8", "/tmp/out.mp4", 'mp4', None,
+                           start_time=start_time, end_time=end_time)
+
+
+class ParseTimeValueTest(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(cd.parse_time_value("90"), 90.0)
+        self.assertEqual(cd.parse_time_value("01:30"), 90.0)
+        self.assertEqual(cd.parse_time_value("01:00:30.5"), 3630.5)
+        self.assertEqual(cd.parse_time_value(" 0:00 "), 0.0)
+
+    def test_invalid(self):
+        for text in ("", "abc", "1:2:3:4", "-5", "1:x"):
+            with self.subTest(text=text), self.assertRaises(ValueError) as context:
+                cd.parse_time_value(text)
+            self.assertNotIn("could not convert", str(context.exception))
+
+
+class ClipFileSuffixTest(unittest.TestCase):
+    def test_suffix(self):
+        self.assertEqual(cd.clip_file_suffix(600, 1200), "_00-10-00~00-20-00")
+        self.assertEqual(cd.clip_file_suffix(None, 3661.9), "_00-00-00~01-01-01")
+        self.assertEqual(cd.clip_file_suffix(5, None), "_00-00-05~end")
+
+
+class SelectSegmentsTest(unittest.TestCase):
+    segments = make_segments([6.0, 6.0, 6.0, 6.0])  # 0-6, 6-12, 12-18, 18-24
+
+    def indexes(self, start_time, end_time):
+        return [segment.index for segment in make_thread(start_time, end_time).select_segments(self.segments)]
+
+    def test_full_download_keeps_all(self):
+        self.assertEqual(self.indexes(None, None), [0, 1, 2, 3])
+
+    def test_segments_straddling_start_and_end_are_included(self):
+        self.assertEqual(self.indexes(7.0, 13.0), [1, 2])
+
+    def test_boundaries_on_segment_edges(self):
+        # 끝이 세그먼트 시작과 같으면 그 세그먼트는 필요 없음
+        self.assertEqual(self.indexes(6.0, 12.0), [1])
+        self.assertEqual(self.indexes(None, 6.0), [0])
+        self.assertEqual(self.indexes(18.0, None), [3])
+
+    def test_end_past_playlist_selects_to_last_segment(self):
+        self.assertEqual(self.indexes(20.0, 999.0), [3])
+
+    def test_start_past_playlist_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.indexes(24.0, None)
+
+
+class ClipRangeTest(unittest.TestCase):
+    def test_end_is_clamped_to_total_duration(self):
+        thread = make_thread(10.0, 999.0)
+        thread.clip_start = 10.0
+        thread.set_clip_range(24.0)
+        self.assertEqual(thread.clip_end, 24.0)
+        self.assertEqual(thread.duration_ms, 14000)
+
+    def test_open_end_uses_total_duration(self):
+        thread = make_thread(10.0, None)
+        thread.clip_start = 10.0
+        thread.set_clip_range(24.0)
+        self.assertEqual(thread.clip_end, 24.0)
+
+    def test_unknown_total_keeps_requested_end(self):
+        thread = make_thread(10.0, 30.0)
+        thread.clip_start = 10.0
+        thread.set_clip_range(None)
+        self.assertEqual(thread.clip_end, 30.0)
+        self.assertEqual(thread.duration_ms, 20000)
+
+    def test_start_past_total_duration_is_rejected(self):
+        thread = make_thread(30.0, None)
+        thread.clip_start = 30.0
+        with self.assertRaises(ValueError) as context:
+            thread.set_clip_range(24.0)
+        self.assertIn("벗어났습니다", str(context.exception))
+
+    def test_full_download_uses_total_duration(self):
+        thread = make_thread()
+        thread.set_clip_range(24.0)
+        self.assertEqual(thread.duration_ms, 24000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""CPU 관리자 테스트 (스레드 몫 계산, -threads 삽입, 작업 시작/종료 시 재배분)"""
+
+import itertools
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+
+class FakeProcess:
+    pids = itertools.count(1000)
+
+    def __init__(self, command, **kwargs):
+        self.command = command
+        self.pid = next(self.pids)
+
+
+def make_governor(cpu_count=9, reserve_cores=1, use_affinity=False):
+    with mock.patch.object(cd.os, 'sched_getaffinity', return_value=set(range(cpu_count)), create=True):
+        return cd.CpuGovernor(reserve_cores=reserve_cores, use_affinity=use_affinity)
+
+
+class ThreadBudgetTest(unittest.TestCase):
+    def test_usable_cores_are_split_between_encodes(self):
+        governor = make_governor(cpu_count=9)
+        self.assertEqual(len(governor.usable_cpus), 8)
+        self.assertEqual([governor.thread_budget(encodes) for encodes in (0, 1, 2, 3, 8, 20)], [8, 8, 4, 2, 1, 1])
+
+    def test_small_machines_keep_every_core(self):
+        self.assertEqual(len(make_governor(cpu_count=2).usable_cpus), 2)
+
+    def test_affinity_slices_do_not_overlap(self):
+        governor = make_governor(cpu_count=9, use_affinity=True)
+        governor.processes = [(FakeProcess([]), 'encode') for _ in range(2)] + [(FakeProcess([]), 'probe')]
+        slices = list(governor._encode_slices().values())
+        self.assertEqual(len(slices), 2)
+        self.assertEqual(sorted(slices[0] + slices[1]), governor.usable_cpus)
+
+
+@mock.patch.object(cd.os, 'setpriority', create=True)
+@mock.patch.object(cd.subprocess, 'Popen', side_effect=FakeProcess)
+class PopenTest(unittest.TestCase):
+    def test_threads_inserted_before_output_for_encodes_only(self, popen, setpriority):
+        governor = make_governor(cpu_count=9)
+        encode = governor.popen(['ffmpeg', '-i', 'in.ts', 'out.mp4'], 'encode')
+        probe = governor.popen(['ffprobe', 'in.mp4'], 'probe')
+        self.assertEqual(encode.command, ['ffmpeg', '-i', 'in.ts', '-threads', '8', 'out.mp4'])
+        self.assertEqual(probe.command, ['ffprobe', 'in.mp4'])
+
+        second = governor.popen(['ffmpeg', '-i', 'in2.ts', 'out2.mp4'], 'encode')
+        self.assertEqual(second.command[-3:], ['-threads', '4', 'out2.mp4'])
+
+    def test_priority_follows_jobs_starting_and_finishing(self, popen, setpriority):
+        governor = make_governor(cpu_count=9)
+        base = cd.CpuGovernor.NICE_LEVELS['encode']
+        lowered = base + cd.CpuGovernor.OVERSUBSCRIBED_NICE
+
+        first = governor.popen(['ffmpeg', 'a.mp4'], 'encode')  # 8스레드로 시작
+        self.assertEqual(governor.nice_levels[first.pid], base)
+
+        # 두 번째 작업이 시작되면 몫(4)보다 많은 스레드를 쓰는 첫 작업의 우선순위를 낮춤
+        second = governor.popen(['ffmpeg', 'b.mp4'], 'encode')
+        self.assertEqual(governor.nice_levels[first.pid], lowered)
+        self.assertEqual(governor.nice_levels[second.pid], base)
+        setpriority.assert_any_call(os.PRIO_PROCESS, first.pid, lowered)
+
+        # 두 번째 작업이 끝나면 다시 원래 우선순위로
+        governor.release(second)
+        self.assertEqual(governor.nice_levels[first.pid], base)
+        self.assertNotIn(second.pid, governor.threads)
+        self.assertEqual(setpriority.call_args, mock.call(os.PRIO_PROCESS, first.pid, base))
+
+    def test_affinity_rebalanced_on_start_and_finish(self, popen, setpriority):
+        governor = make_governor(cpu_count=9, use_affinity=True)
+        with mock.patch.object(cd.os, 'sched_setaffinity', create=True) as setaffinity:
+            first = governor.popen(['ffmpeg', 'a.mp4'], 'encode')
+            second = governor.popen(['ffmpeg', 'b.mp4'], 'encode')
+            assigned = {call.args[0]: call.args[1] for call in setaffinity.call_args_list[-2:]}
+            self.assertEqual(len(assigned[first.pid]), 4)
+            self.assertFalse(set(assigned[first.pid]) & set(assigned[second.pid]))
+
+            governor.release(second)
+            self.assertEqual(setaffinity.call_args, mock.call(first.pid, governor.usable_cpus))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""데몬 작업 명세 검증과 끝난 작업 정리 테스트"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+
+class DownloadJobSpecTest(unittest.TestCase):
+    def test_bad_time_reports_field_name(self):
+        with self.assertRaises(ValueError) as context:
+            cd.DownloadJob({'url': 'http://example.com/a.m3u8', 'start': 'abc'}, '/tmp')
+        self.assertIn("start", str(context.exception))
+        self.assertNotIn("could not convert", str(context.exception))
+
+    def test_wrong_field_type_is_rejected(self):
+        with self.assertRaises(ValueError):
+            cd.DownloadJob({'url': 'http://example.com/a.m3u8', 'formats': 5}, '/tmp')
+
+    def test_output_dir_comes_from_scheduler(self):
+        job = cd.DownloadJob({'url': 'http://example.com/a.m3u8', 'output_dir': '/etc'}, '/srv/out')
+        self.assertEqual(job.output_dir, '/srv/out')
+
+
+class JobSchedulerPruneTest(unittest.TestCase):
+    def setUp(self):
+        log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, log_dir, True)
+        with mock.patch.object(cd, 'FFmpegManager'):
+            self.scheduler = cd.JobScheduler('/tmp', log_dir=log_dir, retention=60, max_finished=2)
+        self.addCleanup(self.scheduler.log_files.close_all)
+
+    def add_job(self, state, finished=None):
+        job = cd.DownloadJob({'url': 'http://example.com/a.m3u8'}, '/tmp')
+        job.state = state
+        job.finished = finished
+        self.scheduler.jobs[job.id] = job
+        return job
+
+    def test_status_reads_expire_finished_jobs_without_new_submissions(self):
+        now = time.time()
+        expired = self.add_job('completed', now - 120)
+        running = self.add_job('running')
+        recent = [self.add_job('failed', now - index) for index in range(3)]
+
+        listed = self.scheduler.list()
+
+        self.assertNotIn(expired, listed)
+        self.assertIn(running, listed)
+        # 최근 끝난 작업도 max_finished개까지만 남기고 오래된 것부터 제거
+        self.assertEqual([job for job in listed if job.is_done], recent[:2])
+        self.assertIsNone(self.scheduler.get(recent[2].id))
+
+
+if __name__ == '__main__':
+    unittest.main()
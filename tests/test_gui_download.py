@@ -0,0 +1,105 @@
+"""GUI 다운로드 제출 테스트 (선택한 형식을 한꺼번에 파이프라인에 넣고 모두 끝나면 알림)"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import coursemos_downloader as cd
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication([])
+
+
+class FakeSettings:
+    def __init__(self, *args):
+        self.values = {}
+
+    def contains(self, key):
+        return key in self.values
+
+    def value(self, key, default=None, type=None):
+        return self.values.get(key, default)
+
+    def setValue(self, key, value):
+        self.values[key] = value
+
+
+class FakePipeline:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, thread, on_done=None):
+        self.submitted.append(thread)
+
+    def depths(self):
+        return {stage: (0, 0) for stage in cd.PIPELINE_STAGES}
+
+
+class StartDownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        self.pipeline = FakePipeline()
+        manager = mock.Mock(ffmpeg_path="ffmpeg")
+        for patcher in (mock.patch.object(cd, 'QSettings', FakeSettings),
+                        mock.patch.object(cd, 'FFmpegManager', return_value=manager),
+                        mock.patch.object(cd, 'get_app_data_dir', return_value=self.work_dir),
+                        mock.patch.object(cd, 'get_stage_pipeline', return_value=self.pipeline),
+                        mock.patch.object(cd.QMessageBox, 'information')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.window = cd.CoursemosDownloader()
+        self.addCleanup(self.window.log_files.close_all)
+        self.window.save_folder = self.work_dir
+        self.window.page_title = "lecture"
+        self.window.selected_url = "http://example.com/index.m3u8"
+
+    def start(self, mp4=True, mp3=True):
+        self.window.mp4_checkbox.setChecked(mp4)
+        self.window.mp3_checkbox.setChecked(mp3)
+        self.window.start_download()
+        return {thread.output_format: thread for thread in self.pipeline.submitted}
+
+    def test_both_formats_are_submitted_together(self):
+        threads = self.start()
+        self.assertEqual(sorted(threads), ['mp3', 'mp4'])
+        self.assertEqual(threads['mp3'].output_path, os.path.join(self.work_dir, "lecture.mp3"))
+        self.assertFalse(self.window.download_btn.isEnabled())
+
+        threads['mp3'].progress_percent.emit(50)
+        self.assertEqual(self.window.progress_bar.value(), 25)
+
+        # 먼저 끝난 형식만으로는 완료 알림을 띄우지 않음
+        threads['mp3'].conversion_finished.emit(True, "ok", "lecture.mp3")
+        cd.QMessageBox.information.assert_not_called()
+        self.assertFalse(self.window.download_btn.isEnabled())
+
+        threads['mp4'].conversion_finished.emit(True, "ok", "lecture.mp4")
+        self.assertTrue(self.window.download_btn.isEnabled())
+        self.assertEqual(self.window.progress_bar.value(), 100)
+        self.assertIn("모든 다운로드", cd.QMessageBox.information.call_args.args[2])
+        self.assertEqual(self.window.ffmpeg_threads, {})
+
+    def test_failure_of_one_format_skips_the_completion_message(self):
+        threads = self.start()
+        threads['mp4'].conversion_finished.emit(False, "network error", "")
+        threads['mp3'].conversion_finished.emit(True, "ok", "lecture.mp3")
+        self.assertTrue(self.window.download_btn.isEnabled())
+        cd.QMessageBox.information.assert_not_called()
+
+    def test_single_format(self):
+        threads = self.start(mp4=False)
+        self.assertEqual(list(threads), ['mp3'])
+        threads['mp3'].conversion_finished.emit(True, "ok", "lecture.mp3")
+        self.assertIn("MP3 다운로드", cd.QMessageBox.information.call_args.args[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""HAR 스트리밍 파서와 강의 추출 테스트"""
+
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+TARGETS = [('log', 'pages'), ('log', 'entries')]
+
+# 구조 문자와 따옴표, 역슬래시가 섞인 문자열
+TRICKY = ['a]b}c', '{"not": [an, object]}', 'quote \\" and \\\\', 'end with backslash \\', '한글 ]}', '']
+
+
+def entry(url, pageref="page_1", started="2026-03-02T09:00:00.000+09:00", status=200, text=""):
+    return {
+        "pageref": pageref,
+        "startedDateTime": started,
+        "request": {"method": "GET", "url": url, "headers": [{"name": "X-Tricky", "value": text}]},
+        "response": {"status": status, "content": {"text": text, "mimeType": "application/x-mpegURL"}},
+    }
+
+
+def tricky_har():
+    entries = [entry(f"https://cdn.example.com/v{index}/index.m3u8?sig={index}", text=text)
+               for index, text in enumerate(TRICKY)]
+    pages = [{"id": "page_1", "title": 'Week 1 ]} "intro"', "pageTimings": {"onLoad": [1, 2]}}]
+    return {"log": {"version": "1.2", "creator": {"name": "test ]}"}, "pages": pages, "entries": entries}}
+
+
+class JsonArrayStreamTest(unittest.TestCase):
+    def stream(self, document, chunk_size, bom=False):
+        data = json.dumps(document, ensure_ascii=False, indent=1).encode('utf-8')
+        if bom:
+            data = b'\xef\xbb\xbf' + data
+        return list(cd.JsonArrayStream(io.BytesIO(data), TARGETS, chunk_size=chunk_size))
+
+    def test_matches_json_load_for_any_chunk_size(self):
+        document = tricky_har()
+        expected = ([(('log', 'pages'), page) for page in document['log']['pages']]
+                    + [(('log', 'entries'), item) for item in document['log']['entries']])
+        # 1바이트는 UTF-8 문자와 역슬래시가 청크 경계에 걸리는 경우를 모두 포함
+        for chunk_size in (1, 2, 3, 7, 13, 64, 1000, 1024 * 1024):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.stream(document, chunk_size), expected)
+
+    def test_byte_order_mark_is_skipped(self):
+        items = self.stream(tricky_har(), 5, bom=True)
+        self.assertEqual(len(items), 1 + len(TRICKY))
+
+    def test_arrays_outside_targets_are_ignored(self):
+        document = {"other": {"entries": [1, 2]}, "log": {"entries": [{"a": 1}], "pages": []}}
+        self.assertEqual(self.stream(document, 3), [(('log', 'entries'), {"a": 1})])
+
+    def test_unterminated_string_raises(self):
+        with self.assertRaises(ValueError):
+            list(cd.JsonArrayStream(io.BytesIO(b'{"log": {"entries": [{"a": "abc'), TARGETS, chunk_size=4))
+
+
+class ExtractLecturesTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+
+    def write_har(self, pages, entries):
+        path = os.path.join(self.work_dir, "session.har")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"log": {"pages": pages, "entries": entries}}, f)
+        return path
+
+    def test_page_with_two_videos_mirrors_and_variants(self):
+        path = self.write_har(
+            [{"id": "page_1", "title": "1주차 강의"}, {"id": "page_2", "title": "2주차: 정리?"}],
+            [
+                entry("https://a.cdn.com/vod/lec1/master.m3u8", started="2026-03-02T09:00:00"),
+                entry("https://a.cdn.com/vod/lec1/720p/index.m3u8", started="2026-03-02T09:00:01"),
+                entry("https://b.cdn.com/vod/lec1/master.m3u8?token=x", started="2026-03-02T09:00:02"),
+                entry("https://a.cdn.com/vod/lec2/master.m3u8", started="2026-03-02T09:10:00"),
+                entry("https://a.cdn.com/vod/lec9/master.m3u8", "page_2", "2026-03-03T10:00:00"),
+                entry("https://a.cdn.com/vod/lec9/seg1.ts", "page_2", "2026-03-03T10:00:01"),
+                entry("https://a.cdn.com/vod/gone/master.m3u8", "page_2", "2026-03-03T10:00:02", status=404),
+            ])
+
+        lectures = cd.extract_lectures_from_har(path)
+
+        self.assertEqual([lecture.title for lecture in lectures], ["1주차 강의", "1주차 강의_2", "2주차 정리"])
+        # 호스트만 다른 미러와 하위 폴더의 변형 플레이리스트는 한 강의로 묶음
+        self.assertEqual(lectures[0].urls, ["https://a.cdn.com/vod/lec1/master.m3u8",
+                                            "https://a.cdn.com/vod/lec1/720p/index.m3u8",
+                                            "https://b.cdn.com/vod/lec1/master.m3u8?token=x"])
+        self.assertEqual(lectures[1].urls, ["https://a.cdn.com/vod/lec2/master.m3u8"])
+        self.assertEqual([lecture.timestamp for lecture in lectures],
+                         ["2026-03-02T09:00:00", "2026-03-02T09:10:00", "2026-03-03T10:00:00"])
+
+    def test_entries_without_page_group_by_path(self):
+        path = self.write_har([], [
+            entry("https://a.cdn.com/x/index.m3u8", None, "2026-03-02T09:00:00"),
+            entry("https://b.cdn.com/x/index.m3u8", None, "2026-03-02T09:00:01"),
+        ])
+        lectures = cd.extract_lectures_from_har(path)
+        self.assertEqual(len(lectures), 1)
+        self.assertEqual(lectures[0].title, "lecture_20260302090000")
+
+    def test_job_specs_keep_options_and_timestamp(self):
+        path = self.write_har([{"id": "page_1", "title": "강의"}],
+                              [entry("https://a.cdn.com/v/index.m3u8", started="2026-03-02T09:00:00")])
+        specs = cd.har_job_specs(path, {'har': path, 'formats': ['mp3'], 'start': '00:01:00'})
+        self.assertEqual(specs, [{'formats': ['mp3'], 'start': '00:01:00', 'title': "강의",
+                                  'candidates': ["https://a.cdn.com/v/index.m3u8"],
+                                  'recorded_at': "2026-03-02T09:00:00"}])
+        job = cd.DownloadJob(specs[0], self.work_dir)
+        self.assertEqual(job.to_dict()['recorded_at'], "2026-03-02T09:00:00")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""헤지 요청에서 진 쪽 요청이 중단되는지 확인하는 테스트"""
+
+import http.server
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+FAST_BODY = b"fast-mirror-segment" * 1000
+SLOW_CHUNK = b"s" * 16384
+SLOW_CHUNKS = 200  # 0.05초 간격이면 끝까지 보내는 데 10초
+
+
+class MirrorHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if server.slow:
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(SLOW_CHUNK) * SLOW_CHUNKS))
+            self.end_headers()
+            sent = 0
+            try:
+                for _ in range(SLOW_CHUNKS):
+                    self.wfile.write(SLOW_CHUNK)
+                    self.wfile.flush()
+                    sent += 1
+                    time.sleep(0.05)
+            except (BrokenPipeError, ConnectionResetError):
+                server.abandoned.set()
+                self.close_connection = True
+                return
+            server.completed.set()
+        else:
+            time.sleep(0.3)  # 헤지 임계값(0.2초)이 지난 뒤 시작되도록 느린 쪽보다 늦게 받게 함
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(FAST_BODY)))
+            self.end_headers()
+            self.wfile.write(FAST_BODY)
+
+
+def start_mirror(slow):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), MirrorHandler)
+    server.daemon_threads = True
+    server.slow = slow
+    server.abandoned = threading.Event()
+    server.completed = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def mirror_playlist(server):
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    text = "#EXTM3U\n#EXT-X-TARGETDURATION:0.2\n#EXTINF:6.0,\nseg0.ts\n#EXT-X-ENDLIST\n"
+    return cd.M3U8Playlist(base + "index.m3u8", text)
+
+
+class HedgedFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.slow = start_mirror(slow=True)
+        self.fast = start_mirror(slow=False)
+        for server in (self.slow, self.fast):
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+
+    def test_loser_is_abandoned_and_winner_bytes_returned(self):
+        mirrors = [mirror_playlist(self.slow), mirror_playlist(self.fast)]
+        fetcher = cd.HedgedSegmentFetcher(mirrors, max_workers=1, session=cd.requests.Session())
+
+        started = time.monotonic()
+        results = list(fetcher.fetch_iter(mirrors[0].segments))
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(results[0][1], FAST_BODY)
+        self.assertLess(elapsed, 5)
+        self.assertEqual(fetcher.hedged_count, 1)
+        self.assertEqual(fetcher.hedge_wins, 1)
+        # 느린 미러는 끝까지 보내지 못하고 연결이 끊겨야 함
+        self.assertTrue(self.slow.abandoned.wait(5))
+        self.assertFalse(self.slow.completed.is_set())
+        deadline = time.monotonic() + 2
+        while fetcher.abandoned_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(fetcher.abandoned_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
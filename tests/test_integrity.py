@@ -0,0 +1,157 @@
+"""무결성 검사(누락 구간 찾기, 얕은/정밀 검사, 검증 오류 처리)와 누락 구간 복구 테스트"""
+
+import functools
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+# 오디오 패킷 목록을 출력하는 가짜 ffprobe (pts,duration / 첫 패킷은 10초에서 시작, 4~10초 사이가 비어 있음)
+FAKE_FFPROBE = r'''#!{python}
+import sys
+args = sys.argv[1:]
+if 'format=duration' in args:
+    print("12.0")
+else:
+    for line in ("10.0,2.0", "12.0,2.0", "N/A,N/A", "20.0,2.0"):
+        print(line)
+'''
+
+# 자르기는 "[시작-끝]"을, concat은 목록의 파일을 차례로 이어 붙여 출력하는 가짜 ffmpeg
+FAKE_FFMPEG = r'''#!{python}
+import sys
+args = sys.argv[1:]
+output = args[-1]
+if '-f' in args and args[args.index('-f') + 1] == 'concat':
+    with open(args[args.index('-i') + 1], encoding='utf-8') as listing, open(output, 'wb') as out:
+        for line in listing:
+            with open(line.strip()[len("file '"):-1], 'rb') as part:
+                out.write(part.read())
+else:
+    with open(output, 'wb') as out:
+        out.write("[{{}}-{{}}]".format(args[args.index('-ss') + 1], args[args.index('-to') + 1]).encode())
+'''
+
+
+class FakeManager:
+    def __init__(self, bin_dir):
+        self.bin_dir = bin_dir
+
+    def get_ffmpeg_command(self):
+        return os.path.join(self.bin_dir, "ffmpeg")
+
+    def get_ffprobe_command(self):
+        return os.path.join(self.bin_dir, "ffprobe")
+
+
+def install_fake_tools(bin_dir):
+    for name, template in (("ffmpeg", FAKE_FFMPEG), ("ffprobe", FAKE_FFPROBE)):
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(template.format(python=sys.executable))
+        os.chmod(path, 0o755)
+
+
+class IntegrityTestCase(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+        install_fake_tools(self.work_dir)
+        self.verifier = cd.IntegrityVerifier(FakeManager(self.work_dir))
+
+
+class FindMissingSegmentsTest(IntegrityTestCase):
+    def test_gap_and_truncated_tail(self):
+        # 세그먼트 0:0-4, 1:4-8, 2:8-12, 3:12-16 / 5~9초가 비어 있고 파일은 12초에서 끝남
+        missing = self.verifier.find_missing_segments([4.0, 4.0, 4.0, 4.0], 12.0, [(5.0, 9.0)])
+        self.assertEqual(missing, [1, 3])
+
+    def test_complete_file(self):
+        self.assertEqual(self.verifier.find_missing_segments([6.0, 6.0], 12.0, []), [])
+
+
+class ProbeGapsTest(IntegrityTestCase):
+    def test_gaps_are_relative_to_first_packet(self):
+        covered_end, gaps = self.verifier.probe_gaps("input.mp4")
+        self.assertEqual(covered_end, 12.0)
+        self.assertEqual(gaps, [(4.0, 10.0)])
+
+
+class VerifyModeTest(IntegrityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_path = os.path.join(self.work_dir, "lecture.mp4")
+        with open(self.media_path, 'wb') as f:
+            f.write(b"media")
+        self.playlist = cd.M3U8Playlist("http://example.com/index.m3u8",
+                                        "#EXTM3U\n#EXTINF:6.0,\na.ts\n#EXTINF:6.0,\nb.ts\n#EXT-X-ENDLIST\n")
+
+    def test_shallow_check_only_probes_duration(self):
+        with mock.patch.object(self.verifier, 'probe_gaps') as probe_gaps, \
+                mock.patch.object(cd, 'file_sha256') as file_sha256:
+            result = self.verifier.verify(self.media_path, self.playlist)
+        probe_gaps.assert_not_called()
+        file_sha256.assert_not_called()
+        self.assertTrue(result.ok)
+        self.assertIsNone(result.checksum)
+
+    def test_deep_check_scans_packets_and_hashes(self):
+        result = self.verifier.verify(self.media_path, self.playlist, deep=True)
+        self.assertFalse(result.ok)  # 가짜 ffprobe의 4~10초 간격
+        self.assertEqual(result.missing_segments, [1])
+        self.assertIsNotNone(result.checksum)
+
+    def test_verifier_error_fails_the_download(self):
+        thread = cd.FFmpegThread("http://example.com/index.m3u8", self.media_path, 'mp4',
+                                 FakeManager(self.work_dir))
+        thread.playlist = self.playlist
+        with mock.patch.object(cd.IntegrityVerifier, 'verify', side_effect=RuntimeError("ffprobe 없음")):
+            result = thread.verify_output()
+        self.assertFalse(result.ok)
+        self.assertIn("ffprobe 없음", result.message)
+
+
+class RepairTest(IntegrityTestCase):
+    def setUp(self):
+        super().setUp()
+        serve_dir = os.path.join(self.work_dir, "srv")
+        os.makedirs(serve_dir)
+        for index in range(4):
+            with open(os.path.join(serve_dir, f"seg{index}.ts"), 'wb') as f:
+                f.write(f"<seg{index}>".encode())
+        handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=serve_dir)
+        handler.log_message = lambda *args: None
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:6"]
+        for index in range(4):
+            lines += ["#EXTINF:6.0,", f"seg{index}.ts"]
+        self.playlist = cd.M3U8Playlist(f"http://127.0.0.1:{server.server_address[1]}/index.m3u8",
+                                        "\n".join(lines + ["#EXT-X-ENDLIST"]))
+
+    def test_only_missing_runs_are_refetched_and_concatenated_in_order(self):
+        file_path = os.path.join(self.work_dir, "lecture.mp4")
+        with open(file_path, 'wb') as f:
+            f.write(b"original")
+        logs = []
+
+        ok = self.verifier.repair(file_path, self.playlist, [1, 2], log=logs.append)
+
+        self.assertTrue(ok, logs)
+        with open(file_path, 'rb') as f:
+            # 정상 구간은 원본에서 잘라내고 누락 구간(1~2)만 다시 받아 순서대로 이어 붙임
+            self.assertEqual(f.read(), b"[0.000-6.000]<seg1><seg2>[18.000-24.000]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""링 버퍼 로그 모델 테스트 (밀려난 항목의 행 제거, 필터, 작업 목록 정리)"""
+
+import logging
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import coursemos_downloader as cd
+from PyQt5.QtWidgets import QApplication, QComboBox
+
+app = QApplication.instance() or QApplication([])
+
+
+def entry(number, job="job", level=logging.INFO):
+    return cd.LogEntry(float(number), level, job, f"message {number}")
+
+
+class LogListModelTest(unittest.TestCase):
+    def setUp(self):
+        self.model = cd.LogListModel(capacity=5)
+        self.removed = []
+        self.inserted = []
+        self.dropped = []
+        self.model.rowsRemoved.connect(lambda parent, first, last: self.removed.append((first, last)))
+        self.model.rowsInserted.connect(lambda parent, first, last: self.inserted.append((first, last)))
+        self.model.jobs_dropped.connect(self.dropped.extend)
+
+    def messages(self):
+        return [self.model.visible[row].message for row in range(self.model.rowCount())]
+
+    def append(self, entries):
+        for item in entries:
+            self.model.append(item)
+        self.model.flush()
+
+    def test_appends_are_batched_until_flush(self):
+        self.model.append(entry(1))
+        self.model.append(entry(2))
+        self.assertEqual(self.model.rowCount(), 0)
+        self.model.flush()
+        self.assertEqual(self.messages(), ["message 1", "message 2"])
+        self.assertEqual(self.inserted, [(0, 1)])
+
+    def test_evicted_rows_are_removed_from_the_front(self):
+        self.append(entry(number) for number in range(4))
+        self.append(entry(number) for number in range(4, 7))
+        self.assertEqual(self.messages(), [f"message {number}" for number in range(2, 7)])
+        self.assertEqual(self.removed, [(0, 1)])
+        self.assertEqual(len(self.model.entries), 5)
+
+    def test_burst_larger_than_capacity_keeps_latest(self):
+        self.append(entry(number) for number in range(3))
+        self.append(entry(number) for number in range(3, 20))
+        self.assertEqual(self.messages(), [f"message {number}" for number in range(15, 20)])
+        self.assertEqual(self.removed, [(0, 2)])
+
+    def test_only_visible_evicted_rows_are_removed(self):
+        self.model.set_filter(logging.WARNING, None)
+        self.append([entry(0), entry(1, level=logging.ERROR), entry(2), entry(3), entry(4)])
+        self.assertEqual(self.messages(), ["message 1"])
+        self.append([entry(5)])  # 숨겨진 항목 0이 밀려남
+        self.assertEqual(self.removed, [])
+        self.append([entry(6)])  # 보이던 항목 1이 밀려남
+        self.assertEqual(self.removed, [(0, 0)])
+        self.assertEqual(self.model.rowCount(), 0)
+
+    def test_job_filter_and_drop_notification(self):
+        self.append([entry(0, "old"), entry(1, "new"), entry(2, "old")])
+        self.model.set_filter(logging.DEBUG, "old")
+        self.assertEqual(self.messages(), ["message 0", "message 2"])
+
+        self.append(entry(number, "new") for number in range(3, 5))
+        self.assertEqual(self.dropped, [])
+        self.append(entry(number, "new") for number in range(5, 8))
+        self.assertEqual(self.dropped, ["old"])
+        self.assertEqual(self.model.job_counts, {"new": 5})
+        self.assertEqual(self.model.rowCount(), 0)
+
+    def test_jobs_only_in_a_discarded_burst_are_dropped(self):
+        self.append([entry(0, "kept")])
+        self.append([entry(1, "burst")] + [entry(number, "kept") for number in range(2, 8)])
+        self.assertEqual(self.dropped, ["burst"])
+        self.assertEqual(self.model.job_counts, {"kept": 5})
+
+    def test_clear_drops_every_job(self):
+        self.append([entry(0, "a"), entry(1, "b")])
+        self.model.clear()
+        self.assertEqual(sorted(self.dropped), ["a", "b"])
+        self.assertEqual(self.model.rowCount(), 0)
+
+
+class RemoveLogJobsTest(unittest.TestCase):
+    def test_dropped_jobs_leave_the_filter_list_except_the_selected_one(self):
+        combo = QComboBox()
+        combo.addItem("모든 작업", None)
+        for job in ("a", "b", "c"):
+            combo.addItem(job, job)
+        combo.setCurrentIndex(combo.findData("b"))
+        window = types.SimpleNamespace(log_job_combo=combo, known_log_jobs={"a", "b", "c"})
+
+        cd.CoursemosDownloader.remove_log_jobs(window, ["a", "b", "missing"])
+
+        self.assertEqual([combo.itemData(index) for index in range(combo.count())], [None, "b", "c"])
+        self.assertEqual(window.known_log_jobs, {"b", "c"})
+        self.assertEqual(combo.currentData(), "b")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""출력 파일 쓰기 테스트 (일부만 쓰는 os.write 처리, 다른 저장소로 복사, 작업별 임시 파일 이름)"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+
+class OutputFilesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, True)
+
+
+class PreallocatedWriterTest(OutputFilesTestCase):
+    def test_short_os_write_is_retried_until_everything_is_written(self):
+        real_write = os.write
+        calls = []
+
+        def short_write(fd, data):
+            calls.append(len(data))
+            return real_write(fd, bytes(data[:4097]))
+
+        path = os.path.join(self.work_dir, "stream.ts")
+        data = os.urandom(3 * 1024 * 1024 + 123)
+        with mock.patch.object(cd.os, 'write', side_effect=short_write):
+            with cd.PreallocatedWriter(path, expected_size=8 * 1024 * 1024, buffer_size=1024 * 1024) as writer:
+                for offset in range(0, len(data), 100000):
+                    writer.write(data[offset:offset + 100000])
+
+        self.assertGreater(len(calls), len(data) // (1024 * 1024))
+        self.assertEqual(writer.written, len(data))
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), data)  # 미리 확보한 뒷부분은 잘려 있어야 함
+
+    def test_zero_length_write_raises(self):
+        path = os.path.join(self.work_dir, "stream.ts")
+        with mock.patch.object(cd.os, 'write', return_value=0):
+            writer = cd.PreallocatedWriter(path)
+            writer.write(b"data")
+            with self.assertRaises(OSError):
+                writer.close()
+        self.assertTrue(writer.file.closed)
+
+
+class BackgroundMoverCopyTest(OutputFilesTestCase):
+    def test_copy_to_other_storage_keeps_content(self):
+        source = os.path.join(self.work_dir, "source.mp4")
+        destination = os.path.join(self.work_dir, "destination.mp4.part")
+        data = os.urandom(1024 * 1024 + 7)
+        with open(source, 'wb') as f:
+            f.write(data)
+
+        cd.BackgroundMover._copy(source, destination, chunk_size=300000)
+
+        with open(destination, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+
+class StagingNameTest(OutputFilesTestCase):
+    def make_thread(self, job_id):
+        return cd.FFmpegThread("http://example.com/index.m3u8", os.path.join(self.work_dir, "lecture.mp4"),
+                               'mp4', None, job_id=job_id)
+
+    def test_same_title_jobs_use_different_staging_files(self):
+        threads = [self.make_thread("job1"), self.make_thread("job2")]
+        with mock.patch.object(cd, 'is_slow_destination', return_value=True), \
+                mock.patch.object(cd, 'get_staging_dir', return_value=self.work_dir):
+            for thread in threads:
+                self.assertTrue(thread.prepare_output(self.work_dir, None))
+
+        paths = [thread.output_path for thread in threads]
+        self.assertEqual(paths, [os.path.join(self.work_dir, "job1_lecture.mp4"),
+                                 os.path.join(self.work_dir, "job2_lecture.mp4")])
+        self.assertTrue(all(thread.final_path == os.path.join(self.work_dir, "lecture.mp4") for thread in threads))
+
+
+if __name__ == '__main__':
+    unittest.main()
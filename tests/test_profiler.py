@@ -0,0 +1,79 @@
+"""프로파일러 테스트 (비활성 시 빠른 경로, 기록 중 내보내기)"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+
+class ProfiledDecoratorTest(unittest.TestCase):
+    def setUp(self):
+        self.profiler = cd.Profiler()
+        patcher = mock.patch.object(cd, 'PROFILER', self.profiler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_disabled_profiler_skips_the_span(self):
+        @cd.profiled("test.add")
+        def add(a, b=0):
+            return a + b
+
+        with mock.patch.object(self.profiler, 'span') as span:
+            self.assertEqual(add(1, b=2), 3)
+        span.assert_not_called()
+        self.assertEqual(add.__name__, "add")
+
+    def test_enabled_profiler_records_the_span(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        self.profiler.enable(work_dir)
+
+        @cd.profiled("test.call", "unit")
+        def call():
+            return "done"
+
+        self.assertEqual(call(), "done")
+        self.assertEqual([(event["name"], event["cat"]) for event in self.profiler.events], [("test.call", "unit")])
+        self.profiler.enabled = False
+
+
+class ExportTest(unittest.TestCase):
+    def test_export_while_threads_record_spans(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        profiler = cd.Profiler(max_events=1000)
+        profiler.enable(work_dir)
+        stop = threading.Event()
+
+        def record():
+            while not stop.is_set():
+                with profiler.span("work"):
+                    pass
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        try:
+            for index in range(20):
+                path = profiler.export(os.path.join(work_dir, f"trace_{index}.json"))
+                self.assertIsNotNone(path)
+                with open(path, encoding='utf-8') as f:
+                    events = json.load(f)["traceEvents"]
+                self.assertTrue(all(event["ph"] in ("M", "X") for event in events))
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            profiler.enabled = False
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""키 교체(rotation)가 있는 AES-128 플레이리스트 복호화 테스트"""
+
+import functools
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+try:
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:
+    Cipher = None
+
+
+def encrypt_segment(data, key, iv):
+    """AES-128-CBC 암호화 (PKCS#7 패딩)"""
+    padder = padding.PKCS7(128).padder()
+    padded = padder.update(data) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    return encryptor.update(padded) + encryptor.finalize()
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@unittest.skipIf(Cipher is None or not cd.HAS_CRYPTOGRAPHY, "cryptography 패키지가 필요합니다")
+class SegmentFetcherRotationTest(unittest.TestCase):
+    MEDIA_SEQUENCE = 7
+
+    def setUp(self):
+        self.serve_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.serve_dir, True)
+
+        keys = [bytes(range(16)), bytes(range(16, 32))]
+        for number, key in enumerate(keys):
+            self._write(f"key{number}.bin", key)
+
+        # 세그먼트 0~1은 첫 번째 키(IV는 미디어 시퀀스 번호), 2~3은 두 번째 키(명시적 IV)
+        explicit_iv = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+        self.plaintexts = [f"segment-{number}-".encode() * (100 + number * 37) for number in range(4)]
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:4",
+                 f"#EXT-X-MEDIA-SEQUENCE:{self.MEDIA_SEQUENCE}",
+                 '#EXT-X-KEY:METHOD=AES-128,URI="key0.bin"']
+        for number, plain in enumerate(self.plaintexts):
+            if number == 2:
+                lines.append('#EXT-X-KEY:METHOD=AES-128,URI="key1.bin",IV=0x' + explicit_iv.hex())
+            if number < 2:
+                key, iv = keys[0], (self.MEDIA_SEQUENCE + number).to_bytes(16, 'big')
+            else:
+                key, iv = keys[1], explicit_iv
+            self._write(f"seg{number}.ts", encrypt_segment(plain, key, iv))
+            lines += ["#EXTINF:4.0,", f"seg{number}.ts"]
+        lines.append("#EXT-X-ENDLIST")
+        self._write("index.m3u8", "\n".join(lines).encode())
+
+        handler = functools.partial(QuietHandler, directory=self.serve_dir)
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def _write(self, name, data):
+        with open(os.path.join(self.serve_dir, name), 'wb') as f:
+            f.write(data)
+
+    def test_fetch_iter_returns_plaintext_across_key_rotation(self):
+        playlist = cd.load_media_playlist(self.base_url + "index.m3u8")
+        self.assertTrue(playlist.is_encrypted)
+        self.assertTrue(playlist.is_native_supported)
+        self.assertEqual(len({segment.key.uri for segment in playlist.segments}), 2)
+
+        fetcher = cd.SegmentFetcher(max_workers=2, key_cache=cd.KeyCache())
+        results = list(fetcher.fetch_iter(playlist.segments))
+
+        self.assertEqual([segment.index for segment, _ in results], [0, 1, 2, 3])
+        self.assertEqual([data for _, data in results], self.plaintexts)
+
+
+@unittest.skipIf(Cipher is None or not cd.HAS_CRYPTOGRAPHY, "cryptography 패키지가 필요합니다")
+class DecryptSegmentTest(unittest.TestCase):
+    KEY = bytes(range(16))
+    IV = bytes(16)
+
+    def test_round_trip_strips_padding(self):
+        for size in (0, 15, 16, 1000):
+            with self.subTest(size=size):
+                plain = os.urandom(size)
+                self.assertEqual(cd.decrypt_segment(encrypt_segment(plain, self.KEY, self.IV), self.KEY, self.IV),
+                                 plain)
+
+    def test_wrong_key_is_rejected(self):
+        data = encrypt_segment(b"segment" * 100, self.KEY, self.IV)
+        # 잘못된 키로 복호화한 마지막 블록이 우연히 올바른 패딩이 될 확률은 매우 낮음
+        with self.assertRaises(ValueError):
+            cd.decrypt_segment(data, bytes(range(1, 17)), self.IV)
+
+    def test_invalid_padding_is_rejected(self):
+        for last_block in (b"a" * 15 + b"\x00", b"a" * 14 + b"\x01\x02", b"a" * 15 + b"\x11"):
+            with self.subTest(last_block=last_block):
+                encryptor = Cipher(algorithms.AES(self.KEY), modes.CBC(self.IV)).encryptor()
+                data = encryptor.update(b"b" * 16 + last_block) + encryptor.finalize()
+                with self.assertRaises(ValueError) as context:
+                    cd.decrypt_segment(data, self.KEY, self.IV)
+                self.assertIn("복호화 실패", str(context.exception))
+
+    def test_truncated_segment_is_rejected(self):
+        data = encrypt_segment(b"segment" * 100, self.KEY, self.IV)
+        with self.assertRaises(ValueError):
+            cd.decrypt_segment(data[:-5], self.KEY, self.IV)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""공유 SQLite 작업 큐의 임대(lease) 처리 테스트 (같은 DB 파일을 쓰는 두 노드)"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coursemos_downloader as cd
+
+
+class SharedJobQueueTest(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        self.db_path = os.path.join(work_dir, "queue.db")
+        # 노드마다 따로 연 큐 (트랜잭션마다 각자 연결을 엶)
+        self.node_a = cd.SharedJobQueue(self.db_path, max_attempts=2)
+        self.node_b = cd.SharedJobQueue(self.db_path, max_attempts=2)
+
+    def row(self, job_id):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("SELECT state, worker, attempts, message FROM jobs WHERE id = ?",
+                                (job_id,)).fetchone()
+        finally:
+            conn.close()
+
+    def test_job_is_claimed_by_one_node_only(self):
+        job_id = self.node_a.add({'url': 'http://example.com/a.m3u8'})
+        self.assertEqual(self.node_a.claim("a", 60), (job_id, {'url': 'http://example.com/a.m3u8'}))
+        self.assertIsNone(self.node_b.claim("b", 60))
+        self.assertEqual(self.row(job_id)[:2], ('running', 'a'))
+
+    def test_concurrent_claims_never_share_a_job(self):
+        job_ids = {self.node_a.add({'n': index}) for index in range(20)}
+        claimed = []
+        lock = threading.Lock()
+
+        def drain(queue, worker_id):
+            while True:
+                item = queue.claim(worker_id, 60)
+                if item is None:
+                    return
+                with lock:
+                    claimed.append(item[0])
+
+        threads = [threading.Thread(target=drain, args=(queue, name))
+                   for queue, name in ((self.node_a, "a"), (self.node_b, "b"), (self.node_a, "a2"))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(claimed), sorted(job_ids))
+
+    def test_expired_lease_is_reclaimed_and_old_owner_loses_it(self):
+        job_id = self.node_a.add({'n': 1})
+        now = time.time()
+        with mock.patch.object(cd.time, 'time', return_value=now):
+            self.node_a.claim("a", 30)
+        self.assertTrue(self.node_a.heartbeat(job_id, "a", 30))
+
+        # 노드 a가 임대를 갱신하지 못한 채 시간이 지남
+        with mock.patch.object(cd.time, 'time', return_value=now + 31):
+            self.assertEqual(self.node_b.claim("b", 30)[0], job_id)
+        self.assertEqual(self.row(job_id)[:3], ('running', 'b', 2))
+
+        # 늦게 돌아온 a의 갱신과 완료 기록은 무시됨
+        self.assertFalse(self.node_a.heartbeat(job_id, "a", 30))
+        self.node_a.finish(job_id, "a", 'completed', "a 완료", [])
+        self.assertEqual(self.row(job_id)[:2], ('running', 'b'))
+
+        self.node_b.finish(job_id, "b", 'completed', "b 완료", ["/out/a.mp4"])
+        self.assertEqual(self.row(job_id), ('completed', 'b', 2, "b 완료"))
+        self.assertEqual(self.node_a.counts(), {'completed': 1})
+
+    def test_job_fails_after_max_attempts_of_expired_leases(self):
+        job_id = self.node_a.add({'n': 1})
+        now = time.time()
+        for attempt, queue in enumerate((self.node_a, self.node_b)):
+            with mock.patch.object(cd.time, 'time', return_value=now + attempt * 100):
+                self.assertEqual(queue.claim(f"node{attempt}", 30)[0], job_id)
+
+        with mock.patch.object(cd.time, 'time', return_value=now + 300):
+            self.assertIsNone(self.node_a.claim("a", 30))
+        state, _, attempts, message = self.row(job_id)
+        self.assertEqual((state, attempts), ('failed', 2))
+        self.assertIn("재시도", message)
+
+    def test_release_requeues_without_using_an_attempt(self):
+        job_id = self.node_a.add({'n': 1})
+        self.node_a.claim("a", 60)
+        self.node_a.release(job_id, "a")
+        self.assertEqual(self.row(job_id)[:3], ('queued', None, 0))
+        self.assertEqual(self.node_b.claim("b", 60)[0], job_id)
+
+
+if __name__ == '__main__':
+    unittest.main()